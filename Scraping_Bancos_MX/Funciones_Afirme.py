@@ -1,13 +1,36 @@
 import pandas as pd
 import re
-import pdfplumber
 
+from .columnas import agrupar_caracteres, unir_renglones
+from .paginas import instantanea, instantaneas
+from .cache import con_cache
+from .instrumentacion import etapa
+from .documentos import abrir_documento
+from .flujo import concatenar_filas, inicios_seguros
+
+# Rangos de x1 por columna: Día, Descripción, Referencia, Depósitos, Retiros, Saldo
+BORDES_COLUMNAS = ((35, 60), (60, 287), (287, 340), (340, 420), (420, 497), (497, 578))
+NOMBRES_COLUMNAS = {0: "Fecha", 1: "Concepto", 2: "Origen", 3: "Deposito", 4: "Retiro", 5: "Saldo"}
+RE_INICIO_MOVIMIENTO = re.compile(r"\d{2}")
+
+@con_cache("Afirme")
+@etapa("total")
 def Scrap_Estado(ruta_archivo):
-    estado = pdfplumber.open(ruta_archivo)
-    tabla = analizar_estados(estado)
+    with abrir_documento(ruta_archivo) as estado:
+        filas = concatenar_filas(filas_paginas(instantaneas(estado)))
+    return procesar_filas(filas)
+
+def procesar_filas(filas):
+    """Renglones crudos de movimientos completos -> tabla final (ver flujo.iter_movimientos)."""
+    tabla = unificar_filas(filas)
     tabla2 = analisis_movimientos(tabla)
     return tabla2
 
+def inicios_movimiento(filas):
+    # corregir_concepto completa un renglón con fecha sin concepto con el renglón anterior
+    return inicios_seguros(filas["Fecha"].str.match(RE_INICIO_MOVIMIENTO), filas["Concepto"])
+
+@etapa("clasificacion")
 def analisis_movimientos(df):
     df = df.copy()
     df = analisis_tipo_movimiento(df)
@@ -95,21 +118,18 @@ def analisis_tipo_movimiento(df):
     return df
 
 def analizar_estados(estado):
-    df = pd.DataFrame()
-    anios = []
-    contador = 0
-    for pagina in estado.pages:
-        texto = pagina.extract_text()
-        texto = texto.replace("\n", "")
-        texto = texto.replace(" ", "")
+    return unificar_filas(concatenar_filas(filas_paginas(instantaneas(estado))))
+
+def filas_paginas(paginas):
+    for pagina in paginas:
+        texto = pagina.texto
         if re.search("DíaDescripciónReferenciaDepósitosRetirosSaldo", texto) :
-                movimientos = extraer_movimientos_pagina(pagina,texto)
-                df = pd.concat([df, pd.DataFrame(movimientos)])    
-                contador += 1
+                yield extraer_movimientos_pagina(pagina,texto)
+
+def unificar_filas(df):
     df = corregir_concepto(df)
     df = incluir_movimientos(df)
     df = unificar_tabla(df)
-
     return df
 
 def corregir_concepto(df):
@@ -121,7 +141,7 @@ def corregir_concepto(df):
     return df
     
 def extraer_movimientos_pagina(pagina,texto):
-    caracteres = pagina.chars
+    caracteres = instantanea(pagina).arreglos
     columnas = agrupar_columnas(caracteres)
     filas = unificar_columnas(columnas)
     filas = eliminar_movimientos_no_deseados(filas)
@@ -138,60 +158,17 @@ def incluir_anio_mes(filas,texto):
             filas.loc[index,"Fecha"] = fila["Fecha"] + "/" + str(mes) + "/" + str(anio)
     return filas
 
+@etapa("columnas")
 def agrupar_columnas(caracteres):
-    columnas = []
-    for caracter in caracteres:
-        coordenada = (caracter["x1"])
-        if coordenada <= 60 and coordenada >= 35:
-            columnas.append({"Caracter": caracter["text"], "Top": round(caracter["top"],2),"X":caracter["x1"],"Columna": 0})
-        elif coordenada <= 287  and coordenada > 60:
-            columnas.append({"Caracter": caracter["text"], "Top": round(caracter["top"],2),"X":caracter["x1"],"Columna": 1})
-        elif coordenada <= 340  and coordenada > 287:
-            columnas.append({"Caracter": caracter["text"], "Top": round(caracter["top"],2),"X":caracter["x1"],"Columna": 2})
-        elif coordenada <= 420  and coordenada > 340:
-            columnas.append({"Caracter": caracter["text"], "Top": round(caracter["top"],2),"X":caracter["x1"],"Columna": 3})
-        elif coordenada <= 497  and coordenada > 420:
-            columnas.append({"Caracter": caracter["text"], "Top": round(caracter["top"],2),"X":caracter["x1"],"Columna": 4})
-        elif coordenada <= 578  and coordenada > 497:
-            columnas.append({"Caracter": caracter["text"], "Top": round(caracter["top"],2),"X":caracter["x1"],"Columna": 5})
-    columnas = pd.DataFrame(columnas)
-    return columnas
-
-def unificar_columna(top):
-    top = top.sort_values(by=["X"])
-    fecha = ""
-    concepto = ""
-    origen = ""
-    deposito = ""
-    retiro = ""
-    saldo = ""
-    for index, row in top.iterrows():
-        if row["Columna"] == 0:
-            fecha = fecha + row["Caracter"]
-        elif row["Columna"] == 1:
-            concepto = concepto + row["Caracter"]
-        elif row["Columna"] == 2:
-            origen = origen + row["Caracter"]
-        elif row["Columna"] == 3:
-            deposito = deposito + row["Caracter"]
-        elif row["Columna"] == 4:
-            retiro = retiro + row["Caracter"]
-        elif row["Columna"] == 5:
-            saldo = saldo + row["Caracter"]
-    fila = {"Fecha": fecha, "Concepto": concepto, "Origen": origen, "Deposito": deposito, "Retiro": retiro, "Saldo": saldo, "Top": top["Top"].max()}
-    return fila
+    return agrupar_caracteres(caracteres, BORDES_COLUMNAS, decimales_top=2)
 
+@etapa("renglones")
 def unificar_columnas(columnas):
-    tops = columnas["Top"].unique()
-    filas = []
-    for top in tops:
-        top = columnas[columnas["Top"] == top]
-        fila = unificar_columna(top)
-        filas.append(fila)
-    filas = pd.DataFrame(filas)
-    
-    filas = filas.sort_values(by=["Top"])
-    return filas
+    """
+    Une los caracteres en renglones (Top) con una columna por campo; la
+    referencia (columna 2) va en Origen. Ver ``columnas.unir_renglones``.
+    """
+    return unir_renglones(columnas, NOMBRES_COLUMNAS)
 
 def eliminar_movimientos_no_deseados(filas):
     filas = filas.reset_index(drop=True)
@@ -221,7 +198,7 @@ def incluir_movimientos(df):
     df["Movimiento"] = 0
     contador_movimiento = 0
     for index, fila in df.iterrows():
-        if  re.match(r"\d{2}", fila["Fecha"]):
+        if  RE_INICIO_MOVIMIENTO.match(fila["Fecha"]):
             contador_movimiento += 1 
         df.loc[index,"Movimiento"] = contador_movimiento
     return df
@@ -234,6 +211,7 @@ def unificar_movimiento(df):
     moviemiento = {"Fecha": df.iloc[0,0], "Concepto": concepto, "Origen": df.iloc[0,2], "Deposito": df.iloc[0,3], "Retiro": df.iloc[0,4], "Saldo": df.iloc[0,5],"Movimiento": df.iloc[0,6]}
     return moviemiento
 
+@etapa("movimientos")
 def unificar_tabla(df):
     movimientos_unificados = []
     for movimiento in df["Movimiento"].unique():
@@ -1,7 +1,12 @@
 import re
-import pdfplumber
 import pandas as pd
 
+from .cache import con_cache
+from .instrumentacion import etapa
+from .documentos import abrir_documento
+
+@con_cache("Azteca")
+@etapa("total")
 def Scrap_Estado(ruta_archivo):
     df = procesar_pdf(ruta_archivo)
     return df
@@ -54,7 +59,7 @@ def parse_linea_movimiento(linea):
     return fecha, monto, linea
 
 def procesar_pdf(pdf_path):
-    with pdfplumber.open(pdf_path) as pdf:
+    with abrir_documento(pdf_path) as pdf:
         movimientos = []
         for i, page in enumerate(pdf.pages):
             for line in page.extract_text().split('\n'):
@@ -1,13 +1,45 @@
 import re
-import time
-from typing import Any, Dict, List
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
-import pdfplumber
+import numpy as np
 import pandas as pd
 
+from .columnas import COLUMNAS_CARACTERES, asignar_columnas, unir_renglones
+from .paginas import instantanea, instantaneas
+from .cache import con_cache
+from .instrumentacion import etapa
+from .documentos import abrir_documento
+from .flujo import concatenar_filas
+from .ocr import PalabrasOCR, aplanar_ocr, palabras_pdf
+
+# Rangos de x1 por campo de la tabla "Detalle de Movimientos Realizados"
+BORDES_CAMPOS = ((0, 55), (55, 100), (100, 314), (314, 420), (420, 466))
+COLUMNAS_FILAS = {0: "Operacion", 1: "Fecha", 2: "Descripcion", 3: "Cargo", 4: "Abono"}
+# Un caracter empieza línea nueva si su top supera al anterior en más de esta fracción de su altura
+SALTO_LINEA = 0.7
+RE_PERIODO = re.compile(r"PeriodoDEL(\d{2}/\d{2}/\d{4})AL\d{2}/\d{2}/\d{4}")
+RE_FECHA_MOVIMIENTO = re.compile(r"(\d{1,2})/(\w{3})")
+MESES = {"ENE": 1, "FEB": 2, "MAR": 3, "ABR": 4, "MAY": 5, "JUN": 6,
+         "JUL": 7, "AGO": 8, "SEP": 9, "OCT": 10, "NOV": 11, "DIC": 12}
+LEYENDAS_PRIMERA_PAGINA = ("La GAT ", "BBVA M")
+FIN_MOVIMIENTOS = "Total de "
+RE_INICIO_MOVIMIENTO = re.compile(r"\d{1,2}\/\w{3}")
+COLUMNAS_CLASIFICACION = ("TipoMovimiento", "Contraparte", "InstitucionContraparte", "ConceptoMovimiento")
+PREFIJOS_SPEI = ("SPEI RECIBIDO", "SPEI ENVIADO", "SPEI DEVUELTO")
+RE_REFERENCIA_SPEI = re.compile(r"\d{7}")
+RE_CUENTA_TERCERO = re.compile(r"\w{4} \d{10}")
+
+@con_cache("BBVA")
+@etapa("total")
 def Scrap_Estado(ruta_archivo):
-    estado = pdfplumber.open(ruta_archivo)
-    tabla = analizar_estados(estado)
+    with abrir_documento(ruta_archivo) as estado:
+        filas = concatenar_filas(filas_paginas(instantaneas(estado)))
+    return procesar_filas(filas)
+
+def procesar_filas(filas):
+    """Renglones crudos de movimientos completos -> tabla final (ver flujo.iter_movimientos)."""
+    tabla = unificar_filas(filas)
     tabla2 = analisis_movimientos(tabla)
     tabla2 = tabla2[['Fecha', 'Concepto', 'Origen', 'Deposito', 'Retiro','Saldo']]
     tabla2['descripcion'] = tabla2['Concepto'] + ' ' + tabla2['Origen']
@@ -28,98 +60,46 @@ def Scrap_Estado(ruta_archivo):
     tabla2 = tabla2[['fecha', 'descripcion', 'deposito', 'retiro','saldo']]
     return tabla2
 
-def obtener_coordenadas(pagina):
-    caracteres = []
-    #Iterar sobre cada caracter
-    for caracter in pagina.chars:
-        #agregamos a la lista únicamente los datos que nos interesan
-        caracteres.append(
-            {
-                "Texto": caracter["text"], 
-                "top": caracter["top"], 
-                "bottom": caracter["bottom"], 
-                "left": caracter["x0"], 
-                "right": caracter["x1"],
-                "height": caracter["height"], 
-                "width": caracter["width"]
-            }
-        )
-    #Convertimos la lista en un dataframe
-    df = pd.DataFrame(caracteres)
-    #Ordenamos el dataframe por top
-    df = df.sort_values(by=["top"])
-    #Redondeamos los valores de top al inmediato superior
-    #df["top"] = df["top"].apply(lambda x: round(x,0))
-    return df
-
-#Operar linea
-def identificar_campos(coordenada):
-        if(coordenada) <= 55 and coordenada >= 0:
-            return "Oper"
-        elif(coordenada) <= 100 and coordenada >= 55:
-            return "Fecha"
-        elif(coordenada) <= 314 and coordenada >= 100:
-            return "Descripcion"
-        elif(coordenada) <= 420 and coordenada >= 314:
-            return "Cargos"
-        elif(coordenada) <= 466 and coordenada >= 420:
-            return "Abono"
-        else:
-            return "-"
-
-
-def identificar_numero_de_linea(df):
-    df = df.copy()  # Avoid modifying the original DataFrame
-    df["tipo"] = df["right"].apply(identificar_campos)
-    df['prev_top'] = df['top'].shift(1)
-    condition = df['top'] > (df['prev_top'] + (df['height'] * 0.7))
-    df['linea'] = condition.cumsum().fillna(0).astype(int)
-    df.drop('prev_top', axis=1, inplace=True)
-    return df
-
-#Identifca que tipo de campo y concatena el texto para obtener la información correspondiente
-def scrap_fila(fila):
-    # Group by 'tipo' and concatenate 'Texto' for each group
-    grouped = fila.groupby("tipo")["Texto"].apply(''.join)
-    
-    # Extract the concatenated strings, defaulting to empty string if key not present
-    oper = grouped.get("Oper", "")
-    fecha = grouped.get("Fecha", "")
-    descripcion = grouped.get("Descripcion", "")
-    cargo = grouped.get("Cargos", "")
-    abono = grouped.get("Abono", "")
-    
-    return {"Operacion": oper, "Fecha": fecha, "Descripcion": descripcion, "Cargo": cargo, "Abono": abono}
+def inicios_movimiento(filas):
+    return filas["Operacion"].str.contains(RE_INICIO_MOVIMIENTO)
 
+def obtener_coordenadas(pagina):
+    """Caracteres de la página en formato columnar, ordenados por top."""
+    caracteres = instantanea(pagina).arreglos
+    return caracteres.tomar(np.argsort(caracteres.top, kind="stable"))
+
+@etapa("columnas")
+def identificar_numero_de_linea(caracteres):
+    """
+    Asigna cada caracter a su campo (por x1) y a su línea. Devuelve el formato
+    de ``agrupar_caracteres``, con el número de línea en ``Top``; los
+    caracteres fuera de los campos quedan con Columna -1 para conservar las
+    líneas que no tienen ninguno.
+    """
+    if not len(caracteres):
+        return pd.DataFrame(columns=COLUMNAS_CARACTERES)
+    top = caracteres.top
+    saltos = top[1:] > top[:-1] + caracteres.height[1:] * SALTO_LINEA
+    return pd.DataFrame({
+        "Caracter": caracteres.text,
+        "Top": np.r_[0, np.cumsum(saltos)],
+        "X": caracteres.x0,
+        "Columna": asignar_columnas(caracteres.x1, BORDES_CAMPOS),
+    })
+
+@etapa("renglones")
 def scrap_filas(df):
-    # Ensure "linea" is integer for proper grouping
-    df = df.copy()
-    df["linea"] = df["linea"].astype(int)
-    
-    # Use pandas groupby for vectorized operation: group by "linea", sort each group by "left", apply scrap_fila
-    filas = df.groupby("linea").apply(lambda group: scrap_fila(group.sort_values(by=["left"])))
-    
-    # Convert the resulting Series of dicts to a DataFrame
-    result_df = pd.DataFrame(list(filas))
-    return result_df
+    """Un renglón por línea con el texto de cada campo, ordenado por x0."""
+    return unir_renglones(df, COLUMNAS_FILAS).drop(columns="Top")
 
 
 def limpiar_primera_pagina(df):
-    df = df.copy()
-    primeras_filas = True
-    for index,row in df.iterrows():
-        if re.search(r"\d{1,2}/\w{3}",row["Operacion"]) and primeras_filas:
-            df.drop(df.index[:index], inplace=True)
-            primeras_filas = False
-        if re.search("La GAT ",row["Operacion"]):
-        
-            df.drop(index, inplace=True)        
-        if re.search("BBVA M",row["Operacion"]):
-        
-            df.drop(index, inplace=True)
-        #if re.search("([0-2][0-9]|3[0-1])(\/|-)(0[1-9]|1[0-2])\2(\d{4})"):
-            
-    return df
+    """Descarta lo anterior al primer movimiento y las leyendas de GAT y de BBVA México."""
+    operacion = df["Operacion"]
+    ruido = np.zeros(len(df), dtype=bool)
+    for leyenda in LEYENDAS_PRIMERA_PAGINA:
+        ruido |= operacion.str.contains(leyenda, regex=False).to_numpy(dtype=bool)
+    return df[desde_primer_movimiento(operacion) & ~ruido]
 
 
 def operar_pagina(pagina):
@@ -129,33 +109,27 @@ def operar_pagina(pagina):
     return df
 
 def limpiar_ultima_pagina(df):
-    df = df.copy()
-    ultimas_filas = False
-    primeras_filas = True
-    for index,row in df.iterrows():
-        
-        if re.search(r"\d{1,2}/\w{3}",row["Operacion"]) and primeras_filas:
-            df.drop(df.index[:index ], inplace=True)
-            primeras_filas = False
-        if re.search(r"Total de ",row["Operacion"]):
-            ultimas_filas = True
-        if ultimas_filas:
-            df.drop(index, inplace=True)
-
-    return df
+    """Conserva desde el primer movimiento hasta antes de "Total de"."""
+    operacion = df["Operacion"]
+    totales = operacion.str.contains(FIN_MOVIMIENTOS, regex=False).to_numpy(dtype=bool)
+    return df[desde_primer_movimiento(operacion) & ~np.logical_or.accumulate(totales)]
 
 def limpiar_paginas(df):
-    df = df.copy()
-    eliminar_celdas_vacias = True
-    for index,row in df.iterrows():
-        if re.search(r"\d{1,2}\/\w{3}",row["Operacion"]):
-            eliminar_celdas_vacias = False
-        if (row["Operacion"] == "" and eliminar_celdas_vacias):
-            df.drop(index, inplace=True)
-
-        if not re.search(r"\d{1,2}\/\w{3}",row["Operacion"]) and row["Operacion"] != "":
-            df.drop(index, inplace=True)
-    return df
+    """
+    Conserva los renglones que inician movimiento y, después del primero,
+    los que no tienen operación (continuación de la descripción).
+    """
+    operacion = df["Operacion"]
+    fechas = operacion.str.contains(RE_INICIO_MOVIMIENTO).to_numpy(dtype=bool)
+    vacias = (operacion == "").to_numpy(dtype=bool)
+    return df[fechas | (vacias & np.logical_or.accumulate(fechas))]
+
+def desde_primer_movimiento(operacion):
+    """Máscara desde el primer renglón con fecha; todo True si la página no tiene ninguno."""
+    fechas = operacion.str.contains(RE_INICIO_MOVIMIENTO).to_numpy(dtype=bool)
+    if not fechas.any():
+        return np.ones(len(fechas), dtype=bool)
+    return np.logical_or.accumulate(fechas)
 
 def is_number(s):
     try:
@@ -175,109 +149,103 @@ def correccion_abono_cargo(df_movimientos):
                 fila["Cargo"] = ""
     return df_movimientos
 
+@etapa("movimientos")
 def unificar_tabla(df):
-
-    df = df.copy()
-    movimientos = df["Movimiento"].max()
-    lista_movimientos = []
-    for i in df["Movimiento"].unique():
-        tabla_temporal = df[df["Movimiento"] == i]
-        movimiento = unificar_movimientos(tabla_temporal)
-        lista_movimientos.append(movimiento)
-    return pd.DataFrame(lista_movimientos)
+    """
+    Un renglón por movimiento: operación, fechas, cargo y abono del primer
+    renglón, las descripciones unidas con "|" y como referencia el cargo del
+    segundo renglón (" - " si el movimiento tiene uno solo).
+    """
+    movimiento = df["Movimiento"]
+    posicion = df.groupby("Movimiento").cumcount().to_numpy()
+    primeros = df[posicion == 0].set_index("Movimiento")
+    referencias = df[posicion == 1].set_index("Movimiento")["Cargo"]
+    descripciones = ("|" + df["Descripcion"]).groupby(movimiento).agg("".join)
+    return pd.DataFrame({
+        "Operacion": primeros["Operacion"],
+        "Fecha": primeros["Fecha"],
+        "FechaOperacion": primeros["FechaOperacion"],
+        "FechaLiquidacion": primeros["FechaLiquidacion"],
+        "Descripcion": descripciones,
+        "Referencia": referencias.reindex(primeros.index, fill_value=" - "),
+        "Cargo": primeros["Cargo"],
+        "Abono": primeros["Abono"],
+        "Movimiento": primeros.index,
+    }).reset_index(drop=True)
 
 def inicializar_movimientos(df_movimientos):
-    df_movimientos["Movimiento"] = 0
-    numero_movimiento = 0
-    for i in range(0,df_movimientos.shape[0]):
-        operacion = df_movimientos.iloc[i,0]
-        if re.search(r"\d{1,2}\/\w{3}",operacion):
-            numero_movimiento += 1
-        df_movimientos.iloc[i,5] = numero_movimiento
-    return df_movimientos
-
-def unificar_movimientos(df):
-    df = df.copy()
-    descripcion = ""
-    for index,fila in df.iterrows():
-        descripcion = descripcion + "|" + fila["Descripcion"]
-
-    try:
-        referencia = df.iloc[1,3]
-    except:
-        referencia = " - "
-    moviemiento = {"Operacion":df.iloc[0,0],"Fecha":df.iloc[0,1],"Descripcion":descripcion,"Referencia":referencia, "Cargo":df.iloc[0,3],"Abono":df.iloc[0,4],"Movimiento":df.iloc[0,5]}
-    return moviemiento
+    """Número de movimiento: cuántos inicios "dd/MMM" hay hasta cada renglón (0 antes del primero)."""
+    inicios = df_movimientos["Operacion"].str.contains(RE_INICIO_MOVIMIENTO)
+    return df_movimientos.assign(Movimiento=inicios.cumsum().astype("int64"))
 
 def extraer_fecha_primera_pagina(pagina):
-    texto = pagina.extract_text().replace("\n","").replace(" ","")
-    periodo = re.findall(r"PeriodoDEL\d{2}\/\d{2}\/\d{4}AL\d{2}\/\d{2}\/\d{4}",texto)[0]
-    anio = re.findall(r"\d{2}\/\d{2}\/\d{4}",periodo)[0].split("/")[-1]
-    return anio
-
-def incluir_anios(df_movimientos,anio_inicio):
-    campo_fecha=0
-    df_movimientos = incluir_anio(df_movimientos,anio_inicio,campo_fecha)
-    campo_fecha=1
-    df_movimientos = incluir_anio(df_movimientos,anio_inicio,campo_fecha)
-    return df_movimientos
-
-def incluir_anio(df,anio_inicio,campo_fecha):
-    meses = []
-    for i in range(0,df.shape[0]):
-        operacion =re.findall(r"\d{1,2}\/\w{3}",df.iloc[i,campo_fecha])
-        if operacion:
-            mes = re.findall(r"\w{3}",operacion[0])
-            meses.append(mes)
-    try:
-        if meses[0][0] == "DIC":
-            for i in range(0,df.shape[0]):
-                operacion =re.findall(r"DIC",df.iloc[i,campo_fecha])
-                if(operacion):
-                    df.iloc[i,campo_fecha] += str(anio_inicio)
-                else:
-                    df.iloc[i,campo_fecha] += str(int(anio_inicio)+1)
-        else:
-            for i in range(0,df.shape[0]):
-                df.iloc[i,campo_fecha] += "/" + str(int(anio_inicio))
-    except:
-        pass
-    return df
+    """Fecha de inicio del periodo ("Periodo DEL dd/mm/aaaa AL dd/mm/aaaa")."""
+    texto = instantanea(pagina).texto
+    inicio = RE_PERIODO.search(texto).group(1)
+    return pd.to_datetime(inicio, format="%d/%m/%Y")
+
+def incluir_anios(df_movimientos, inicio_periodo):
+    """Agrega las fechas de operación y de liquidación completas (datetime64)."""
+    return df_movimientos.assign(
+        FechaOperacion=fechas_movimiento(df_movimientos["Operacion"], inicio_periodo),
+        FechaLiquidacion=fechas_movimiento(df_movimientos["Fecha"], inicio_periodo),
+    )
+
+def fechas_movimiento(columna, inicio_periodo):
+    """
+    Convierte los "dd/MMM" de la columna en fechas con el año del periodo. Los
+    meses a más de medio año del mes de inicio son del año siguiente si quedan
+    antes (liquidación en enero de un periodo de diciembre) o del anterior si
+    quedan después (operación en diciembre de un periodo de enero); lo que no
+    es fecha queda NaT.
+    """
+    partes = columna.str.extract(RE_FECHA_MOVIMIENTO)
+    dia = pd.to_numeric(partes[0], errors="coerce")
+    mes = partes[1].str.upper().map(MESES).astype("float64")
+    if inicio_periodo is None or pd.isna(inicio_periodo):
+        anio = np.nan
+    else:
+        distancia = inicio_periodo.month - mes
+        anio = inicio_periodo.year + (distancia > 6).astype(int) - (distancia < -6).astype(int)
+    return pd.to_datetime(pd.DataFrame({"year": anio, "month": mes, "day": dia}, index=columna.index),
+                          errors="coerce")
 
 
 def analizar_estados(documento):
+    return unificar_filas(concatenar_filas(filas_paginas(instantaneas(documento))))
+
+
+def filas_paginas(paginas):
     movimientos = False
-    df_movimientos = pd.DataFrame()
-    anio_inicio = ""
-    for index, pagina in enumerate(documento.pages):
-        # Extraer texto de la página
-        texto = pagina.extract_text().replace("\n", "").replace(" ", "")
-        
+    inicio_periodo = None
+    for index, pagina in enumerate(paginas):
         # Busca coincidencias en el texto para identificar el tipo de pagina y aplicar la función correspondiente a cada uno
-        if re.search("DetalledeMovimientosRealizados", texto) and re.search("OPERLIQ", texto):
+        if pagina.contiene("DetalledeMovimientosRealizados", "OPERLIQ"):
             movimientos = True
             # Extraer Fecha o Periodo
             df = operar_pagina(pagina)
             df = limpiar_primera_pagina(df)
-            anio_inicio = extraer_fecha_primera_pagina(pagina)
-            df = incluir_anios(df, anio_inicio)
-            df_movimientos = pd.concat([df_movimientos, df], ignore_index=True)
+            inicio_periodo = extraer_fecha_primera_pagina(pagina)
+            df = incluir_anios(df, inicio_periodo)
+            yield df
             continue
         
-        elif re.search("TotaldeMovimientos", texto) and re.search("TOTALMOVIMIENTOSCARGOS", texto):
+        elif pagina.contiene("TotaldeMovimientos", "TOTALMOVIMIENTOSCARGOS"):
             df = operar_pagina(pagina)
             df = limpiar_ultima_pagina(df)
-            df = incluir_anios(df, anio_inicio)
-            df_movimientos = pd.concat([df_movimientos, df], ignore_index=True)
+            df = incluir_anios(df, inicio_periodo)
+            yield df
             movimientos = False
             continue
         
         if movimientos:
             df = operar_pagina(pagina)
             df = limpiar_paginas(df)
-            df = incluir_anios(df, anio_inicio)
-            df_movimientos = pd.concat([df_movimientos, df], ignore_index=True)
-        
+            df = incluir_anios(df, inicio_periodo)
+            yield df
+
+
+def unificar_filas(df_movimientos):
     df_movimientos = correccion_abono_cargo(df_movimientos)
     df_movimientos = inicializar_movimientos(df_movimientos)
     df_movimientos = unificar_tabla(df_movimientos)
@@ -285,103 +253,74 @@ def analizar_estados(documento):
     return df_movimientos
 
 
+@etapa("clasificacion")
 def analisis_movimientos(df):
-    df = df.copy()
-    df = analisis_tipo_movimiento(df)
-    df = analisis_contraparte(df)
-    df = analisis_institucion_contraparte(df)
-    df = analisis_concepto(df)
+    df = clasificar_movimientos(df)
     df = normalizar_tabla(df)
     return df
 
 def normalizar_tabla(df):
-    df = df.drop('Movimiento', axis=1)
-    df = df.drop('Fecha', axis=1)
+    df = df.drop(['Movimiento', 'Operacion', 'Fecha', 'FechaLiquidacion'], axis=1)
     df["Saldo"] = ""
-    df = df.rename(columns={"Operacion": "Fecha", "Descripcion": "Concepto", "Referencia": "Origen", "Cargo": "Retiro", "Abono": "Deposito"})
+    df = df.rename(columns={"FechaOperacion": "Fecha", "Descripcion": "Concepto", "Referencia": "Origen", "Cargo": "Retiro", "Abono": "Deposito"})
     df = df[['Fecha', 'Concepto', 'Origen', 'Deposito', 'Retiro','Saldo','TipoMovimiento','Contraparte','InstitucionContraparte','ConceptoMovimiento']]
     return df
 
 
-def analisis_concepto(df):
-    df["ConceptoMovimiento"] = ""
-    for index,row in df.iterrows():
-        descripciones = row["Descripcion"]
-        descripcion= "-"
-        tipo = row["TipoMovimiento"]
-        if re.search("SPEI",tipo):
-            contador_concepto = descripciones.count("|")
-            if contador_concepto > 2:
-                descripcion = descripciones.split("|")[2]
-                if re.search(r"\d{7}",descripcion):
-                    descripcion = descripcion.replace(re.search(r"\d{7}",descripcion).group(),"")
-        df.loc[index,"ConceptoMovimiento"] = descripcion
-
-    return df
-
-def analisis_institucion_contraparte(df):
-    df["InstitucionContraparte"] = ""
-    for index,row in df.iterrows():
-        conceptos= row["Descripcion"].split("|")
-        tipo = row["TipoMovimiento"]
-        banco = "Sin Contraparte"
-        concepto = conceptos[1]
-        if re.search("SPEI RECIBIDO",concepto):
-            banco = concepto.replace("SPEI RECIBIDO","")
-        elif re.search("SPEI ENVIADO",concepto):
-            banco = concepto.replace("SPEI ENVIADO","")
-        elif re.search("SPEI DEVUELTO",concepto):
-            banco = concepto.replace("SPEI DEVUELTO","")
-        df.loc[index,"InstitucionContraparte"] = banco
-    return df
-            
-            
-            
-
-
-
-def analisis_contraparte(df):
-    df["Contraparte"] = ""
-    for index,row in df.iterrows():
-        concepto = row["Descripcion"]
-        tipo = row["TipoMovimiento"]
-        contraparte="-"
-
-        if re.search("SPEI",tipo) :
-            contador_concepto = concepto.count("|")
-            if contador_concepto > 2:
-                contraparte = concepto.split("|")[-1]
-            else:
-                contraparte = "SPEI CON ERROR"
-        elif re.search("COMPRA",tipo):
-            contraparte = concepto.split("|")[1]
-        elif re.search("PAGO",concepto) and re.search("TERCERO",concepto):
-            if re.search(r"\w{4} \d{10}",concepto):
-                contraparte = re.search(r"\w{4} \d{10}",concepto).group()
-
-        df.loc[index,"Contraparte"] = contraparte
-    return df
-
-def analisis_tipo_movimiento(df):
-    df["TipoMovimiento"] = ""
-    for index,row in df.iterrows():
-         
-        concepto = row["Descripcion"].split("|")[1]
-        if re.search("SPEI",concepto):
-            df.loc[index,"TipoMovimiento"] = "SPEI"
-        elif re.search("DEPOSITO",concepto):
-            df.loc[index,"TipoMovimiento"] = "DEPOSITO"
-        elif re.search("PAGO",concepto):
-            df.loc[index,"TipoMovimiento"] = "PAGO"
-        elif re.search("RFC",row["Descripcion"]):
-            df.loc[index,"TipoMovimiento"] = "COMPRA"
-        elif re.search("COM",row["Descripcion"]) and not re.search("IVA",concepto):
-            df.loc[index,"TipoMovimiento"] = "COMISION"
-        elif re.search("IVA",row["Descripcion"]):
-            df.loc[index,"TipoMovimiento"] = "IVACOMISION"
-        else:
-            df.loc[index,"TipoMovimiento"] = "OTRO"
-    return df
+def clasificar_movimientos(df):
+    """Agrega TipoMovimiento, Contraparte, InstitucionContraparte y ConceptoMovimiento en una sola pasada."""
+    clasificados = [clasificar_movimiento(descripcion) for descripcion in df["Descripcion"]]
+    columnas = list(zip(*clasificados)) if clasificados else [[]] * len(COLUMNAS_CLASIFICACION)
+    return df.assign(**dict(zip(COLUMNAS_CLASIFICACION, map(list, columnas))))
+
+def clasificar_movimiento(descripcion):
+    """
+    Clasifica un movimiento a partir de su descripción ("|renglón 1|renglón 2|...").
+    El concepto es el primer renglón; en los SPEI el segundo es el concepto
+    del pago y el último la contraparte.
+    """
+    renglones = descripcion.split("|")
+    concepto = renglones[1]
+    spei_completo = len(renglones) > 3
+
+    if "SPEI" in concepto:
+        tipo = "SPEI"
+    elif "DEPOSITO" in concepto:
+        tipo = "DEPOSITO"
+    elif "PAGO" in concepto:
+        tipo = "PAGO"
+    elif "RFC" in descripcion:
+        tipo = "COMPRA"
+    elif "COM" in descripcion and "IVA" not in concepto:
+        tipo = "COMISION"
+    elif "IVA" in descripcion:
+        tipo = "IVACOMISION"
+    else:
+        tipo = "OTRO"
+
+    contraparte = "-"
+    concepto_movimiento = "-"
+    if tipo == "SPEI":
+        contraparte = renglones[-1] if spei_completo else "SPEI CON ERROR"
+        if spei_completo:
+            concepto_movimiento = renglones[2]
+            referencia = RE_REFERENCIA_SPEI.search(concepto_movimiento)
+            if referencia:
+                concepto_movimiento = concepto_movimiento.replace(referencia.group(), "")
+    elif tipo == "COMPRA":
+        contraparte = concepto
+    elif "PAGO" in descripcion and "TERCERO" in descripcion:
+        cuenta = RE_CUENTA_TERCERO.search(descripcion)
+        if cuenta:
+            contraparte = cuenta.group()
+
+    institucion = "Sin Contraparte"
+    for prefijo in PREFIJOS_SPEI:
+        if prefijo in concepto:
+            institucion = concepto.replace(prefijo, "")
+            break
+
+    return tipo, contraparte, institucion, concepto_movimiento
 
 
 class BBVAExtractor:
@@ -393,30 +332,53 @@ class BBVAExtractor:
     months_pattern: str = '|'.join(months)
     double_date_pattern: str = rf"\b\d{{2}}[/I]?({months_pattern})\b\s+\d{{2}}[/I]?({months_pattern})\b"
     money_regex: str = r'\b\d{1,3}(?:,\d{3})*\.\d{2}\b'
+    # Se descarta lo que queda arriba de esta altura en la página 1 (resumen)
+    first_page_cutoff: float = 0.65
+    # Inicio de la tabla de movimientos en las palabras del PDF, en orden de lectura
+    table_headers: Tuple[Tuple[str, ...], ...] = (("Detalle", "de", "Movimientos"), ("OPER", "LIQ"))
 
-    def __init__(self, text: str, ocr: dict):
+    def __init__(self, text: str, ocr: dict, first_page_cutoff: Optional[float] = first_page_cutoff):
         self.text = text
         self.ocr  = ocr
+        self.first_page_cutoff = first_page_cutoff
         self.flattened_ocr: pd.DataFrame = pd.DataFrame()
+        self.amount_index: Dict[str, Deque[int]] = {}
+        self._used_words: np.ndarray = np.zeros(0, dtype=bool)
 
     def _flatten_ocr(self) -> None:
-        """Aplana el OCR en un DataFrame ['word','geometry']"""
-        words: List[tuple] = []
-        for page_index, page in enumerate(self.ocr, 1):
-            for item in page['items']:
-                for block in item['blocks']:
-                    for line in block['lines']:
-                        for word in line['words']:
-                            words.append((word['value'], word['geometry'], page_index))
-        self.flattened_ocr = pd.DataFrame(words, columns=['word','geometry','page'])
-        self.flattened_ocr['x0'] = self.flattened_ocr['geometry'].apply(lambda g: g[0])
-        self.flattened_ocr['y0'] = self.flattened_ocr['geometry'].apply(lambda g: g[1])
-        self.flattened_ocr['x1'] = self.flattened_ocr['geometry'].apply(lambda g: g[2])
-        self.flattened_ocr['y1'] = self.flattened_ocr['geometry'].apply(lambda g: g[3])
+        """Aplana el OCR en un DataFrame ['word','geometry','page','x0','y0','x1','y1']"""
+        self.flattened_ocr = aplanar_ocr(self.ocr).a_dataframe()
         self.flattened_ocr.sort_values(by=['page','y0','x0'], inplace=True)
-        self.flattened_ocr = self.flattened_ocr[~((self.flattened_ocr['page']==1) & (self.flattened_ocr['y0']<0.65))]
+        if self.first_page_cutoff is not None:
+            self.flattened_ocr = self.flattened_ocr[
+                ~((self.flattened_ocr['page']==1) & (self.flattened_ocr['y0']<self.first_page_cutoff))
+            ]
         self.flattened_ocr.reset_index(drop=True, inplace=True)
 
+    @staticmethod
+    def _normalize_amount(amount: str) -> str:
+        return amount.replace(',', '')
+
+    def _index_amounts(self) -> None:
+        """Índice monto normalizado -> cola FIFO de palabras del OCR que lo contienen, en orden de lectura"""
+        index: Dict[str, Deque[int]] = defaultdict(deque)
+        for position, word in enumerate(self.flattened_ocr['word']):
+            for amount in re.findall(self.money_regex, str(word)):
+                index[self._normalize_amount(amount)].append(position)
+        self.amount_index = dict(index)
+        self._used_words = np.zeros(len(self.flattened_ocr), dtype=bool)
+
+    def _take_amount_geometry(self, amount: str) -> list:
+        """Geometría de la siguiente palabra sin usar con ese monto ([] si no hay); la marca como usada"""
+        queue = self.amount_index.get(self._normalize_amount(amount))
+        while queue:
+            position = queue.popleft()
+            # Una palabra con dos montos está en dos colas
+            if not self._used_words[position]:
+                self._used_words[position] = True
+                return self.flattened_ocr['geometry'].iat[position]
+        return []
+
     def _split_text(self) -> List[str]:
         """Divide el texto en fragmentos que empiezan con un par de fechas"""
         matches = list(re.finditer(self.double_date_pattern, self.text))
@@ -439,15 +401,8 @@ class BBVAExtractor:
             fecha = re.search(self.double_date_pattern, fragment).group().split()[0]
             # 💰 Montos con dos decimales
             montos = re.findall(self.money_regex, fragment)
-            # 📐 Geometrías
-            geoms = self.flattened_ocr.loc[
-                self.flattened_ocr['word'].str.contains(montos[0], flags=re.IGNORECASE, regex=True)
-            ]['geometry'].tolist()
-            # limpiamos para no volver a reutilizar
-            if len(geoms) != 0:
-                geoms = geoms[0]
-                index = self.flattened_ocr.index[self.flattened_ocr['word'] == montos[0]][0]
-                self.flattened_ocr = self.flattened_ocr.drop(index)
+            # 📐 Geometría de la primera palabra del OCR con ese monto (se consume)
+            geoms = self._take_amount_geometry(montos[0])
 
             bbva_index = fragment.find('BBVA MEXICO')
             if bbva_index != -1:
@@ -490,13 +445,46 @@ class BBVAExtractor:
     def extract(self) -> pd.DataFrame:
         """Método interno que corre todo el pipeline"""
         self._flatten_ocr()
+        self._index_amounts()
         partes = self._split_text()
         return self._build_dataframe(partes)
 
     @classmethod
-    def parse(cls, text: str, ocr: dict) -> pd.DataFrame:
+    def parse(cls, text: str, ocr) -> pd.DataFrame:
         """
         INTERFAZ PRINCIPAL ► Pasa solo text y ocr, devuelve el DataFrame listo.
+        ``ocr`` es el OCR de docTR (páginas o ruta al JSON) o un ``PalabrasOCR``.
         """
         extractor = cls(text, ocr)
-        return extractor.extract()
\ No newline at end of file
+        return extractor.extract()
+
+    @classmethod
+    def parse_pdf(cls, path_or_pdf) -> pd.DataFrame:
+        """
+        Variante sin OCR para PDFs digitales: el texto y la posición de cada
+        monto salen de las mismas palabras de pdfplumber (``ocr.palabras_pdf``),
+        normalizadas por el tamaño de la página igual que la geometría de docTR.
+        En la página 1 el corte es el encabezado de la tabla de movimientos
+        (``table_headers``), así los montos del resumen no se toman como los de
+        un movimiento; si no aparece se usa ``first_page_cutoff``.
+        """
+        textos: List[str] = []
+        with abrir_documento(path_or_pdf) as documento:
+            paginas = (pagina.pagina for pagina in instantaneas(documento, liberar=True))
+            palabras = palabras_pdf(paginas, textos)
+        corte = cls._table_top(palabras)
+        if corte is None:
+            corte = cls.first_page_cutoff
+        return cls("\n".join(textos), palabras, first_page_cutoff=corte).extract()
+
+    @classmethod
+    def _table_top(cls, palabras: PalabrasOCR) -> Optional[float]:
+        """y0 del primer encabezado de la tabla de movimientos en la página 1 (None si no aparece)."""
+        primera = palabras.page == 1
+        textos = palabras.word[primera].tolist()
+        y0 = palabras.y0[primera]
+        for i in range(len(textos)):
+            for encabezado in cls.table_headers:
+                if tuple(textos[i:i + len(encabezado)]) == encabezado:
+                    return float(y0[i])
+        return None
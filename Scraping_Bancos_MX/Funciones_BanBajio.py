@@ -1,6 +1,9 @@
 import pandas as pd
 import re
-import pdfplumber
+
+from .cache import con_cache
+from .instrumentacion import etapa
+from .documentos import abrir_documento
 
 MARCADORES_CORTE_TEXTO = ["SALDO TOTAL*", "TOTAL DE MOVIMIENTOS EN EL PERIODO", "RESUMEN DEL PERIODO"]
 MARCADORES_FIN_MOVIMIENTOS = [
@@ -18,8 +21,10 @@ MARCADORES_FIN_MOVIMIENTOS = [
 RE_FECHA_CORTA = re.compile(r"\d{1,2}\ \w{3}")
 RE_REFERENCIA = re.compile(r"\b\d{7,}\b")
 
+@con_cache("BanBajio")
+@etapa("total")
 def Scrap_Estado(ruta_archivo):
-    with pdfplumber.open(ruta_archivo) as estado:
+    with abrir_documento(ruta_archivo) as estado:
         tabla = analizar_estado(estado)
     tabla = analisis_movimientos(tabla)
     tabla = formatear_tabla(tabla)
@@ -140,6 +145,7 @@ def unificar_movimiento(df):
     moviemiento = {"Descripcion":descripcion,"Movimiento":df.iloc[0,1],"Monto":df.iloc[0,2],"Saldo":df.iloc[0,3]}
     return moviemiento
 
+@etapa("movimientos")
 def unificar_tabla(movimmientos):
     if movimmientos.empty:
         return pd.DataFrame(columns=["Descripcion", "Movimiento", "Monto", "Saldo"])
@@ -274,6 +280,7 @@ def normalizar_tabla(df):
     df = df[['Fecha', 'Concepto', 'Origen', 'Deposito', 'Retiro','Saldo','TipoMovimiento','Contraparte','InstitucionContraparte','ConceptoMovimiento']]
     return df
 
+@etapa("clasificacion")
 def analisis_movimientos(df):
     df = df.copy()
     df = analisis_tipo_movimiento(df)
@@ -1,9 +1,14 @@
 import re
 
-import pdfplumber
-import numpy as np
 import pandas as pd
 
+from .columnas import agrupar_caracteres, unir_renglones
+from .paginas import instantaneas, texto_compacto
+from .cache import con_cache
+from .instrumentacion import etapa
+from .documentos import abrir_documento
+from .flujo import concatenar_filas, inicios_seguros
+
 RE_SPEI = re.compile(r"SPEI")
 RE_TRA_INT = re.compile(r"TRA|INT")
 RE_IVA = re.compile(r"IVA")
@@ -15,14 +20,31 @@ RE_PAGE = re.compile(r"Page")
 RE_FECHA = re.compile(r"\d{2}")
 RE_NOSPACE = re.compile(r"\s+")
 TABLE_SENTINEL = "DIACONCEPTOCARGOSABONOSSALDO"
+COLUMNAS_FILAS = ["Fecha", "Concepto", "Origen", "Deposito", "Retiro", "Saldo", "Top"]
+# Rangos de x1 por columna: Día, Concepto, Cargos, Abonos, Saldo
+BORDES_COLUMNAS = ((34, 50), (50, 341), (341, 420), (420, 500), (500, 577))
+NOMBRES_COLUMNAS = {0: "Fecha", 1: "Concepto", 2: "Deposito", 3: "Retiro", 4: "Saldo"}
 
+@con_cache("BanRegio")
+@etapa("total")
 def Scrap_Estado(ruta_archivo):
-    with pdfplumber.open(ruta_archivo) as estado:
-        tabla = analizar_estados(estado)
+    with abrir_documento(ruta_archivo) as estado:
+        filas = concatenar_filas(filas_paginas(instantaneas(estado)))
+    return procesar_filas(filas)
+
+
+def procesar_filas(filas):
+    """Renglones crudos de movimientos completos -> tabla final (ver flujo.iter_movimientos)."""
+    tabla = unificar_filas(filas)
     tabla = analisis_movimientos(tabla)
     tabla = formatear_tabla(tabla)
     return tabla
-    
+
+
+def inicios_movimiento(filas):
+    # unificar_variaciones_altura pasa la fecha de un renglón sin concepto al siguiente
+    return inicios_seguros(filas["Fecha"].astype(str).str.match(RE_FECHA), filas["Concepto"])
+
 
 def formatear_tabla(df):
     # Normalizamos solo para tener: ['fecha', 'descripcion', 'deposito', 'retiro', 'saldo']
@@ -51,6 +73,7 @@ def formatear_tabla(df):
 
     return df[["fecha", "descripcion", "deposito", "retiro", "saldo"]]
 
+@etapa("clasificacion")
 def analisis_movimientos(df):
     df = df.copy()
     df = analisis_tipo_movimiento(df)
@@ -131,17 +154,19 @@ def analisis_tipo_movimiento(df):
     return df
 
 def analizar_estados(estado):
-    movimientos_paginas = []
+    return unificar_filas(concatenar_filas(filas_paginas(instantaneas(estado))))
+
+
+def filas_paginas(paginas):
     en_tabla = False
 
-    for pagina in estado.pages:
-        caracteres = pagina.chars
-        if not caracteres:
+    for pagina in paginas:
+        if not len(pagina):
             if en_tabla:
                 break
             continue
 
-        texto = normalizar_texto_chars(caracteres)
+        texto = pagina.texto
 
         contiene_tabla = (
             TABLE_SENTINEL in texto
@@ -150,7 +175,7 @@ def analizar_estados(estado):
         )
 
         if not contiene_tabla:
-            texto_fallback = RE_NOSPACE.sub("", pagina.extract_text_simple() or "")
+            texto_fallback = RE_NOSPACE.sub("", pagina.pagina.extract_text_simple() or "")
             contiene_tabla = (
                 TABLE_SENTINEL in texto_fallback
                 and "GráficoTransaccional" not in texto_fallback
@@ -161,17 +186,16 @@ def analizar_estados(estado):
 
         if contiene_tabla:
             en_tabla = True
-            movimientos = extraer_movimientos_pagina(caracteres, texto)
-            movimientos_paginas.append(movimientos)
+            yield extraer_movimientos_pagina(pagina.arreglos, texto)
             continue
 
         if en_tabla:
             break
 
-    if movimientos_paginas:
-        df = pd.concat(movimientos_paginas, ignore_index=True)
-    else:
-        df = pd.DataFrame(columns=["Fecha", "Concepto", "Origen", "Deposito", "Retiro", "Saldo", "Top"])
+
+def unificar_filas(df):
+    if df.empty:
+        df = pd.DataFrame(columns=COLUMNAS_FILAS)
     df = df.reset_index(drop=True)
     df = unificar_variaciones_altura(df)
     df = incluir_movimientos(df)
@@ -180,9 +204,7 @@ def analizar_estados(estado):
 
 
 def normalizar_texto_chars(caracteres):
-    ordenados = sorted(caracteres, key=lambda c: (round(c.get("top", 0.0), 1), c.get("x0", c.get("x1", 0.0))))
-    texto = "".join(c.get("text", "") for c in ordenados)
-    return RE_NOSPACE.sub("", texto)
+    return texto_compacto(caracteres)
 
 
 
@@ -213,6 +235,7 @@ def unificar_movimiento(df):
     moviemiento = {"Fecha": df.iloc[0,0], "Concepto": concepto, "Origen": df.iloc[0,2], "Deposito": df.iloc[0,3], "Retiro": df.iloc[0,4], "Saldo": df.iloc[0,5],"Movimiento": df.iloc[0,6]}
     return moviemiento
 
+@etapa("movimientos")
 def unificar_tabla(df):
     if df.empty:
         return pd.DataFrame(columns=["Fecha", "Concepto", "Origen", "Deposito", "Retiro", "Saldo", "Movimiento"])
@@ -260,26 +283,9 @@ def incluir_anio_mes(filas,texto):
 
 
 
+@etapa("columnas")
 def agrupar_columnas(caracteres):
-    if not caracteres:
-        return pd.DataFrame(columns=["Caracter", "Top", "X", "Columna"])
-
-    columnas = pd.DataFrame(caracteres)[["text", "top", "x1"]].rename(columns={"text": "Caracter", "top": "Top", "x1": "X"})
-    columnas["Top"] = columnas["Top"].round(4)
-
-    x = columnas["X"]
-    columnas["Columna"] = np.select(
-        [
-            (x >= 34) & (x <= 50),
-            (x > 50) & (x <= 341),
-            (x > 341) & (x <= 420),
-            (x > 420) & (x <= 500),
-            (x > 500) & (x <= 577),
-        ],
-        [0, 1, 2, 3, 4],
-        default=-1,
-    )
-    return columnas[columnas["Columna"] >= 0]
+    return agrupar_caracteres(caracteres, BORDES_COLUMNAS, decimales_top=4)
 
 def unificar_columna(top):
     top = top.sort_values(by=["X"])
@@ -302,25 +308,11 @@ def unificar_columna(top):
     fila = {"Fecha": fecha, "Concepto": concepto, "Origen": "", "Deposito": deposito, "Retiro": retiro, "Saldo": saldo, "Top": top["Top"].max()}
     return fila
 
+@etapa("renglones")
 def unificar_columnas(columnas):
-    if columnas.empty:
-        return pd.DataFrame(columns=["Fecha", "Concepto", "Origen", "Deposito", "Retiro", "Saldo", "Top"])
-
-    col_ordenadas = columnas.sort_values(["Top", "X"])
-    pivot = col_ordenadas.groupby(["Top", "Columna"], sort=False)["Caracter"].agg("".join).unstack(fill_value="")
-
-    filas = pd.DataFrame(
-        {
-            "Fecha": pivot.get(0, ""),
-            "Concepto": pivot.get(1, ""),
-            "Origen": "",
-            "Deposito": pivot.get(2, ""),
-            "Retiro": pivot.get(3, ""),
-            "Saldo": pivot.get(4, ""),
-            "Top": pivot.index,
-        }
-    ).reset_index(drop=True)
-    return filas.sort_values(by=["Top"])
+    filas = unir_renglones(columnas, NOMBRES_COLUMNAS)
+    filas.insert(2, "Origen", "")
+    return filas
 
 def eliminar_movimientos_no_deseados(filas):
     filas = filas.reset_index(drop=True)
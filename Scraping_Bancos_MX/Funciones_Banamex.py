@@ -1,7 +1,12 @@
 import re
-import pdfplumber
 import pandas as pd
 
+from .cache import con_cache
+from .instrumentacion import etapa
+from .documentos import abrir_documento
+
+@con_cache("Banamex")
+@etapa("total")
 def Scrap_Estado(ruta_archivo):
     df = procesar_pdf(ruta_archivo)
     df.columns = [col.lower() for col in df.columns]
@@ -54,7 +59,7 @@ def dist(a, b):
     return abs(a - b)
 
 def procesar_pdf(pdf_path):
-    with pdfplumber.open(pdf_path) as pdf:
+    with abrir_documento(pdf_path) as pdf:
 
         if len(pdf.pages) == 0:
             raise Exception("El PDF está vacío.")
@@ -2,9 +2,18 @@ import re
 from dataclasses import dataclass
 from typing import List, Dict, Optional, Tuple
 
-import pdfplumber
 import pandas as pd
 
+from .cache import con_cache
+from .instrumentacion import etapa
+from .documentos import abrir_documento
+
+
+@con_cache("Bancoppel")
+@etapa("total")
+def Scrap_Estado(ruta_archivo):
+    return BancoppelMovimientosExtractor().run(ruta_archivo)
+
 
 @dataclass
 class BancoppelMovimientosExtractor:
@@ -21,7 +30,7 @@ class BancoppelMovimientosExtractor:
     def read_pdf_text(self, pdf_path: str) -> List[str]:
         """Lee el PDF y regresa una lista con el texto de cada página."""
         all_text: List[str] = []
-        with pdfplumber.open(pdf_path) as pdf:
+        with abrir_documento(pdf_path) as pdf:
             for page in pdf.pages:
                 text = page.extract_text() or ""
                 all_text.append(text)
@@ -140,6 +149,7 @@ class BancoppelMovimientosExtractor:
         
         return movimientos_df[['fecha', 'descripcion', 'retiro', 'deposito', 'saldo']]
 
+    @con_cache("Bancoppel", argumento=1)
     def run(self, pdf_path: str) -> pd.DataFrame:
         """Ejecuta el pipeline completo."""
         all_text = self.read_pdf_text(pdf_path)
@@ -1,9 +1,13 @@
 import re
 from typing import Tuple, Optional
 
-import pdfplumber
+import numpy as np
 import pandas as pd
 
+from .columnas import arreglos_caracteres, asignar_columnas
+from .cache import con_cache
+from .instrumentacion import etapa
+from .documentos import abrir_documento
 
 # Límites de columnas del PDF de Banjercito (x0, x1) obtenidos de los
 # rectángulos del encabezado de la tabla "DETALLE DE MOVIMIENTOS".
@@ -17,6 +21,8 @@ COL_BOUNDS = {
     "abonos":     (441, 516),
     "saldo":      (516, 590),
 }
+BORDES_COLUMNAS = tuple(COL_BOUNDS.values())
+NOMBRES_COLUMNAS = dict(enumerate(COL_BOUNDS))
 
 HAS_NUMERIC_RE = re.compile(r"^[\d,.]+$")
 
@@ -25,65 +31,57 @@ HAS_NUMERIC_RE = re.compile(r"^[\d,.]+$")
 # Funciones auxiliares
 # ---------------------------------------------------------------------------
 
-def _split_line_cols(line_chars: list) -> dict:
-    """Divide una línea en columnas con una sola pasada por los caracteres."""
-    values = {key: [] for key in COL_BOUNDS}
-
-    for c in line_chars:
-        x0 = c["x0"]
-        if x0 < COL_BOUNDS["dia_oper"][0] or x0 >= COL_BOUNDS["saldo"][1]:
-            continue
-
-        if x0 < COL_BOUNDS["dia_oper"][1]:
-            values["dia_oper"].append(c["text"])
-        elif x0 < COL_BOUNDS["dia_regis"][1]:
-            values["dia_regis"].append(c["text"])
-        elif x0 < COL_BOUNDS["concepto"][1]:
-            values["concepto"].append(c["text"])
-        elif x0 < COL_BOUNDS["usuario"][1]:
-            values["usuario"].append(c["text"])
-        elif x0 < COL_BOUNDS["referencia"][1]:
-            values["referencia"].append(c["text"])
-        elif x0 < COL_BOUNDS["cargos"][1]:
-            values["cargos"].append(c["text"])
-        elif x0 < COL_BOUNDS["abonos"][1]:
-            values["abonos"].append(c["text"])
-        else:
-            values["saldo"].append(c["text"])
-
-    return {k: "".join(v).strip() for k, v in values.items()}
-
-
-def _line_text(line_chars: list) -> str:
-    return "".join(c["text"] for c in line_chars).strip()
+def _numerar_lineas(tops: list, tol: float) -> np.ndarray:
+    """Numera las líneas sobre 'top' ordenados; cada línea se ancla en su primer caracter."""
+    ids = np.empty(len(tops), dtype=np.int64)
+    linea = 0
+    ancla = tops[0]
+    for i, top in enumerate(tops):
+        if abs(top - ancla) > tol:
+            linea += 1
+            ancla = top
+        ids[i] = linea
+    return ids
 
 
 def _group_lines(chars: list, tol: float = 1.5) -> list:
-    """Agrupa caracteres por su coordenada 'top' con tolerancia."""
+    """
+    Agrupa caracteres por su coordenada 'top' con tolerancia y divide cada
+    línea en columnas con una sola asignación vectorizada por página.
+    Devuelve una lista de (top, texto_linea, columnas).
+    """
     if not chars:
         return []
-    sorted_chars = sorted(chars, key=lambda c: (c["top"], c["x0"]))
-    lines: list = []
-    current_top = sorted_chars[0]["top"]
-    current_chars = [sorted_chars[0]]
-
-    for c in sorted_chars[1:]:
-        if abs(c["top"] - current_top) <= tol:
-            current_chars.append(c)
-        else:
-            lines.append((current_top, current_chars))
-            current_top = c["top"]
-            current_chars = [c]
-    lines.append((current_top, current_chars))
-    return lines
+    arreglos = arreglos_caracteres(chars)
+    orden = np.lexsort((arreglos.x0, arreglos.top))
+    tops = arreglos.top[orden]
+    lineas = _numerar_lineas(tops.tolist(), tol)
+
+    df = pd.DataFrame({
+        "linea": lineas,
+        "columna": asignar_columnas(arreglos.x0[orden], BORDES_COLUMNAS, cerrado="izquierda"),
+        "text": arreglos.text[orden],
+    })
+    textos = df.groupby("linea")["text"].agg("".join).str.strip()
+    valores = (
+        df[df["columna"] >= 0]
+        .groupby(["linea", "columna"])["text"]
+        .agg("".join)
+        .str.strip()
+        .unstack(fill_value="")
+        .reindex(index=textos.index, columns=list(NOMBRES_COLUMNAS), fill_value="")
+        .rename(columns=NOMBRES_COLUMNAS)
+    )
+    tops_lineas = tops[np.r_[0, np.flatnonzero(np.diff(lineas)) + 1]]
+    return list(zip(tops_lineas.tolist(), textos.tolist(), valores.to_dict("records")))
 
 
 def _find_data_start_index(lines: list) -> int:
     """Encuentra el índice donde inicia la data de movimientos."""
     header_idx = -1
 
-    for idx, (_top, line_chars) in enumerate(lines):
-        text = _line_text(line_chars).upper()
+    for idx, (_top, line_text, _cols) in enumerate(lines):
+        text = line_text.upper()
         if "DETALLE DE MOVIMIENTOS" in text:
             header_idx = idx
             continue
@@ -130,6 +128,8 @@ def _extraer_anio_mes(pdf) -> Tuple[str, str]:
     return "", ""
 
 
+@con_cache("Banjercito")
+@etapa("total")
 def Scrap_Estado(ruta_archivo: str) -> pd.DataFrame:
     """
     Extrae la tabla de movimientos de un estado de cuenta de Banjercito.
@@ -146,7 +146,7 @@ def Scrap_Estado(ruta_archivo: str) -> pd.DataFrame:
     """
     all_movements: list = []
 
-    with pdfplumber.open(ruta_archivo) as pdf:
+    with abrir_documento(ruta_archivo) as pdf:
         anio, _mes_corte = _extraer_anio_mes(pdf)
 
         for page in pdf.pages:
@@ -161,8 +161,7 @@ def Scrap_Estado(ruta_archivo: str) -> pd.DataFrame:
 
             current_movement = None
 
-            for _top, line_chars in lines[data_start:]:
-                cols = _split_line_cols(line_chars)
+            for _top, _line_text, cols in lines[data_start:]:
                 dia_oper = cols["dia_oper"]
                 dia_regis = cols["dia_regis"]
                 concepto = cols["concepto"]
@@ -1,13 +1,30 @@
 import re
 from typing import List, Tuple, Optional
 
-import pdfplumber
 import pandas as pd
-import time
 
+from .columnas import agrupar_caracteres, unir_renglones
+from .paginas import instantanea, instantaneas
+from .cache import con_cache
+from .instrumentacion import etapa
+from .documentos import abrir_documento
+from .flujo import concatenar_filas
+
+# Rangos de x1 por columna: Fecha, Descripción, Depósitos, Retiros, Saldo
+BORDES_COLUMNAS = ((50, 85), (85, 351), (351, 420), (420, 490), (490, 560))
+NOMBRES_COLUMNAS = {0: "Fecha", 1: "Concepto", 2: "Deposito", 3: "Retiro", 4: "Saldo"}
+RE_INICIO_MOVIMIENTO = re.compile(r"\d{2}-\w{3}-\d{2}")
+
+@con_cache("Banorte")
+@etapa("total")
 def Scrap_Estado(ruta_archivo):
-    estado = pdfplumber.open(ruta_archivo)
-    tabla = analizar_estados(estado)
+    with abrir_documento(ruta_archivo) as estado:
+        filas = concatenar_filas(filas_paginas(instantaneas(estado)))
+    return procesar_filas(filas)
+
+def procesar_filas(filas):
+    """Renglones crudos de movimientos completos -> tabla final (ver flujo.iter_movimientos)."""
+    tabla = unificar_filas(filas)
     tabla2 = analisis_movimientos(tabla)
     tabla2.columns = [col.lower() for col in tabla2.columns]
     tabla2['descripcion'] = tabla2['concepto'] + " | " + tabla2['origen'] + " | " + tabla2['conceptomovimiento']
@@ -34,9 +51,13 @@ def Scrap_Estado(ruta_archivo):
         print(f"Error al convertir saldo: {e}")
     return tabla2
 
+def inicios_movimiento(filas):
+    return filas["Fecha"].str.match(RE_INICIO_MOVIMIENTO)
+
             
 
 
+@etapa("clasificacion")
 def analisis_movimientos(df):
     df = df.copy()
     df = analisis_tipo_movimiento(df)
@@ -134,78 +155,39 @@ def analisis_tipo_movimiento(df):
     return df
 
 def analizar_estados(estado):
-    df = pd.DataFrame()
-    texto_paginas = [pagina.extract_text().replace("\n", "").replace(" ", "")  for pagina in estado.pages]
-    for i, pagina in enumerate(estado.pages, 1):
-        texto = texto_paginas[i-1]
+    return unificar_filas(concatenar_filas(filas_paginas(instantaneas(estado))))
+
+def filas_paginas(paginas):
+    for pagina in paginas:
+        texto = pagina.texto
         if re.search("FECHADESCRIPCIÓN/ESTABLECIMIENTO", texto):
-            movimientos = extraer_movimientos_pagina(pagina,texto)
-            df = pd.concat([df, pd.DataFrame(movimientos)])
+            yield extraer_movimientos_pagina(pagina,texto)
+
+def unificar_filas(df):
     df = df.reset_index(drop=True)
     df = incluir_movimientos(df)
     df = unificar_tabla(df)
-
     return df
 
 
 
     
 def extraer_movimientos_pagina(pagina,texto):
-    caracteres = pagina.chars
+    caracteres = instantanea(pagina).arreglos
     columnas = agrupar_columnas(caracteres)
     filas = unificar_columnas(columnas)
     filas = eliminar_movimientos_no_deseados(filas)
     return filas
 
+@etapa("columnas")
 def agrupar_columnas(caracteres):
-    columnas = []
-    for caracter in caracteres:
-        coordenada = (caracter["x1"])
-        if coordenada <= 85 and coordenada >= 50:
-            columnas.append({"Caracter": caracter["text"], "Top": round(caracter["top"],5),"X":caracter["x1"],"Columna": 0})
-        elif coordenada <= 351  and coordenada > 85:
-            columnas.append({"Caracter": caracter["text"], "Top": round(caracter["top"],5),"X":caracter["x1"],"Columna": 1})
-        elif coordenada <= 420  and coordenada > 351:
-            columnas.append({"Caracter": caracter["text"], "Top": round(caracter["top"],5),"X":caracter["x1"],"Columna": 2})
-        elif coordenada <= 490  and coordenada > 420:
-            columnas.append({"Caracter": caracter["text"], "Top": round(caracter["top"],5),"X":caracter["x1"],"Columna": 3})
-        elif coordenada <= 560  and coordenada > 490:
-            columnas.append({"Caracter": caracter["text"], "Top": round(caracter["top"],5),"X":caracter["x1"],"Columna": 4})
-    columnas = pd.DataFrame(columnas)
-    return columnas
+    return agrupar_caracteres(caracteres, BORDES_COLUMNAS, decimales_top=5)
 
+@etapa("renglones")
 def unificar_columnas(columnas):
-    if columnas.empty:
-        return pd.DataFrame(columns=["Fecha","Concepto","Origen","Deposito","Retiro","Saldo","Top"])
-
-    columnas = columnas.sort_values(["Top", "Columna", "X"], kind="mergesort")
-
-    wide = (columnas
-            .groupby(["Top", "Columna"], sort=False)["Caracter"]
-            .agg(''.join)
-            .unstack("Columna", fill_value=''))
-
-    for c in range(5):
-        if c not in wide.columns:
-            wide[c] = ""
-
-    wide = wide.rename(columns={
-        0: "Fecha",
-        1: "Concepto",
-        2: "Deposito",
-        3: "Retiro",
-        4: "Saldo"
-    })
-
-    wide["Origen"] = ""  # Columna vacía (placeholder)
-
-    # Orden y salida final
-    result = (wide
-              .reset_index()
-              .loc[:, ["Fecha","Concepto","Origen","Deposito","Retiro","Saldo","Top"]]
-              .sort_values("Top")
-              .reset_index(drop=True))
-    return result
+    filas = unir_renglones(columnas, NOMBRES_COLUMNAS)
+    filas.insert(2, "Origen", "")  # Columna vacía (placeholder)
+    return filas
 
 def eliminar_movimientos_no_deseados(filas):
     filas = filas.reset_index(drop=True)
@@ -230,7 +212,7 @@ def incluir_movimientos(df):
     df["Movimiento"] = 0
     contador_movimiento = 0
     for index, fila in df.iterrows():
-        if  re.match(r"\d{2}-\w{3}-\d{2}", fila["Fecha"]):
+        if  RE_INICIO_MOVIMIENTO.match(fila["Fecha"]):
             contador_movimiento += 1 
         df.loc[index,"Movimiento"] = contador_movimiento
     return df
@@ -243,6 +225,7 @@ def unificar_movimiento(df):
     moviemiento = {"Fecha": df.iloc[0,0], "Concepto": concepto, "Origen": df.iloc[0,2], "Deposito": df.iloc[0,3], "Retiro": df.iloc[0,4], "Saldo": df.iloc[0,5],"Movimiento": df.iloc[0,6]}
     return moviemiento
 
+@etapa("movimientos")
 def unificar_tabla(df):
     movimientos_unificados = []
     for movimiento in df["Movimiento"].unique():
@@ -4,6 +4,17 @@ from dataclasses import dataclass, asdict
 from typing import List, Dict, Optional, Pattern
 import pandas as pd
 
+from .cache import con_cache
+from .instrumentacion import etapa
+from .documentos import abrir_documento
+
+@con_cache("HSBC")
+@etapa("total")
+def Scrap_Estado(ruta_archivo):
+    with abrir_documento(ruta_archivo) as pdf:
+        texto = "\n".join(pagina.extract_text() or "" for pagina in pdf.pages)
+    return ParserHSBC(texto).to_dataframe()
+
 @dataclass
 class MovimientoHSBC:
     fecha: str
@@ -1,13 +1,36 @@
 import pandas as pd
 import re
-import pdfplumber
 
+from .columnas import agrupar_caracteres, unir_renglones
+from .paginas import instantanea, instantaneas
+from .cache import con_cache
+from .instrumentacion import etapa
+from .documentos import abrir_documento
+from .flujo import concatenar_filas, inicios_seguros
+
+# Rangos de x1 por columna: Día, Concepto, Cargos, Abonos, Saldo
+BORDES_COLUMNAS = ((34, 50), (50, 341), (341, 420), (420, 500), (500, 577))
+NOMBRES_COLUMNAS = {0: "Fecha", 1: "Concepto", 2: "Deposito", 3: "Retiro", 4: "Saldo"}
+RE_INICIO_MOVIMIENTO = re.compile(r"\d{2}")
+
+@con_cache("HeyBanco")
+@etapa("total")
 def Scrap_Estado(ruta_archivo):
-    estado = pdfplumber.open(ruta_archivo)
-    tabla = analizar_estados(estado)
+    with abrir_documento(ruta_archivo) as estado:
+        filas = concatenar_filas(filas_paginas(instantaneas(estado)))
+    return procesar_filas(filas)
+
+def procesar_filas(filas):
+    """Renglones crudos de movimientos completos -> tabla final (ver flujo.iter_movimientos)."""
+    tabla = unificar_filas(filas)
     tabla2 = analisis_movimientos(tabla)
     return tabla2
 
+def inicios_movimiento(filas):
+    # unificar_variaciones_altura pasa la fecha de un renglón sin concepto al siguiente
+    return inicios_seguros(filas["Fecha"].str.match(RE_INICIO_MOVIMIENTO), filas["Concepto"])
+
+@etapa("clasificacion")
 def analisis_movimientos(df):
     df = df.copy()
     df = analisis_tipo_movimiento(df)
@@ -92,16 +115,15 @@ def analisis_tipo_movimiento(df):
     return df
 
 def analizar_estados(estado):
-    df = pd.DataFrame()
-    anios = []
-    contador = 0
-    for pagina in estado.pages:
-        texto = pagina.extract_text()
-        texto = texto.replace("\n", "")
-        texto = texto.replace(" ", "")
+    return unificar_filas(concatenar_filas(filas_paginas(instantaneas(estado))))
+
+def filas_paginas(paginas):
+    for pagina in paginas:
+        texto = pagina.texto
         if re.search("DIACONCEPTOCARGOSABONOSSALDO", texto) and not re.search("AbreviaturasCheques", texto) and not re.search("REGIOCUENTA", texto):
-                movimientos = extraer_movimientos_pagina(pagina,texto)
-                df = pd.concat([df, pd.DataFrame(movimientos)])
+                yield extraer_movimientos_pagina(pagina,texto)
+
+def unificar_filas(df):
     df = df.reset_index(drop=True)
     df = unificar_variaciones_altura(df)
     df = incluir_movimientos(df)
@@ -131,6 +153,7 @@ def unificar_movimiento(df):
     moviemiento = {"Fecha": df.iloc[0,0], "Concepto": concepto, "Origen": df.iloc[0,2], "Deposito": df.iloc[0,3], "Retiro": df.iloc[0,4], "Saldo": df.iloc[0,5],"Movimiento": df.iloc[0,6]}
     return moviemiento
 
+@etapa("movimientos")
 def unificar_tabla(df):
     movimientos_unificados = []
     for movimiento in df["Movimiento"].unique():
@@ -142,14 +165,14 @@ def incluir_movimientos(df):
     df["Movimiento"] = 0
     contador_movimiento = 0
     for index, fila in df.iterrows():
-        if  re.match(r"\d{2}", fila["Fecha"]):
+        if  RE_INICIO_MOVIMIENTO.match(fila["Fecha"]):
             contador_movimiento += 1 
         df.loc[index,"Movimiento"] = contador_movimiento
     return df
 
 
 def extraer_movimientos_pagina(pagina,texto):
-    caracteres = pagina.chars
+    caracteres = instantanea(pagina).arreglos
     columnas = agrupar_columnas(caracteres)
     filas = unificar_columnas(columnas)
     filas = eliminar_movimientos_no_deseados(filas)
@@ -171,54 +194,14 @@ def incluir_anio_mes(filas,texto):
 
 
 
+@etapa("columnas")
 def agrupar_columnas(caracteres):
-    columnas = []
-    for caracter in caracteres:
-        coordenada = (caracter["x1"])
-        if coordenada <= 50 and coordenada >= 34:
-            columnas.append({"Caracter": caracter["text"], "Top": round(caracter["top"],4),"X":caracter["x1"],"Columna": 0})
-        elif coordenada <= 341  and coordenada > 50:
-            columnas.append({"Caracter": caracter["text"], "Top": round(caracter["top"],4),"X":caracter["x1"],"Columna": 1})
-        elif coordenada <= 420  and coordenada > 341:
-            columnas.append({"Caracter": caracter["text"], "Top": round(caracter["top"],4),"X":caracter["x1"],"Columna": 2})
-        elif coordenada <= 500  and coordenada > 420:
-            columnas.append({"Caracter": caracter["text"], "Top": round(caracter["top"],4),"X":caracter["x1"],"Columna": 3})
-        elif coordenada <= 577  and coordenada > 500:
-            columnas.append({"Caracter": caracter["text"], "Top": round(caracter["top"],4),"X":caracter["x1"],"Columna": 4})
-    columnas = pd.DataFrame(columnas)
-    return columnas
-
-def unificar_columna(top):
-    top = top.sort_values(by=["X"])
-    fecha = ""
-    concepto = ""
-    deposito = ""
-    retiro = ""
-    saldo = ""
-    for index, row in top.iterrows():
-        if row["Columna"] == 0:
-            fecha = fecha + row["Caracter"]
-        elif row["Columna"] == 1:
-            concepto = concepto + row["Caracter"]
-        elif row["Columna"] == 2:
-            deposito = deposito + row["Caracter"]
-        elif row["Columna"] == 3:
-            retiro = retiro + row["Caracter"]
-        elif row["Columna"] == 4:
-            saldo = saldo + row["Caracter"]
-    fila = {"Fecha": fecha, "Concepto": concepto, "Origen": "", "Deposito": deposito, "Retiro": retiro, "Saldo": saldo, "Top": top["Top"].max()}
-    return fila
+    return agrupar_caracteres(caracteres, BORDES_COLUMNAS, decimales_top=4)
 
+@etapa("renglones")
 def unificar_columnas(columnas):
-    tops = columnas["Top"].unique()
-    filas = []
-    for top in tops:
-        top = columnas[columnas["Top"] == top]
-        fila = unificar_columna(top)
-        filas.append(fila)
-    filas = pd.DataFrame(filas)
-    
-    filas = filas.sort_values(by=["Top"])
+    filas = unir_renglones(columnas, NOMBRES_COLUMNAS)
+    filas.insert(2, "Origen", "")  # Columna vacía (placeholder)
     return filas
 
 def eliminar_movimientos_no_deseados(filas):
@@ -2,15 +2,39 @@ import re
 from dataclasses import dataclass
 from typing import List, Dict, Optional
 
-import pdfplumber
 import pandas as pd
 
+from .columnas import agrupar_caracteres, unir_renglones
+from .paginas import instantanea, instantaneas
+from .cache import con_cache
+from .instrumentacion import etapa
+from .documentos import abrir_documento
+from .flujo import concatenar_filas, inicios_seguros
+
+# Rangos de x1 por columna: Fecha, Referencia, Concepto, Cargos, Abonos, Saldo
+BORDES_COLUMNAS = ((13, 47), (47, 106), (106, 366), (366, 430), (430, 496), (496, 566))
+# En el orden de columnas que esperan unificar_movimiento y unificar_tabla
+NOMBRES_COLUMNAS = {0: "Fecha", 2: "Concepto", 1: "Origen", 3: "Deposito", 4: "Retiro", 5: "Saldo"}
+RE_INICIO_MOVIMIENTO = re.compile(r"\w{3} \d{2}")
+
+@con_cache("Inbursa")
+@etapa("total")
 def Scrap_Estado(ruta_archivo):
-    estado = pdfplumber.open(ruta_archivo)
-    tabla = analizar_estados(estado)
+    with abrir_documento(ruta_archivo) as estado:
+        filas = concatenar_filas(filas_paginas(instantaneas(estado)))
+    return procesar_filas(filas)
+
+def procesar_filas(filas):
+    """Renglones crudos de movimientos completos -> tabla final (ver flujo.iter_movimientos)."""
+    tabla = unificar_filas(filas)
     tabla2 = analisis_movimientos(tabla)
     return tabla2
 
+def inicios_movimiento(filas):
+    # unificar_variaciones_altura mueve importes y conceptos entre renglones vecinos sin concepto
+    return inicios_seguros(filas["Fecha"].str.match(RE_INICIO_MOVIMIENTO), filas["Concepto"])
+
+@etapa("clasificacion")
 def analisis_movimientos(df):
     df = df.copy()
     df = analisis_tipo_movimiento(df)
@@ -81,22 +105,19 @@ def analisis_tipo_movimiento(df):
     return df
 
 def analizar_estados(estado):
-    df = pd.DataFrame()
-    anios = []
-    contador = 0
-    for pagina in estado.pages:
-        texto = pagina.extract_text()
-        texto = texto.replace("\n", "")
-        texto = texto.replace(" ", "")
+    return unificar_filas(concatenar_filas(filas_paginas(instantaneas(estado))))
+
+def filas_paginas(paginas):
+    for pagina in paginas:
+        texto = pagina.texto
         if re.search("FECHAREFERENCIACONCEPTOCARGOSABONOSSALDO", texto) :
-                movimientos = extraer_movimientos_pagina(pagina,texto)
-                df = pd.concat([df, pd.DataFrame(movimientos)])    
-                contador += 1
+                yield extraer_movimientos_pagina(pagina,texto)
+
+def unificar_filas(df):
     df = df.reset_index(drop=True)
     df = unificar_variaciones_altura(df)
     df = incluir_movimientos(df)
     df = unificar_tabla(df)
-    
     return df
 
 def unificar_variaciones_altura(df):
@@ -114,66 +135,23 @@ def unificar_variaciones_altura(df):
     return df
 
 def extraer_movimientos_pagina(pagina,texto):
-    caracteres = pagina.chars
+    caracteres = instantanea(pagina).arreglos
     columnas = agrupar_columnas(caracteres)
     filas = unificar_columnas(columnas)
     filas = eliminar_movimientos_no_deseados(filas)
     return filas
 
+@etapa("columnas")
 def agrupar_columnas(caracteres):
-    columnas = []
-    for caracter in caracteres:
-        coordenada = (caracter["x1"])
-        if coordenada <= 47 and coordenada >= 13:
-            columnas.append({"Caracter": caracter["text"], "Top": caracter["top"],"X":caracter["x1"],"Columna": 0})
-        elif coordenada <= 106  and coordenada > 47:
-            columnas.append({"Caracter": caracter["text"], "Top": caracter["top"],"X":caracter["x1"],"Columna": 1})
-        elif coordenada <= 366  and coordenada > 106:
-            columnas.append({"Caracter": caracter["text"], "Top": caracter["top"],"X":caracter["x1"],"Columna": 2})
-        elif coordenada <= 430  and coordenada > 366:
-            columnas.append({"Caracter": caracter["text"], "Top": caracter["top"],"X":caracter["x1"],"Columna": 3})
-        elif coordenada <= 496  and coordenada > 430:
-            columnas.append({"Caracter": caracter["text"], "Top": caracter["top"],"X":caracter["x1"],"Columna": 4})
-        elif coordenada <= 566  and coordenada > 496:
-            columnas.append({"Caracter": caracter["text"], "Top": caracter["top"],"X":caracter["x1"],"Columna": 5})
-    columnas = pd.DataFrame(columnas)
-    return columnas
-
-def unificar_columna(top):
-    top = top.sort_values(by=["X"])
-    fecha = ""
-    concepto = ""
-    origen = ""
-    deposito = ""
-    retiro = ""
-    saldo = ""
-    for index, row in top.iterrows():
-        if row["Columna"] == 0:
-            fecha = fecha + row["Caracter"]
-        elif row["Columna"] == 1:
-            origen = origen + row["Caracter"]
-        elif row["Columna"] == 2:
-            concepto = concepto + row["Caracter"]
-        elif row["Columna"] == 3:
-            deposito = deposito + row["Caracter"]
-        elif row["Columna"] == 4:
-            retiro = retiro + row["Caracter"]
-        elif row["Columna"] == 5:
-            saldo = saldo + row["Caracter"]
-    fila = {"Fecha": fecha, "Concepto": concepto, "Origen": origen, "Deposito": deposito, "Retiro": retiro, "Saldo": saldo, "Top": top["Top"].max()}
-    return fila
+    return agrupar_caracteres(caracteres, BORDES_COLUMNAS)
 
+@etapa("renglones")
 def unificar_columnas(columnas):
-    tops = columnas["Top"].unique()
-    filas = []
-    for top in tops:
-        top = columnas[columnas["Top"] == top]
-        fila = unificar_columna(top)
-        filas.append(fila)
-    filas = pd.DataFrame(filas)
-    
-    filas = filas.sort_values(by=["Top"])
-    return filas
+    """
+    Une los caracteres en renglones (Top) con una columna por campo; la
+    referencia (columna 1) va en Origen. Ver ``columnas.unir_renglones``.
+    """
+    return unir_renglones(columnas, NOMBRES_COLUMNAS)
 
 def eliminar_movimientos_no_deseados(filas):
     filas = filas.reset_index(drop=True)
@@ -196,7 +174,7 @@ def incluir_movimientos(df):
     df["Movimiento"] = 0
     contador_movimiento = 0
     for index, fila in df.iterrows():
-        if  re.match(r"\w{3} \d{2}", fila["Fecha"]):
+        if  RE_INICIO_MOVIMIENTO.match(fila["Fecha"]):
             contador_movimiento += 1 
         
         df.loc[index,"Movimiento"] = contador_movimiento
@@ -210,6 +188,7 @@ def unificar_movimiento(df):
     moviemiento = {"Fecha": df.iloc[0,0], "Concepto": concepto, "Origen": df.iloc[0,2], "Deposito": df.iloc[0,3], "Retiro": df.iloc[0,4], "Saldo": df.iloc[0,5],"Movimiento": df.iloc[0,6]}
     return moviemiento
 
+@etapa("movimientos")
 def unificar_tabla(df):
     movimientos_unificados = []
     for movimiento in df["Movimiento"].unique():
@@ -232,6 +211,7 @@ class InbursaExtractor:
         r"(?P<balance>[\d,]+\.\d{2})"
     )
 
+    @con_cache("Inbursa", argumento=1)
     def extract(self, pdf_path: str) -> pd.DataFrame:
         pages_text = self._read_pdf_text(pdf_path)
 
@@ -258,7 +238,7 @@ class InbursaExtractor:
     # -------------------------
     def _read_pdf_text(self, pdf_path: str) -> List[str]:
         all_text: List[str] = []
-        with pdfplumber.open(pdf_path) as pdf:
+        with abrir_documento(pdf_path) as pdf:
             for page in pdf.pages:
                 all_text.append(page.extract_text() or "")
         return all_text
@@ -2,9 +2,18 @@ import re
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Tuple
 
-import pdfplumber
 import pandas as pd
 
+from .cache import con_cache
+from .instrumentacion import etapa
+from .documentos import abrir_documento
+
+
+@con_cache("MercadoPago")
+@etapa("total")
+def Scrap_Estado(ruta_archivo):
+    return EstadoCuentaMovimientosExtractor().run(ruta_archivo)
+
 
 @dataclass
 class EstadoCuentaMovimientosExtractor:
@@ -26,7 +35,7 @@ class EstadoCuentaMovimientosExtractor:
     def read_pdf_text(self, pdf_path: str) -> List[str]:
         """Lee el PDF y regresa una lista con el texto de cada página."""
         all_text: List[str] = []
-        with pdfplumber.open(pdf_path) as pdf:
+        with abrir_documento(pdf_path) as pdf:
             for page in pdf.pages:
                 text = page.extract_text() or ""  # evitar None
                 all_text.append(text)
@@ -129,6 +138,7 @@ class EstadoCuentaMovimientosExtractor:
         df = df[['fecha', 'descripcion', 'deposito', 'retiro', 'saldo']]
         return df
 
+    @con_cache("MercadoPago", argumento=1)
     def run(self, pdf_path: str) -> pd.DataFrame:
         """Pipeline completo: lee PDF → extrae movimientos → devuelve DataFrame."""
         all_text = self.read_pdf_text(pdf_path)
@@ -2,9 +2,18 @@ import re
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Pattern, Union
 
-import pdfplumber
 import pandas as pd
 
+from .cache import con_cache
+from .instrumentacion import etapa
+from .documentos import abrir_documento
+
+
+@con_cache("Nu")
+@etapa("total")
+def Scrap_Estado(ruta_archivo):
+    return NuTableExtractor().to_dataframe(ruta_archivo)
+
 
 @dataclass
 class Movement:
@@ -41,7 +50,7 @@ class NuTableExtractor:
             print(msg)
 
     def extract_pages_text(self, pdf_path: str) -> List[str]:
-        with pdfplumber.open(pdf_path) as pdf:
+        with abrir_documento(pdf_path) as pdf:
             pages_text = []
             for i, page in enumerate(pdf.pages):
                 txt = page.extract_text() or ""
@@ -133,6 +142,7 @@ class NuTableExtractor:
         except ValueError:
             return None
 
+    @con_cache("Nu", argumento=1)
     def to_dataframe(self, pdf_path: str) -> pd.DataFrame:
         movimientos = self.extract_movements(pdf_path)
 
@@ -1,13 +1,59 @@
-import pandas as pd
+import logging
 import re
-import pdfplumber
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .columnas import agrupar_caracteres, unir_renglones
+from .paginas import instantanea, instantaneas
+from .cache import con_cache
+from .instrumentacion import etapa
+from .documentos import abrir_documento
+from .flujo import concatenar_filas
+from .ocr import aplanar_ocr
 
-def Scrap_Estado(ruta_archivo):
-    estado = pdfplumber.open(ruta_archivo)
-    tabla = analizar_estados(estado)
+logger = logging.getLogger(__name__)
+
+# Rangos de x1 por columna: Fecha, Folio, Descripción, Depósitos, Retiros, Saldo
+BORDES_COLUMNAS = ((16, 61), (68, 96), (96, 326), (326, 415), (415, 495), (495, 577))
+# En el orden de columnas que esperan unificar_movimiento y unificar_tabla
+NOMBRES_COLUMNAS = {0: "Fecha", 2: "Concepto", 1: "Origen", 3: "Deposito", 4: "Retiro", 5: "Saldo"}
+RE_INICIO_MOVIMIENTO = re.compile(r"\d{2}-\w{3}-\d{4}")
+# Renglones (columna, texto) que delimitan la tabla de movimientos en cada página.
+# Son los valores por omisión de Scrap_Estado; para otra variante del formato se
+# pasan extendidos, p. ej. ``fines=FINES_TABLA + (("Concepto", "SUBTOTAL"),)``
+ENCABEZADOS_TABLA = (("Fecha", "FECHA"),)
+FINES_TABLA = (
+    ("Fecha", "BANCOSANT"),
+    ("Concepto", "OMUNIQUESUSOBJECIONESENUNPLAZODE90DIASDELOCONTR"),
+    ("Concepto", "TOTAL"),
+)
+RENGLONES_DESCARTADOS = (("Concepto", "SALDOFINALDELPERIODOANTERIOR"),)
+
+@con_cache("Santander")
+@etapa("total")
+def Scrap_Estado(ruta_archivo, encabezados=ENCABEZADOS_TABLA, fines=FINES_TABLA, descartados=RENGLONES_DESCARTADOS):
+    """
+    ``encabezados``, ``fines`` y ``descartados`` son los renglones (columna,
+    texto) que marcan el inicio y el fin de la tabla en cada página y los que
+    se omiten (ver ``eliminar_movimientos_no_deseados``).
+    """
+    with abrir_documento(ruta_archivo) as estado:
+        filas = concatenar_filas(filas_paginas(instantaneas(estado), encabezados, fines, descartados))
+    return procesar_filas(filas)
+
+def procesar_filas(filas):
+    """Renglones crudos de movimientos completos -> tabla final (ver flujo.iter_movimientos)."""
+    tabla = unificar_filas(filas)
     tabla2 = analisis_movimientos(tabla)
     return tabla2
 
+def inicios_movimiento(filas):
+    return filas["Fecha"].str.match(RE_INICIO_MOVIMIENTO)
+
+@etapa("clasificacion")
 def analisis_movimientos(df):
     df = df.copy()
     df = analisis_tipo_movimiento(df)
@@ -79,112 +125,78 @@ def analisis_tipo_movimiento(df):
 
     return df
 
-def analizar_estados(estado):
-    df = pd.DataFrame()
-    anios = []
-    contador = 0
-    for pagina in estado.pages:
-        texto = pagina.extract_text()
-        texto = texto.replace("\n", "")
-        texto = texto.replace(" ", "")
+def analizar_estados(estado, encabezados=ENCABEZADOS_TABLA, fines=FINES_TABLA, descartados=RENGLONES_DESCARTADOS):
+    return unificar_filas(concatenar_filas(filas_paginas(instantaneas(estado), encabezados, fines, descartados)))
+
+def filas_paginas(paginas, encabezados=ENCABEZADOS_TABLA, fines=FINES_TABLA, descartados=RENGLONES_DESCARTADOS):
+    for pagina in paginas:
+        texto = pagina.texto
         if re.search("FECHAFOLIODESCRIPCIONDEPOSITOSRETIROSSALDO", texto) :
-                movimientos = extraer_movimientos_pagina(pagina,texto)
-                df = pd.concat([df, pd.DataFrame(movimientos)])    
-                contador += 1
+                yield extraer_movimientos_pagina(pagina, texto, encabezados, fines, descartados)
+
+def unificar_filas(df):
     df = df.reset_index(drop=True)
     df = incluir_movimientos(df)
     df = unificar_tabla(df)
     return df
 
-def extraer_movimientos_pagina(pagina,texto):
-    caracteres = pagina.chars
+def extraer_movimientos_pagina(pagina, texto, encabezados=ENCABEZADOS_TABLA, fines=FINES_TABLA,
+                               descartados=RENGLONES_DESCARTADOS):
+    caracteres = instantanea(pagina).arreglos
     columnas = agrupar_columnas(caracteres)
     filas = unificar_columnas(columnas)
-    filas = eliminar_movimientos_no_deseados(filas)
+    filas = eliminar_movimientos_no_deseados(filas, encabezados, fines, descartados)
     return filas
 
+@etapa("columnas")
 def agrupar_columnas(caracteres):
-    columnas = []
-    for caracter in caracteres:
-        coordenada = (caracter["x1"])
-        if coordenada <= 61 and coordenada >= 16:
-            columnas.append({"Caracter": caracter["text"], "Top": caracter["top"],"X":caracter["x1"],"Columna": 0})
-        elif coordenada <= 96  and coordenada > 68:
-            columnas.append({"Caracter": caracter["text"], "Top": caracter["top"],"X":caracter["x1"],"Columna": 1})
-        elif coordenada <= 326  and coordenada > 96:
-            columnas.append({"Caracter": caracter["text"], "Top": caracter["top"],"X":caracter["x1"],"Columna": 2})
-        elif coordenada <= 415  and coordenada > 326:
-            columnas.append({"Caracter": caracter["text"], "Top": caracter["top"],"X":caracter["x1"],"Columna": 3})
-        elif coordenada <= 495  and coordenada > 415:
-            columnas.append({"Caracter": caracter["text"], "Top": caracter["top"],"X":caracter["x1"],"Columna": 4})
-        elif coordenada <= 577  and coordenada > 495:
-            columnas.append({"Caracter": caracter["text"], "Top": caracter["top"],"X":caracter["x1"],"Columna": 5})
-    columnas = pd.DataFrame(columnas)
-    return columnas
-
-def unificar_columna(top):
-    top = top.sort_values(by=["X"])
-    fecha = ""
-    concepto = ""
-    origen = ""
-    deposito = ""
-    retiro = ""
-    saldo = ""
-    for index, row in top.iterrows():
-        if row["Columna"] == 0:
-            fecha = fecha + row["Caracter"]
-        elif row["Columna"] == 1:
-            origen = origen + row["Caracter"]
-        elif row["Columna"] == 2:
-            concepto = concepto + row["Caracter"]
-        elif row["Columna"] == 3:
-            deposito = deposito + row["Caracter"]
-        elif row["Columna"] == 4:
-            retiro = retiro + row["Caracter"]
-        elif row["Columna"] == 5:
-            saldo = saldo + row["Caracter"]
-    fila = {"Fecha": fecha, "Concepto": concepto, "Origen": origen, "Deposito": deposito, "Retiro": retiro, "Saldo": saldo, "Top": top["Top"].max()}
-    return fila
+    return agrupar_caracteres(caracteres, BORDES_COLUMNAS)
 
+@etapa("renglones")
 def unificar_columnas(columnas):
-    tops = columnas["Top"].unique()
-    filas = []
-    for top in tops:
-        top = columnas[columnas["Top"] == top]
-        fila = unificar_columna(top)
-        filas.append(fila)
-    filas = pd.DataFrame(filas)
-    
-    filas = filas.sort_values(by=["Top"])
-    return filas
+    """
+    Une los caracteres en renglones (Top) con una columna por campo; el folio
+    (columna 1) va en Origen. Ver ``columnas.unir_renglones``.
+    """
+    return unir_renglones(columnas, NOMBRES_COLUMNAS)
 
-def eliminar_movimientos_no_deseados(filas):
+def eliminar_movimientos_no_deseados(filas, encabezados=ENCABEZADOS_TABLA, fines=FINES_TABLA,
+                                     descartados=RENGLONES_DESCARTADOS):
+    """
+    Deja los renglones entre el primer encabezado de la tabla (``encabezados``)
+    y el primer pie de página (``fines``) y quita los de ``descartados``. El
+    primer renglón de la página nunca cuenta como encabezado, pie ni ruido.
+    """
     filas = filas.reset_index(drop=True)
-    filas = filas.copy()
-    contador_repeticion = 0
-    for index,row in filas.iterrows():
-        if index > 0:
-            if row["Fecha"] == "FECHA" and contador_repeticion == 0:
-                filas = filas[filas["Top"] > row["Top"]]
-                contador_repeticion += 1
-            elif row["Fecha"] == "BANCOSANT" or row["Concepto"] == "OMUNIQUESUSOBJECIONESENUNPLAZODE90DIASDELOCONTR":
-                filas = filas[filas["Top"] < row["Top"]]
-            elif row["Concepto"] == "TOTAL":
-                filas = filas[filas["Top"] < row["Top"]]
-                
-    for index,row in filas.iterrows():
-        if index > 0:
-            if row["Concepto"] == "SALDOFINALDELPERIODOANTERIOR":
-                filas = filas.drop(index)
-    return filas
-
+    no_es_primero = filas.index > 0
+    top = filas["Top"]
+
+    es_encabezado = coincidencias(filas, encabezados) & no_es_primero
+    encabezado = es_encabezado.argmax() if es_encabezado.any() else None
+    es_fin = coincidencias(filas, fines) & no_es_primero
+    if encabezado is not None:
+        es_fin[encabezado] = False
+
+    conservar = ~(coincidencias(filas, descartados) & no_es_primero)
+    if encabezado is not None:
+        conservar &= (top > top.iloc[encabezado]).to_numpy()
+    if es_fin.any():
+        conservar &= (top < top[es_fin].min()).to_numpy()
+    return filas[conservar]
+
+def coincidencias(filas, sentinelas):
+    """Máscara de los renglones donde alguna (columna, valor) de ``sentinelas`` coincide exacto."""
+    mascara = np.zeros(len(filas), dtype=bool)
+    for columna, valor in sentinelas:
+        mascara |= filas[columna].eq(valor).to_numpy(dtype=bool)
+    return mascara
 
 def incluir_movimientos(df):
     df = df.reset_index(drop=True)
     df["Movimiento"] = 0
     contador_movimiento = 0
     for index, fila in df.iterrows():
-        if  re.match(r"\d{2}-\w{3}-\d{4}", fila["Fecha"]):
+        if  RE_INICIO_MOVIMIENTO.match(fila["Fecha"]):
             contador_movimiento += 1 
         
         df.loc[index,"Movimiento"] = contador_movimiento
@@ -198,6 +210,7 @@ def unificar_movimiento(df):
     moviemiento = {"Fecha": df.iloc[0,0], "Concepto": concepto, "Origen": df.iloc[0,2], "Deposito": df.iloc[0,3], "Retiro": df.iloc[0,4], "Saldo": df.iloc[0,5],"Movimiento": df.iloc[0,6]}
     return moviemiento
 
+@etapa("movimientos")
 def unificar_tabla(df):
     movimientos_unificados = []
     for movimiento in df["Movimiento"].unique():
@@ -205,19 +218,6 @@ def unificar_tabla(df):
     return pd.DataFrame(movimientos_unificados)
 
 
-import re
-import logging
-from dataclasses import dataclass, asdict
-from typing import List, Dict, Optional
-import pandas as pd
-
-# Configuración de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
-)
-logger = logging.getLogger(__name__)
-
 # Constantes y regex compilados
 DATE_FOLIO_PATTERN = re.compile(r"^\s*\(?(?P<fecha>\d{2}-[A-Za-z]{3}-\d{4})\)?\s+(?P<folio>\d{7})", flags=re.IGNORECASE)
 MONEY_PATTERN = re.compile(r"(?P<monto>\d{1,3}(?:[.,]\d{3})*[.,]\d{2})")
@@ -233,29 +233,44 @@ class Transaccion:
 class ParserTransacciones:
     """
     Parser para extraer transacciones de un texto crudo.
+
+    ``to_dataframe`` procesa el texto completo; ``paginas_a_dataframe`` recibe
+    los textos de página de uno en uno (p. ej. un generador) y no necesita el
+    estado de cuenta entero en memoria.
     """
 
-    def __init__(self, texto: str, ocr: dict | None = None):
+    def __init__(self, texto: str = "", ocr: dict | None = None):
         self.texto = texto
         self.ocr = ocr
+        self.flattened_ocr = None
         if ocr:
             self.flattened_ocr = self.flatten_doctr_ocr(ocr)
 
     def separar_grupos(self) -> List[str]:
         """Divide el texto en grupos iniciando en líneas fecha-folio."""
-        grupos, actual = [], []
-        for linea in self.texto.splitlines():
-            if DATE_FOLIO_PATTERN.match(linea):
-                if actual:
-                    grupos.append("\n".join(actual))
-                actual = [linea]
-            elif actual:
-                actual.append(linea)
-        if actual:
-            grupos.append("\n".join(actual))
+        grupos = list(self.iter_grupos([self.texto]))
         logger.debug("Divididos en %d grupos", len(grupos))
         return grupos
 
+    @staticmethod
+    def iter_grupos(paginas: Iterable[str]) -> Iterator[str]:
+        """
+        Grupos de las páginas en orden. El grupo abierto al final de una página
+        continúa en la siguiente, igual que si las páginas se unieran con saltos
+        de línea.
+        """
+        actual = []
+        for texto in paginas:
+            for linea in texto.splitlines():
+                if DATE_FOLIO_PATTERN.match(linea):
+                    if actual:
+                        yield "\n".join(actual)
+                    actual = [linea]
+                elif actual:
+                    actual.append(linea)
+        if actual:
+            yield "\n".join(actual)
+
     @staticmethod
     def _normalizar_monto(cadena: str) -> float:
         """Convierte '1.234.567,89' o '1,234,567.89' a float 1234567.89"""
@@ -266,6 +281,11 @@ class ParserTransacciones:
 
     def parsear_grupo(self, grupo: str, first_movement: bool) -> Optional[Transaccion]:
         """Extrae los campos de un grupo de texto."""
+        campos = self._campos_grupo(grupo, first_movement)
+        return Transaccion(*campos) if campos else None
+
+    def _campos_grupo(self, grupo: str, first_movement: bool) -> Optional[tuple]:
+        """(fecha, folio, descripcion, monto, saldo) del grupo o None si no es un movimiento."""
         montos = MONEY_PATTERN.findall(grupo)
         if len(montos) < 2:
             logger.warning("Grupo con menos de 2 montos omitido")
@@ -289,57 +309,52 @@ class ParserTransacciones:
         # Descripción: texto entre folio y primer monto
         inicio = coincidencia.end()
         descripcion = grupo[inicio:].split(monto_str)[0].strip().replace('\n', ' ')
-        
-        # Asignar signo al monto
+
+        # Asignar signo al monto: sin saldo previo, la columna del OCR decide
         if first_movement and self.flattened_ocr is not None:
             word_data = self.flattened_ocr[self.flattened_ocr['word'] == monto_str]
-            if (word_data.geometry.values[0][0] + word_data.geometry.values[0][2])/2 > 0.76:
+            if len(word_data) and (word_data.geometry.values[0][0] + word_data.geometry.values[0][2])/2 > 0.76:
                 monto = -monto
-            else:
-                monto = monto
 
-        return Transaccion(
-            fecha=fecha,
-            folio=folio,
-            descripcion=descripcion,
-            monto=monto,
-            saldo=saldo
-        )
+        return fecha, folio, descripcion, monto, saldo
 
     def to_dataframe(self) -> pd.DataFrame:
         """Devuelve un DataFrame con todas las transacciones parseadas."""
-        grupos = self.separar_grupos()
+        return self.paginas_a_dataframe([self.texto])
+
+    def paginas_a_dataframe(self, paginas: Iterable[str]) -> pd.DataFrame:
+        """
+        Transacciones de los textos de página, consumidos de uno en uno. Los
+        campos se acumulan por columna y los depósitos/retiros se calculan al
+        final con el cambio de saldo.
+        """
+        fechas, descripciones, montos, saldos = [], [], [], []
         first_movement = True
-        transacciones = []
-        for grupo in grupos:
-            transacciones.append(self.parsear_grupo(grupo, first_movement))
+        for grupo in self.iter_grupos(paginas):
+            campos = self._campos_grupo(grupo, first_movement)
             first_movement = False
-        registros = [asdict(t) for t in transacciones if t]
-        df = pd.DataFrame(registros)
-
-        # Cálculo de depósitos y retiros
-        df['saldo_previo'] = df['saldo'].shift(1)
-        df['delta_saldo'] = df['saldo'] - df['saldo_previo']
-        df['monto_signado'] = df['monto'] * df['delta_saldo'].apply(lambda x: -1 if x < 0 else 1)
-        df['deposito'] = df['monto_signado'].clip(lower=0)
-        df['retiro'] = (-df['monto_signado']).clip(lower=0)
-        # Unir folio y descripcion en una sola columna
-        df['descripcion'] = df['folio'].astype(str) + ' ' + df['descripcion'].str.replace('\n', ' ')
-        # Eliminar col de folio
-        df = df.drop(columns=['folio'])
-
-        # Selección y renombrado de columnas finales en español
-        df_final = df[['fecha', 'descripcion', 'deposito', 'retiro', 'saldo']]
-        return df_final
-    
-    def flatten_doctr_ocr(self, doctr_ocr: dict) -> dict:
-        words = []
-        for page in doctr_ocr:
-            for item in page['items']:
-                for block in item['blocks']:
-                    for line in block['lines']:
-                        for word in line['words']:
-                            words.append((word['value'], word['geometry']))
-                            
-        words = pd.DataFrame(words, columns=['word', 'geometry'])
-        return words
\ No newline at end of file
+            if campos is None:
+                continue
+            fecha, folio, descripcion, monto, saldo = campos
+            fechas.append(fecha)
+            # Unir folio y descripcion en una sola columna
+            descripciones.append(f"{folio} {descripcion}")
+            montos.append(monto)
+            saldos.append(saldo)
+
+        # Cálculo de depósitos y retiros: el monto es retiro si el saldo bajó
+        monto = np.array(montos, dtype=np.float64)
+        saldo = np.array(saldos, dtype=np.float64)
+        delta_saldo = np.diff(saldo, prepend=np.nan)
+        monto_signado = np.where(delta_saldo < 0, -monto, monto)
+        return pd.DataFrame({
+            'fecha': fechas,
+            'descripcion': descripciones,
+            'deposito': np.clip(monto_signado, 0, None),
+            'retiro': np.clip(-monto_signado, 0, None),
+            'saldo': saldo,
+        })
+
+    def flatten_doctr_ocr(self, doctr_ocr) -> pd.DataFrame:
+        """OCR de docTR (lista de páginas o ruta al JSON) aplanado con ``ocr.aplanar_ocr``."""
+        return aplanar_ocr(doctr_ocr).a_dataframe()
@@ -1,15 +1,45 @@
 import re
-from typing import List, Optional, Tuple
+import warnings
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional, Tuple
 
-
-import pdfplumber
+import numpy as np
 import pandas as pd
 
+from .columnas import agrupar_caracteres, unir_renglones
+from .paginas import instantanea, instantaneas
+from .cache import con_cache
+from .instrumentacion import etapa
+from .documentos import abrir_documento
+from .flujo import concatenar_filas
+from .ocr import aplanar_ocr
+
+# Rangos de x1 por columna: Fecha, Concepto, Origen, Depósito, Retiro, Saldo
+BORDES_COLUMNAS = ((47, 91), (91, 252), (252, 378), (378, 440), (440, 513), (513, 587))
+NOMBRES_COLUMNAS = {0: "Fecha", 1: "Concepto", 2: "Origen", 3: "Deposito", 4: "Retiro", 5: "Saldo"}
+RE_INICIO_MOVIMIENTO = re.compile(r"^\d{2}\s*[A-ZÁÉÍÓÚÑ]{3}$", re.IGNORECASE)
+IMPORTES = ["Deposito", "Retiro", "Saldo"]
+RE_DIGITO = re.compile(r"\d")
+RE_FECHA_MOVIMIENTO = re.compile(r"^(\d{2})\s*([A-ZÁÉÍÓÚÑ]{3})$", re.IGNORECASE)
+RE_PERIODO = re.compile(r"Periodo(\d{1,2})-([A-Za-z]{3})-(\d{2,4})")
+MESES = {"ENE": 1, "FEB": 2, "MAR": 3, "ABR": 4, "MAY": 5, "JUN": 6,
+         "JUL": 7, "AGO": 8, "SEP": 9, "OCT": 10, "NOV": 11, "DIC": 12}
+COLUMNAS_CLASIFICACION = ("TipoMovimiento", "Contraparte", "InstitucionContraparte", "ConceptoMovimiento")
+# Palabras del encabezado de la tabla que se buscan antes de leer la página
+PALABRAS_TABLA = ("Fecha", "Concepto", "Origen")
+
 ## Función del repo original ##
 
+@con_cache("Scotiabank")
+@etapa("total")
 def Scrap_Estado(ruta_archivo):
-    estado = pdfplumber.open(ruta_archivo)
-    tabla = analizar_estados(estado)
+    with abrir_documento(ruta_archivo) as estado:
+        filas = concatenar_filas(filas_paginas(instantaneas(estado)))
+    return procesar_filas(filas)
+
+def procesar_filas(filas):
+    """Renglones crudos de movimientos completos -> tabla final (ver flujo.iter_movimientos)."""
+    tabla = unificar_filas(filas)
     tabla2 = analisis_movimientos(tabla)
     tabla2.columns = tabla2.columns.str.lower()
     tabla2['concepto'] = tabla2['concepto'] + tabla2['origen']
@@ -29,11 +59,13 @@ def Scrap_Estado(ruta_archivo):
         print("Error al convertir saldo a numérico")
     return tabla2
 
+def inicios_movimiento(filas):
+    return filas["Fecha"].astype(str).str.strip().str.match(RE_INICIO_MOVIMIENTO)
+
+@etapa("columnas")
 def agrupar_columnas(caracteres) -> pd.DataFrame:
     """
-    Asigna cada caracter a una columna según rangos de x1.
-    Optimizada: evita cadena de if/elif y valida rangos una sola vez.
-    Rangos (inclusive/exclusive replicando lógica original):
+    Asigna cada caracter a una columna según rangos de x1 (ver BORDES_COLUMNAS):
       Col 0: 47 <= x <= 91
       Col 1: 91 < x <= 252
       Col 2: 252 < x <= 378
@@ -41,29 +73,7 @@ def agrupar_columnas(caracteres) -> pd.DataFrame:
       Col 4: 440 < x <= 513
       Col 5: 513 < x <= 587
     """
-    if not caracteres:
-        return pd.DataFrame(columns=["Caracter", "Top", "X", "Columna"])
-
-    # Límites de corte
-    edges = [47, 91, 252, 378, 440, 513, 587]  # 6 intervalos => 7 edges
-    rows = []
-    for ch in caracteres:
-        x = ch.get("x1")
-        if x is None or x < edges[0] or x > edges[-1]:
-            continue
-        # Buscar intervalo (son pocos, loop es suficiente)
-        for col in range(len(edges) - 1):
-            lo, hi = edges[col], edges[col + 1]
-            if (col == 0 and lo <= x <= hi) or (col > 0 and lo < x <= hi):
-                rows.append({
-                    "Caracter": ch.get("text", ""),
-                    "Top": ch.get("top"),
-                    "X": x,
-                    "Columna": col
-                })
-                break
-
-    return pd.DataFrame(rows, columns=["Caracter", "Top", "X", "Columna"])
+    return agrupar_caracteres(caracteres, BORDES_COLUMNAS)
 
 def unificar_columna(top: pd.DataFrame) -> dict:
     """
@@ -94,145 +104,135 @@ def unificar_columna(top: pd.DataFrame) -> dict:
     return fila
 
 
+@etapa("renglones")
 def unificar_columnas(columnas: pd.DataFrame) -> pd.DataFrame:
     """
-    Vectoriza la transformación:
-    - Ordena una sola vez
-    - Agrupa por (Top, Columna) y concatena
-    - Desenrolla a formato ancho
-    Mucho más eficiente que iterar Top por Top.
+    Une los caracteres en renglones (Top) con una columna por campo.
+    Ver ``columnas.unir_renglones``.
     """
-    if columnas.empty:
-        return pd.DataFrame(columns=["Fecha", "Concepto", "Origen", "Deposito", "Retiro", "Saldo", "Top"])
-
-    # Asegura orden interno correcto
-    columnas = columnas.sort_values(["Top", "X"])
-
-    # Concatena caracteres por Top/Columna
-    agrupado = (
-        columnas
-        .groupby(["Top", "Columna"])["Caracter"]
-        .agg("".join)
-        .unstack(fill_value="")
-    )
-    # Mapea columnas numéricas a nombres
-    col_map = {
-        0: "Fecha",
-        1: "Concepto",
-        2: "Origen",
-        3: "Deposito",
-        4: "Retiro",
-        5: "Saldo",
-    }
-    agrupado = agrupado.rename(columns=col_map)
-
-    # Asegura todas las columnas (si faltó alguna)
-    for nombre in col_map.values():
-        if nombre not in agrupado.columns:
-            agrupado[nombre] = ""
+    return unir_renglones(columnas, NOMBRES_COLUMNAS)
 
-    # Restaura Top como columna
-    agrupado = agrupado.reset_index()
 
-    # Orden de columnas final consistente con versiones previas
-    columnas_orden = ["Fecha", "Concepto", "Origen", "Deposito", "Retiro", "Saldo", "Top"]
-    agrupado = agrupado[columnas_orden]
-    # Ordena por Top (ya debería estar ordenado)
-    return agrupado.sort_values("Top").reset_index(drop=True)
+def analizar_estados(estado):
+    return unificar_filas(concatenar_filas(filas_paginas(instantaneas(estado))))
 
+def filas_paginas(paginas):
+    """
+    Renglones de cada página de movimientos con su fecha completa. Las páginas
+    anteriores a la que trae el periodo se retienen hasta encontrarlo, para
+    que todas usen el mismo año.
+    """
+    inicio_periodo = None
+    pendientes = []
+    for pagina in paginas:
+        if not pagina_relevante(pagina, buscar_periodo=inicio_periodo is None):
+            continue
+        texto = pagina.texto
+        if inicio_periodo is None:
+            inicio_periodo = extraer_inicio_periodo(texto)
+        if re.search("FechaConceptoOrigen", texto):
+            pendientes.append(extraer_movimientos_pagina(pagina))
+        if inicio_periodo is not None:
+            for filas in pendientes:
+                yield incluir_anios(filas, inicio_periodo)
+            pendientes = []
+    if pendientes:
+        warnings.warn("No se encontró el periodo (\"Periodo dd-MMM-aa/...\") del estado de Scotiabank; "
+                      "las fechas quedan como \"dd MMM\" sin año")
+        for filas in pendientes:
+            yield incluir_anios(filas, None)
+
+def pagina_relevante(pagina, buscar_periodo):
+    """
+    Pre-filtro sin layout: descarta las páginas cuyo flujo de contenido no
+    tiene el encabezado de la tabla (ni "Periodo", mientras no se conozca).
+    Si el flujo no se puede leer, la página se procesa completa.
+    """
+    if pagina.sondear(*PALABRAS_TABLA) is not False:
+        return True
+    return buscar_periodo and pagina.sondear("Periodo") is not False
+
+def extraer_inicio_periodo(texto):
+    """Fecha de inicio del periodo ("Periodo dd-MMM-aa/dd-MMM-aa C.P"), None si la página no lo trae."""
+    coincidencia = RE_PERIODO.search(texto)
+    if coincidencia is None:
+        return None
+    dia, mes, anio = coincidencia.groups()
+    mes = MESES.get(mes.upper())
+    if mes is None:
+        return None
+    anio = int(anio)
+    return pd.Timestamp(year=anio + 2000 if anio < 100 else anio, month=mes, day=int(dia))
 
-def analizar_estados(estado):
-    df = pd.DataFrame()
-    anios = []
-    texto = [pagina.extract_text().replace("\n", "").replace(" ", "") for pagina in estado.pages]
-    for i, pagina in enumerate(estado.pages):
-        if re.search("FechaConceptoOrigen", texto[i]):
-            movimientos = extraer_movimientos_pagina(pagina)
-            df = pd.concat([df, pd.DataFrame(movimientos)])
-        elif re.search("Periodo", texto[i]):
-            periodo = texto[i].split("Periodo")[1]
-            periodo = periodo.split("C.P")[0]
-            anio = periodo.split("/")[0]
-            anios.append(f"20{anio.split('-')[-1]}")
+def incluir_anios(filas, inicio_periodo):
+    """Agrega la fecha completa (datetime64) de cada renglón con fecha."""
+    return filas.assign(FechaCompleta=fechas_movimiento(filas["Fecha"], inicio_periodo))
 
+def fechas_movimiento(columna, inicio_periodo):
+    """
+    Convierte los "dd MMM" de la columna en fechas con el año del periodo; los
+    meses a más de medio año del mes de inicio son del año siguiente (si quedan
+    antes) o del anterior (si quedan después), como en los periodos de
+    diciembre a enero. Lo que no es fecha (o si no se encontró el periodo)
+    queda NaT.
+    """
+    partes = columna.astype(str).str.strip().str.extract(RE_FECHA_MOVIMIENTO)
+    dia = pd.to_numeric(partes[0], errors="coerce")
+    mes = partes[1].str.upper().map(MESES).astype("float64")
+    if inicio_periodo is None:
+        anio = np.nan
+    else:
+        distancia = inicio_periodo.month - mes
+        anio = inicio_periodo.year + (distancia > 6).astype(int) - (distancia < -6).astype(int)
+    return pd.to_datetime(pd.DataFrame({"year": anio, "month": mes, "day": dia}, index=columna.index),
+                          errors="coerce")
+
+def unificar_filas(df):
     df = incluir_movimientos(df)
     df = unificar_tabla(df)
     df = arreglar_tabla(df)
     return df
     
 
+@etapa("clasificacion")
 def analisis_movimientos(df):
-    df = df.copy()
-    df = analisis_tipo_movimiento(df)
-    df = analisis_contraparte(df)
-    df = analisis_institucion_contraparte(df)
-    df = analisis_concepto(df)
+    df = clasificar_movimientos(df)
     df = normalizar_tabla(df)
     return df
 
 def normalizar_tabla(df):
     df = df.drop('Movimiento', axis=1)
+    fechas = df.pop('FechaCompleta')
+    # Sin año (no se encontró el periodo) se conserva la fecha "dd MMM" del estado
+    df['Fecha'] = fechas.where(fechas.notna(), df['Fecha'])
     return df
 
-def analisis_concepto(df):
-    df["ConceptoMovimiento"] = ""
-    for index,row in df.iterrows():
-        concepto = "-"
-        if re.search("SPEI",row["Concepto"]):
-            try:
-                concepto = row["Concepto"].split("|")[3]
-            except:
-                concepto = "-"
-        try:
-            concepto = concepto.replace("/","")
-        except:
-            pass
-        df.loc[index,"ConceptoMovimiento"] = concepto
-    return df
-
-def analisis_institucion_contraparte(df):
-    df["InstitucionContraparte"] = ""
-    for index,row in df.iterrows():
-        banco = "Sin contraparte"
-        if re.search("SPEI",row["Concepto"]):
-            try:
-                banco = row["Concepto"].split("|")[2]
-            except:
-                banco = "Sin contraparte"
-
-        df.loc[index,"InstitucionContraparte"] = banco
-
-    return df
-
-
-def analisis_contraparte(df):
-    df["Contraparte"] = ""
-    for index,row in df.iterrows():
-        contraparte = "-"
-        if re.search("SPEI",row["Concepto"]):
-            contraparte = row["Concepto"].split("|")[-2]
-        if re.search("RFC",row["Concepto"]):
-            contraparte = row["Concepto"].split("|")[1]
-        df.loc[index,"Contraparte"] = contraparte
-
-
-    return df
-
-def analisis_tipo_movimiento(df):
-    df["TipoMovimiento"] = ""
-    for index,row in df.iterrows():
-        if re.search("SPEI",row["Concepto"]):
-            df.loc[index,"TipoMovimiento"] = "SPEI"
-        elif re.search("COMISION",row["Concepto"]) and not re.search("IVA",row["Concepto"]):
-            df.loc[index,"TipoMovimiento"] = "COMISION"
-        elif re.search("IVA",row["Concepto"]):
-            df.loc[index,"TipoMovimiento"] = "IVACOMISION"
-        elif re.search("RFC",row["Concepto"]):
-            df.loc[index,"TipoMovimiento"] = "COMPRA"
-        else:
-            df.loc[index,"TipoMovimiento"] = "OTRO"
-
-    return df
+def clasificar_movimientos(df):
+    """
+    Agrega TipoMovimiento, Contraparte, InstitucionContraparte y ConceptoMovimiento
+    en una sola pasada vectorizada. El Concepto es "|renglón 1|renglón 2|..."; en
+    los SPEI la institución es el segundo renglón, el concepto del pago el tercero
+    y la contraparte el penúltimo (en las compras con RFC, el primero).
+    """
+    concepto = df["Concepto"]
+    renglones = concepto.str.split("|", expand=True)
+    # Sin renglones, split+reindex deja columnas float64 sin accesor .str
+    renglones = renglones.reindex(columns=range(max(4, renglones.shape[1]))).astype(object)
+    penultimo = renglones.to_numpy()[np.arange(len(df)), np.maximum(concepto.str.count(r"\|").to_numpy() - 1, 0)]
+
+    spei = concepto.str.contains("SPEI", regex=False)
+    iva = concepto.str.contains("IVA", regex=False)
+    rfc = concepto.str.contains("RFC", regex=False)
+    comision = concepto.str.contains("COMISION", regex=False) & ~iva
+
+    tipo = np.select([spei, comision, iva, rfc], ["SPEI", "COMISION", "IVACOMISION", "COMPRA"], default="OTRO")
+    contraparte = np.where(rfc, renglones[1], np.where(spei, penultimo, "-"))
+    institucion = renglones[2].where(spei & renglones[2].notna(), "Sin contraparte")
+    concepto_movimiento = renglones[3].where(spei & renglones[3].notna(), "-").str.replace("/", "", regex=False)
+
+    return df.assign(**dict(zip(
+        COLUMNAS_CLASIFICACION, (tipo, contraparte, institucion.to_numpy(), concepto_movimiento.to_numpy())
+    )))
 
 def econtrar_coordenadas_movimientos(caracteres):
     coordenadas = []
@@ -244,7 +244,7 @@ def econtrar_coordenadas_movimientos(caracteres):
     return coordenadas
 
 def extraer_movimientos_pagina(pagina):
-    caracteres = pagina.chars
+    caracteres = instantanea(pagina).arreglos
     columnas = agrupar_columnas(caracteres)
     filas = unificar_columnas(columnas)
     filas = eliminar_movimientos_no_deseados(filas)
@@ -277,9 +277,10 @@ def unificar_movimiento(df):
     concepto = ""
     for index,fila in df.iterrows():
         concepto = concepto + "|" + fila["Concepto"]
-    moviemiento = {"Fecha": df.iloc[0,0], "Concepto": concepto, "Origen": df.iloc[0,2], "Deposito": df.iloc[0,3], "Retiro": df.iloc[0,4], "Saldo": df.iloc[0,5], "Top": df.iloc[0,6], "Movimiento": df.iloc[0,7]}
+    moviemiento = {"Fecha": df.iloc[0,0], "Concepto": concepto, "Origen": df.iloc[0,2], "Deposito": df.iloc[0,3], "Retiro": df.iloc[0,4], "Saldo": df.iloc[0,5], "Top": df.iloc[0,6], "FechaCompleta": df["FechaCompleta"].iat[0], "Movimiento": df["Movimiento"].iat[0]}
     return moviemiento
 
+@etapa("movimientos")
 def unificar_tabla(df):
     movimientos_unificados = []
     for movimiento in df["Movimiento"].unique():
@@ -302,62 +303,32 @@ def incluir_movimientos(filas: pd.DataFrame) -> pd.DataFrame:
         return filas
 
     filas = filas.reset_index(drop=True).copy()
-    for col in ["Deposito", "Retiro", "Saldo"]:
+    for col in IMPORTES:
         if col not in filas.columns:
             filas[col] = ""
 
-    date_re = re.compile(r"^\d{2}\s*[A-ZÁÉÍÓÚÑ]{3}$", re.IGNORECASE)
-
-    def _str(x):
-        return "" if pd.isna(x) else str(x)
-
-    def has_amount(row) -> bool:
-        return any(_str(row[c]).strip() != "" for c in ["Deposito", "Retiro", "Saldo"])
-
     # 1) Asignar IDs de movimiento
-    movimiento_id = 0
-    mov_ids = []
-    for _, row in filas.iterrows():
-        fecha_txt = _str(row.get("Fecha", "")).strip()
-        if date_re.match(fecha_txt):
-            movimiento_id += 1
-        mov_ids.append(movimiento_id)
-    filas["Movimiento"] = mov_ids
-
-    if movimiento_id == 0:
-        return filas  # No se detectaron fechas
-
-    # 2) Completar importes faltantes en la fila con fecha
-    for mov in sorted(filas["Movimiento"].unique()):
-        if mov == 0:
-            continue
-        grupo_idx = filas.index[filas["Movimiento"] == mov]
-        if len(grupo_idx) == 0:
-            continue
+    inicios = inicios_movimiento(filas).to_numpy(dtype=bool)
+    movimiento = inicios.cumsum()
+    filas["Movimiento"] = movimiento
 
-        # Buscar la primera fila con fecha dentro del grupo
-        first_date_idx = None
-        for idx in grupo_idx:
-            if date_re.match(_str(filas.at[idx, "Fecha"]).strip()):
-                first_date_idx = idx
-                break
-        if first_date_idx is None:
-            continue
-
-        # Si ya tiene importes no hacemos nada
-        if has_amount(filas.loc[first_date_idx]):
-            continue
+    if not inicios.any():
+        return filas  # No se detectaron fechas
 
-        # Buscar hacia adelante dentro del grupo alguna fila con importes
-        for idx in grupo_idx:
-            if idx == first_date_idx:
-                continue
-            if has_amount(filas.loc[idx]):
-                # Copiar importes faltantes
-                for col in ["Deposito", "Retiro", "Saldo"]:
-                    if _str(filas.at[first_date_idx, col]).strip() == "" and _str(filas.at[idx, col]).strip() != "":
-                        filas.at[first_date_idx, col] = filas.at[idx, col]
-                break  # Solo primera coincidencia
+    # 2) Completar importes faltantes en la fila con fecha (la primera de su
+    #    grupo) con los de la primera fila posterior del grupo que tenga alguno
+    vacios = pd.DataFrame({
+        col: filas[col].fillna("").astype(str).str.strip().eq("") for col in IMPORTES
+    })
+    con_importes = ~vacios.all(axis=1).to_numpy()
+    candidatas = pd.Series(np.where(con_importes & ~inicios, filas.index, np.nan))
+    fuente = candidatas.groupby(movimiento).transform("first").to_numpy()
+
+    destinos = np.flatnonzero(inicios & ~con_importes & ~np.isnan(fuente))
+    fuentes = fuente[destinos].astype(np.int64)
+    for col in IMPORTES:
+        copiar = ~vacios[col].to_numpy()[fuentes]
+        filas.loc[destinos[copiar], col] = filas[col].to_numpy()[fuentes[copiar]]
 
     return filas
 
@@ -399,8 +370,9 @@ class ScotiabankMovementExtractor:
         # Permite espacios después del $ y miles con coma/punto; decimales opcionales
         self._amount_re = re.compile(r"\$\s*\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2})?")
 
-        # Prepara OCR aplanado
+        # Prepara OCR aplanado e índices de búsqueda de montos
         self.ocr_df = self._flatten_doctr_ocr(self.doctr_ocr)
+        self._index_words()
 
     # ---------- API pública ----------
     def parse(self) -> pd.DataFrame:
@@ -450,65 +422,59 @@ class ScotiabankMovementExtractor:
 
     # ---------- Utilidades internas ----------
     @staticmethod
-    def _flatten_doctr_ocr(doctr_ocr: dict | list) -> pd.DataFrame:
+    def _flatten_doctr_ocr(doctr_ocr) -> pd.DataFrame:
         """
-        Convierte la estructura de DocTR en un DataFrame con columnas:
+        Convierte el OCR de DocTR (lista de páginas o ruta al JSON) en un DataFrame con columnas:
         - word: str
         - geometry: Tuple[float, float, float, float] = (xmin, ymin, xmax, ymax), normalizados [0,1]
+        - page, x0, y0, x1, y1
         """
-        words = []
-        # Se acepta lista de páginas (como en tu ejemplo)
-        for page in doctr_ocr:
-            items = page.get("items", [])
-            for item in items:
-                for block in item.get("blocks", []):
-                    for line in block.get("lines", []):
-                        for word in line.get("words", []):
-                            val = word.get("value")
-                            geom = word.get("geometry")
-                            if val is not None and geom is not None and len(geom) == 4:
-                                words.append((val, tuple(geom)))
-
-        return pd.DataFrame(words, columns=["word", "geometry"]) if words else pd.DataFrame(columns=["word", "geometry"])
+        return aplanar_ocr(doctr_ocr).a_dataframe()
 
     @staticmethod
     def _normalize_amount_text(s: str) -> str:
         """Normaliza texto monetario para comparaciones: quita $, espacios y saltos de línea."""
         return s.replace("$", "").replace(" ", "").replace("\n", "")
 
+    def _match_keys(self, text: str) -> Tuple[str, str, str]:
+        """Llaves de las tres estrategias de ``_find_word_geometry``: exacta, sin '$' y solo dígitos."""
+        no_dollar = self._normalize_amount_text(text)
+        return text, no_dollar, re.sub(r"\D", "", no_dollar)
+
+    def _index_words(self) -> None:
+        """
+        Índices llave -> cola FIFO de posiciones en el OCR (en orden de lectura),
+        uno por estrategia. Solo se indexan palabras con dígitos: un monto
+        siempre los tiene.
+        """
+        indexes: Tuple[Dict[str, Deque[int]], ...] = tuple(defaultdict(deque) for _ in range(3))
+        for position, word in enumerate(self.ocr_df["word"]):
+            word = str(word)
+            if not RE_DIGITO.search(word):
+                continue
+            for index, key in zip(indexes, self._match_keys(word)):
+                index[key].append(position)
+        self._word_indexes = tuple(dict(index) for index in indexes)
+        self._used_words = np.zeros(len(self.ocr_df), dtype=bool)
+
     def _find_word_geometry(self, amount_str: str) -> Optional[Tuple[float, float, float, float]]:
         """
         Busca la geometría del monto en el OCR aplanado probando:
           1) Coincidencia exacta
           2) Sin símbolo '$'
           3) Comparación normalizada (quita separadores y compara dígitos)
+        Cada palabra del OCR se usa una sola vez y en orden de lectura, así
+        que los montos repetidos toman la palabra de su propio renglón.
         Devuelve (xmin, ymin, xmax, ymax) o None si no lo encuentra.
         """
-        if self.ocr_df is None or self.ocr_df.empty:
-            return None
-
-        # 1) Exacta
-        exact = self.ocr_df.loc[self.ocr_df["word"] == amount_str, "geometry"]
-        if not exact.empty:
-            return exact.iloc[0]
-
-        # 2) Sin '$' y sin espacios
-        amount_no_dollar = self._normalize_amount_text(amount_str)
-        no_dollar = self.ocr_df.loc[self.ocr_df["word"].apply(
-            lambda w: self._normalize_amount_text(str(w)) == amount_no_dollar), "geometry"]
-        if not no_dollar.empty:
-            return no_dollar.iloc[0]
-
-        # 3) Normalizada sin separadores (compara solo dígitos)
-        def digits_only(x: str) -> str:
-            return re.sub(r"\D", "", x)
-
-        target_digits = digits_only(amount_no_dollar)
-        normalized = self.ocr_df.loc[self.ocr_df["word"].apply(
-            lambda w: digits_only(self._normalize_amount_text(str(w))) == target_digits), "geometry"]
-        if not normalized.empty:
-            return normalized.iloc[0]
-
+        for index, key in zip(self._word_indexes, self._match_keys(amount_str)):
+            queue = index.get(key)
+            while queue:
+                position = queue.popleft()
+                # La misma palabra está en las tres colas
+                if not self._used_words[position]:
+                    self._used_words[position] = True
+                    return self.ocr_df["geometry"].iat[position]
         return None
 
     @staticmethod
@@ -1,43 +1,64 @@
 """
 Scraping_Bancos_MX - Librería para extraer datos de estados de cuenta bancarios mexicanos.
+
+Los módulos de cada banco se cargan de forma perezosa (PEP 562): importar el
+paquete no importa pdfplumber ni pandas, y ``Scrap_Estado_BBVA`` solo importa
+``Funciones_BBVA``.
 """
 
 __version__ = "0.1.0"
 __author__ = "Abel Santillan Rodriguez"
 __email__ = "abelsantillanrdz@gmail.com"
 
-from .Funciones_Afirme import *
-from .Funciones_BBVA import *
-from .Funciones_Banorte import *
-from .Funciones_BanRegio import *
-from .Funciones_BanBajio import *
-from .Funciones_Inbursa import *
-from .Funciones_Santander import *
-from .Funciones_Scotiabank import *
-from .Funciones_HeyBanco import *
-from .Funciones_Banamex import *
-from .Funciones_Azteca import *
-from .Funciones_HSBC import *
-from .Funciones_MercadoPago import *
-from .Funciones_Nu import *
-from .Funciones_Bancoppel import *
-from .Funciones_Banjercito import *
-
-__all__ = [
-    "Scrap_Estado_Afirme",
-    "Scrap_Estado_BBVA",
-    "Scrap_Estado_Banorte",
-    "Scrap_Estado_BanRegio",
-    "Scrap_Estado_BanBajio",
-    "Scrap_Estado_Inbursa",
-    "Scrap_Estado_Santander",
-    "Scrap_Estado_Scotiabank",
-    "Scrap_Estado_HeyBanco",
-    "Scrap_Estado_Banamex",
-    "Scrap_Estado_Azteca",
-    "Scrap_Estado_HSBC",
-    "Scrap_Estado_MercadoPago",
-    "Scrap_Estado_Nu",
-    "Scrap_Estado_Bancoppel",
-    "Scrap_Estado_Banjercito",
-]
\ No newline at end of file
+import importlib
+
+from .registro import BANCOS, importar_modulo
+
+_PREFIJO_SCRAP = "Scrap_Estado_"
+
+# Nombre público -> (módulo, atributo)
+_CLASES = {
+    "BancoAztecaStatementParser": ("Funciones_Azteca", "BancoAztecaStatementParser"),
+    "BBVAExtractor": ("Funciones_BBVA", "BBVAExtractor"),
+    "TransactionsParser": ("Funciones_Banamex", "TransactionsParser"),
+    "BancoppelMovimientosExtractor": ("Funciones_Bancoppel", "BancoppelMovimientosExtractor"),
+    "BanorteStatementParser": ("Funciones_Banorte", "BanorteStatementParser"),
+    "MovimientoHSBC": ("Funciones_HSBC", "MovimientoHSBC"),
+    "ParserHSBC": ("Funciones_HSBC", "ParserHSBC"),
+    "InbursaExtractor": ("Funciones_Inbursa", "InbursaExtractor"),
+    "EstadoCuentaMovimientosExtractor": ("Funciones_MercadoPago", "EstadoCuentaMovimientosExtractor"),
+    "Movement": ("Funciones_Nu", "Movement"),
+    "NuTableExtractor": ("Funciones_Nu", "NuTableExtractor"),
+    "Transaccion": ("Funciones_Santander", "Transaccion"),
+    "ParserTransacciones": ("Funciones_Santander", "ParserTransacciones"),
+    "ScotiabankMovementExtractor": ("Funciones_Scotiabank", "ScotiabankMovementExtractor"),
+}
+
+_API = {
+    "scrape_many": ("lotes", "scrape_many"),
+    "ResultadoArchivo": ("lotes", "ResultadoArchivo"),
+    "detect_bank": ("deteccion", "detect_bank"),
+    "scrape_auto": ("deteccion", "scrape_auto"),
+    "iter_movimientos": ("flujo", "iter_movimientos"),
+}
+
+_PEREZOSOS = {**_CLASES, **_API}
+
+__all__ = [f"{_PREFIJO_SCRAP}{banco}" for banco in BANCOS] + list(_CLASES) + list(_API)
+
+
+def __getattr__(nombre):
+    if nombre.startswith(_PREFIJO_SCRAP) and nombre[len(_PREFIJO_SCRAP):] in BANCOS:
+        valor = importar_modulo(nombre[len(_PREFIJO_SCRAP):]).Scrap_Estado
+    elif nombre in _PEREZOSOS:
+        modulo, atributo = _PEREZOSOS[nombre]
+        valor = getattr(importlib.import_module(f".{modulo}", __name__), atributo)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    # Se guarda en el módulo para que el siguiente acceso no pase por aquí
+    globals()[nombre] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,299 @@
+"""
+Caché en disco de resultados, direccionada por contenido.
+
+La llave de cada resultado es el SHA-256 de los bytes del PDF más el banco
+(y la función de entrada), su configuración (los demás argumentos y, en los
+métodos, los campos del extractor) y la versión de la librería, así que un
+mismo estado de cuenta reenviado con otro nombre se sirve desde la caché, un
+extractor configurado distinto no recibe el resultado de otro y un cambio de
+versión invalida todo lo anterior.
+
+Los DataFrames se guardan como Parquet (requiere ``pyarrow``: ``pip install
+Scraping-Bancos-MX[cache]``), con ``DataFrame.attrs`` en los metadatos del
+archivo para no depender de la versión de pandas. El directorio se acota por tamaño y se desaloja
+lo usado menos recientemente (LRU por ``mtime``, que se actualiza en cada
+acierto).
+
+La caché es opcional: se activa con ``activar_cache(directorio)`` o con la
+variable de entorno ``SCRAPING_BANCOS_MX_CACHE``. Mientras no esté activa, las
+funciones decoradas solo pagan una comparación con None.
+"""
+import contextvars
+import dataclasses
+import functools
+import hashlib
+import inspect
+import json
+import os
+import re
+import tempfile
+import threading
+import warnings
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+from . import __version__
+
+VARIABLE_ENTORNO = "SCRAPING_BANCOS_MX_CACHE"
+MAX_BYTES_DEFECTO = 1 << 30  # 1 GiB
+EXTENSION = ".parquet"
+TAMANO_BLOQUE = 1 << 20
+METADATO_ATTRS = b"scraping_bancos_mx.attrs"
+
+# Evita guardar dos veces cuando una entrada cacheada llama a otra
+# (p. ej. Scrap_Estado de Nu llama a NuTableExtractor.to_dataframe)
+_dentro_de_entrada = contextvars.ContextVar("_dentro_de_entrada", default=False)
+
+
+def huella_archivo(ruta) -> str:
+    """SHA-256 (hex) de los bytes del archivo, leído por bloques."""
+    sha = hashlib.sha256()
+    with open(ruta, "rb") as archivo:
+        for bloque in iter(lambda: archivo.read(TAMANO_BLOQUE), b""):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+class ConfiguracionInestable(ValueError):
+    """Un argumento o campo no tiene una representación estable para la llave."""
+
+
+def _valor_estable(valor) -> str:
+    """``repr`` reproducible entre procesos; ConfiguracionInestable si no lo hay."""
+    if valor is None or isinstance(valor, (str, bytes, bool, int, float)):
+        return repr(valor)
+    if isinstance(valor, re.Pattern):
+        return f"re({valor.pattern!r}, {valor.flags})"
+    if isinstance(valor, (list, tuple, frozenset, set)):
+        elementos = [_valor_estable(v) for v in valor]
+        if isinstance(valor, (set, frozenset)):
+            elementos.sort()
+        return f"{type(valor).__name__}({', '.join(elementos)})"
+    if isinstance(valor, dict):
+        return "{" + ", ".join(sorted(f"{_valor_estable(k)}: {_valor_estable(v)}" for k, v in valor.items())) + "}"
+    raise ConfiguracionInestable(type(valor).__name__)
+
+
+def configuracion_instancia(instancia) -> str:
+    """Campos de la instancia (dataclass o atributos públicos) ordenados por nombre."""
+    if dataclasses.is_dataclass(instancia):
+        campos = {f.name: getattr(instancia, f.name) for f in dataclasses.fields(instancia)}
+    else:
+        campos = {k: v for k, v in vars(instancia).items() if not k.startswith("_")}
+    return ", ".join(f"{k}={_valor_estable(v)}" for k, v in sorted(campos.items()))
+
+
+def _requerir_pyarrow():
+    """Módulos ``pyarrow`` y ``pyarrow.parquet``; se importan solo al usar la caché."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "La caché de resultados requiere pyarrow: pip install Scraping-Bancos-MX[cache]"
+        ) from e
+    return pyarrow, pyarrow.parquet
+
+
+class CacheResultados:
+    """Directorio de archivos Parquet acotado por tamaño con desalojo LRU."""
+
+    def __init__(self, directorio, max_bytes: int = MAX_BYTES_DEFECTO):
+        self._pa, self._pq = _requerir_pyarrow()
+        self.directorio = os.fspath(directorio)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directorio, exist_ok=True)
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.escrituras = 0
+        self.desalojos = 0
+        self._bytes = sum(tamano for _, tamano, _ in self._entradas())
+
+    def llave(self, huella: str, banco: str, configuracion: str = "") -> str:
+        return hashlib.sha256(f"{huella}:{banco}:{configuracion}:{__version__}".encode()).hexdigest()
+
+    def _ruta(self, llave: str) -> str:
+        return os.path.join(self.directorio, llave + EXTENSION)
+
+    def _entradas(self):
+        """(ruta, tamaño, mtime) de cada resultado guardado."""
+        with os.scandir(self.directorio) as it:
+            for entrada in it:
+                if entrada.name.endswith(EXTENSION):
+                    try:
+                        info = entrada.stat()
+                    except FileNotFoundError:
+                        continue
+                    yield entrada.path, info.st_size, info.st_mtime
+
+    def obtener(self, llave: str) -> Optional[pd.DataFrame]:
+        ruta = self._ruta(llave)
+        try:
+            archivo = self._pq.read_table(ruta)
+            tabla = archivo.to_pandas()
+            attrs = (archivo.schema.metadata or {}).get(METADATO_ATTRS)
+            if attrs is not None:
+                tabla.attrs = json.loads(attrs)
+            os.utime(ruta)
+        except (FileNotFoundError, OSError, ValueError, self._pa.ArrowException):
+            with self._lock:
+                self.fallos += 1
+            return None
+        with self._lock:
+            self.aciertos += 1
+        return tabla
+
+    def guardar(self, llave: str, tabla: pd.DataFrame) -> bool:
+        """
+        Escribe el resultado de forma atómica (archivo temporal + rename).
+        Si el DataFrame no se puede serializar se ignora: la caché nunca debe
+        romper el parseo.
+        """
+        fd, temporal = tempfile.mkstemp(dir=self.directorio, suffix=".tmp")
+        os.close(fd)
+        try:
+            archivo = self._pa.Table.from_pandas(tabla)
+            if tabla.attrs:
+                metadatos = dict(archivo.schema.metadata or {})
+                metadatos[METADATO_ATTRS] = json.dumps(tabla.attrs).encode()
+                archivo = archivo.replace_schema_metadata(metadatos)
+            self._pq.write_table(archivo, temporal)
+            tamano = os.path.getsize(temporal)
+            destino = self._ruta(llave)
+            # Al sobrescribir una llave (otro proceso, misma versión) se descuenta el archivo anterior
+            try:
+                reemplazado = os.path.getsize(destino)
+            except FileNotFoundError:
+                reemplazado = 0
+            os.replace(temporal, destino)
+        except Exception:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            return False
+        with self._lock:
+            self.escrituras += 1
+            self._bytes += tamano - reemplazado
+            if self._bytes > self.max_bytes:
+                self._desalojar()
+        return True
+
+    def _desalojar(self):
+        # Se vuelve a leer el directorio porque otros procesos pueden compartirlo
+        entradas = sorted(self._entradas(), key=lambda e: e[2])
+        total = sum(tamano for _, tamano, _ in entradas)
+        for ruta, tamano, _ in entradas:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass
+            total -= tamano
+            self.desalojos += 1
+        self._bytes = total
+
+    def limpiar(self):
+        with self._lock:
+            for ruta, _, _ in list(self._entradas()):
+                os.remove(ruta)
+            self._bytes = 0
+
+    def estadisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "escrituras": self.escrituras,
+                "desalojos": self.desalojos,
+                "bytes": self._bytes,
+            }
+
+
+_cache: Optional[CacheResultados] = None
+
+
+def activar_cache(directorio=None, max_bytes: int = MAX_BYTES_DEFECTO) -> CacheResultados:
+    """Activa la caché para todas las entradas; sin directorio usa ~/.cache/scraping_bancos_mx."""
+    global _cache
+    if directorio is None:
+        directorio = os.path.join(os.path.expanduser("~"), ".cache", "scraping_bancos_mx")
+    _cache = CacheResultados(directorio, max_bytes)
+    return _cache
+
+
+def desactivar_cache():
+    global _cache
+    _cache = None
+
+
+def cache_actual() -> Optional[CacheResultados]:
+    return _cache
+
+
+def con_cache(banco: str, argumento: int = 0) -> Callable:
+    """
+    Decora una entrada que recibe la ruta del PDF en la posición ``argumento``
+    (0 para funciones, 1 para métodos) y devuelve un DataFrame.
+    Los demás argumentos (con sus valores por omisión) y, en los métodos, la
+    configuración de la instancia forman parte de la llave. Si la entrada no es
+    una ruta (p. ej. un PDF ya abierto) o algún argumento no tiene una
+    representación estable, no se usa la caché.
+    """
+    def decorador(funcion):
+        nombre = f"{banco}:{funcion.__qualname__}"
+        firma = inspect.signature(funcion)
+        parametro_ruta = list(firma.parameters)[argumento]
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            cache = _cache
+            if cache is None or _dentro_de_entrada.get() or len(args) <= argumento:
+                return funcion(*args, **kwargs)
+            ruta = args[argumento]
+            if not isinstance(ruta, (str, os.PathLike)):
+                return funcion(*args, **kwargs)
+
+            try:
+                configuracion = _configuracion_llamada(firma, parametro_ruta, argumento, args, kwargs)
+            except (ConfiguracionInestable, TypeError):
+                return funcion(*args, **kwargs)
+
+            llave = cache.llave(huella_archivo(ruta), nombre, configuracion)
+            tabla = cache.obtener(llave)
+            if tabla is not None:
+                return tabla
+
+            token = _dentro_de_entrada.set(True)
+            try:
+                tabla = funcion(*args, **kwargs)
+            finally:
+                _dentro_de_entrada.reset(token)
+            if isinstance(tabla, pd.DataFrame):
+                cache.guardar(llave, tabla)
+            return tabla
+
+        return envoltura
+    return decorador
+
+
+def _configuracion_llamada(firma, parametro_ruta: str, argumento: int, args, kwargs) -> str:
+    """Argumentos de la llamada salvo la ruta, más los campos de ``self`` en los métodos."""
+    llamada = firma.bind(*args, **kwargs)
+    llamada.apply_defaults()
+    partes = []
+    if argumento:
+        partes.append(configuracion_instancia(args[0]))
+    for nombre, valor in llamada.arguments.items():
+        if nombre == parametro_ruta or (argumento and valor is args[0]):
+            continue
+        partes.append(f"{nombre}={_valor_estable(valor)}")
+    return "; ".join(partes)
+
+
+if os.environ.get(VARIABLE_ENTORNO):
+    try:
+        activar_cache(os.environ[VARIABLE_ENTORNO])
+    except ImportError as e:
+        warnings.warn(str(e))
@@ -0,0 +1,154 @@
+"""
+Motor compartido para asignar los caracteres de una página a columnas según su
+coordenada horizontal y reconstruir los renglones de la tabla de movimientos.
+
+Cada banco declara sus columnas como una secuencia de rangos ``(inicio, fin)``
+en puntos PDF; la asignación se hace con una sola llamada a ``searchsorted``
+sobre los arreglos de coordenadas de la página.
+"""
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+COLUMNAS_CARACTERES = ["Caracter", "Top", "X", "Columna"]
+
+
+@dataclass(frozen=True)
+class CaracteresPagina:
+    """Caracteres de una página en formato columnar: un arreglo por atributo."""
+    text: np.ndarray
+    x0: np.ndarray
+    x1: np.ndarray
+    top: np.ndarray
+    bottom: np.ndarray
+    height: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def tomar(self, indices) -> "CaracteresPagina":
+        """Los caracteres en ``indices`` (orden o máscara), en el mismo formato."""
+        return CaracteresPagina(*(getattr(self, campo.name)[indices] for campo in fields(self)))
+
+    @classmethod
+    def desde_chars(cls, caracteres) -> "CaracteresPagina":
+        """Construye los arreglos a partir de ``pagina.chars`` (lista de dicts)."""
+        n = len(caracteres)
+
+        def campo(nombre):
+            return np.fromiter((c[nombre] for c in caracteres), dtype=np.float64, count=n)
+
+        texto = np.empty(n, dtype=object)
+        texto[:] = [c["text"] for c in caracteres]
+        return cls(
+            text=texto,
+            x0=campo("x0"),
+            x1=campo("x1"),
+            top=campo("top"),
+            bottom=campo("bottom"),
+            height=campo("height"),
+        )
+
+
+def arreglos_caracteres(caracteres) -> CaracteresPagina:
+    """Devuelve los caracteres en formato columnar, convirtiéndolos si hace falta."""
+    if isinstance(caracteres, CaracteresPagina):
+        return caracteres
+    return CaracteresPagina.desde_chars(caracteres or [])
+
+
+@lru_cache(maxsize=None)
+def _tabla_intervalos(bordes: Tuple[Tuple[float, float], ...]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convierte los rangos de cada columna en límites ordenados y una tabla que
+    mapea el intervalo devuelto por ``searchsorted`` al índice de columna
+    (-1 para los huecos entre columnas y lo que queda fuera de la tabla).
+    """
+    limites = np.unique(np.asarray(bordes, dtype=np.float64).ravel())
+    tabla = np.full(len(limites) + 1, -1, dtype=np.int64)
+    for columna, (inicio, fin) in enumerate(bordes):
+        i, j = np.searchsorted(limites, [inicio, fin])
+        tabla[i + 1:j + 1] = columna
+    return limites, tabla
+
+
+def asignar_columnas(x, bordes: Sequence[Tuple[float, float]], cerrado: str = "derecha") -> np.ndarray:
+    """
+    Asigna a cada coordenada el índice de la columna que la contiene.
+
+    Parameters
+    ----------
+    x : array-like
+        Coordenadas horizontales (x0 o x1) de los caracteres.
+    bordes : secuencia de (inicio, fin)
+        Rango de cada columna, en orden. Puede haber huecos entre columnas.
+    cerrado : {"derecha", "izquierda"}
+        "derecha" replica los rangos ``inicio < x <= fin`` (con el inicio de la
+        primera columna incluido); "izquierda" usa ``inicio <= x < fin``.
+
+    Returns
+    -------
+    np.ndarray
+        Índice de columna por coordenada; -1 si no cae en ninguna.
+    """
+    bordes = tuple((float(inicio), float(fin)) for inicio, fin in bordes)
+    limites, tabla = _tabla_intervalos(bordes)
+    x = np.asarray(x, dtype=np.float64)
+    lado = "left" if cerrado == "derecha" else "right"
+    columnas = tabla[np.searchsorted(limites, x, side=lado)]
+    if cerrado == "derecha":
+        columnas[x == bordes[0][0]] = 0
+    return columnas
+
+
+def agrupar_caracteres(caracteres, bordes: Sequence[Tuple[float, float]], decimales_top=None,
+                       coordenada: str = "x1", cerrado: str = "derecha") -> pd.DataFrame:
+    """
+    Asigna cada caracter de la página a una columna y devuelve un DataFrame con
+    ``Caracter``, ``Top``, ``X`` y ``Columna``; descarta lo que queda fuera.
+    """
+    arreglos = arreglos_caracteres(caracteres)
+    if not len(arreglos):
+        return pd.DataFrame(columns=COLUMNAS_CARACTERES)
+
+    x = getattr(arreglos, coordenada)
+    columnas = asignar_columnas(x, bordes, cerrado)
+    mascara = columnas >= 0
+    top = arreglos.top[mascara]
+    if decimales_top is not None:
+        top = np.round(top, decimales_top)
+
+    return pd.DataFrame({
+        "Caracter": arreglos.text[mascara],
+        "Top": top,
+        "X": x[mascara],
+        "Columna": columnas[mascara],
+    })
+
+
+def unir_renglones(columnas: pd.DataFrame, nombres: Dict[int, str]) -> pd.DataFrame:
+    """
+    Reconstruye los renglones de la tabla:
+    - Ordena una sola vez por (Top, X)
+    - Concatena los caracteres por (Top, Columna)
+    - Desenrolla a formato ancho con los nombres de columna de cada banco
+    Devuelve las columnas de ``nombres`` (en orden) más ``Top``, ordenado por Top.
+    """
+    salida = list(nombres.values()) + ["Top"]
+    if columnas.empty:
+        return pd.DataFrame(columns=salida)
+
+    ordenadas = columnas.sort_values(["Top", "X"], kind="mergesort")
+    ancho = (
+        ordenadas
+        .groupby(["Top", "Columna"], sort=False)["Caracter"]
+        .agg("".join)
+        .unstack(fill_value="")
+        .reindex(columns=list(nombres), fill_value="")
+        .rename(columns=nombres)
+    )
+    ancho.columns.name = None
+    return ancho.reset_index()[salida].sort_values("Top").reset_index(drop=True)
@@ -0,0 +1,111 @@
+"""
+Detección del banco emisor a partir de la primera página del estado de cuenta.
+
+Se compara el texto compacto de la página 0 (sin espacios, en minúsculas y sin
+acentos) contra las sentinelas que ya usa cada módulo para ubicar su tabla de
+movimientos y contra marcas del banco. Cada coincidencia suma su peso; gana el
+banco con más puntos.
+"""
+import unicodedata
+from typing import Dict, Optional, Tuple
+
+from .cache import con_cache
+from .documentos import abrir_documento
+from .paginas import texto_compacto, texto_contenido
+from .registro import obtener_scraper
+
+# (texto, peso) por banco. Los encabezados de tabla pesan más que la marca
+# porque la marca de otro banco puede aparecer en la descripción de un SPEI.
+SENTINELAS: Dict[str, Tuple[Tuple[str, float], ...]] = {
+    "BBVA": (("DetalledeMovimientosRealizados", 3), ("OPERLIQ", 2), ("BBVA", 2)),
+    "Banorte": (("FECHADESCRIPCIÓN/ESTABLECIMIENTO", 3), ("Banorte", 2)),
+    "Santander": (("FECHAFOLIODESCRIPCIONDEPOSITOSRETIROSSALDO", 3), ("Santander", 2)),
+    "Scotiabank": (("FechaConceptoOrigen", 3), ("Scotiabank", 2)),
+    "Afirme": (("DíaDescripciónReferenciaDepósitosRetirosSaldo", 3), ("Afirme", 2)),
+    "Inbursa": (("FECHAREFERENCIACONCEPTOCARGOSABONOSSALDO", 3), ("Inbursa", 2)),
+    "HeyBanco": (("DIACONCEPTOCARGOSABONOSSALDO", 1), ("HeyBanco", 3)),
+    "BanRegio": (("DIACONCEPTOCARGOSABONOSSALDO", 1), ("BanRegio", 3)),
+    "BanBajio": (("FECHADESCRIPCIONDELAOPERACION", 3), ("BanBajío", 2)),
+    "Banamex": (("Banamex", 3),),
+    "Azteca": (("BancoAzteca", 3),),
+    "HSBC": (("HSBC", 2), ("CoDI", 1)),
+    "MercadoPago": (("DETALLEDEMOVIMIENTOSPeríodo", 3), ("MercadoPago", 2)),
+    "Nu": (("MONTOENPESOSMEXICANOS", 2), ("NuMéxico", 3)),
+    "Bancoppel": (("DetalledeMovimientos", 1), ("BanCoppel", 3)),
+    "Banjercito": (("Banjercito", 3),),
+}
+
+# Puntos a partir de los cuales la confianza ya no se reduce por falta de evidencia
+PUNTOS_PLENOS = 5.0
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas, sin acentos ni espacios, para comparar sentinelas."""
+    texto = unicodedata.normalize("NFKD", texto.casefold())
+    return "".join(c for c in texto if not unicodedata.combining(c) and not c.isspace())
+
+
+_SENTINELAS_NORMALIZADAS = {
+    banco: tuple((normalizar(texto), peso) for texto, peso in sentinelas)
+    for banco, sentinelas in SENTINELAS.items()
+}
+
+
+def puntuar_texto(texto: str) -> Dict[str, float]:
+    """Puntos por banco para un texto (sin normalizar)."""
+    texto = normalizar(texto)
+    puntos = {}
+    for banco, sentinelas in _SENTINELAS_NORMALIZADAS.items():
+        total = sum(peso for sentinela, peso in sentinelas if sentinela in texto)
+        if total:
+            puntos[banco] = total
+    return puntos
+
+
+def identificar_banco(texto: str) -> Tuple[Optional[str], float]:
+    """
+    Banco con más puntos y su confianza en [0, 1]: la proporción de sus puntos
+    frente al segundo lugar, reducida si no alcanza ``PUNTOS_PLENOS``.
+    """
+    puntos = puntuar_texto(texto)
+    if not puntos:
+        return None, 0.0
+    ordenados = sorted(puntos.items(), key=lambda par: par[1], reverse=True)
+    banco, mejor = ordenados[0]
+    segundo = ordenados[1][1] if len(ordenados) > 1 else 0.0
+    confianza = mejor / (mejor + segundo) * min(1.0, mejor / PUNTOS_PLENOS)
+    return banco, round(confianza, 3)
+
+
+def detect_bank(path_or_pdf) -> Tuple[Optional[str], float]:
+    """
+    Identifica el banco leyendo solo la página 0. Primero prueba con el texto
+    del flujo de contenido (``paginas.texto_contenido``, sin interpretar el
+    layout); si no se puede leer o no da un banco con ``PUNTOS_PLENOS``, usa
+    los caracteres de la página. Acepta una ruta o un PDF ya abierto.
+    Devuelve ``(banco, confianza)``; ``(None, 0.0)`` si nada coincide.
+    """
+    with abrir_documento(path_or_pdf) as pdf:
+        if not pdf.pages:
+            return None, 0.0
+        pagina = pdf.pages[0]
+        contenido = texto_contenido(pagina)
+        if contenido is not None and max(puntuar_texto(contenido).values(), default=0) >= PUNTOS_PLENOS:
+            return identificar_banco(contenido)
+        return identificar_banco(texto_compacto(pagina.chars))
+
+
+@con_cache("auto")
+def scrape_auto(path_or_pdf, min_confianza: float = 0.0):
+    """
+    Detecta el banco y procesa el estado con su parser sobre el mismo
+    documento abierto. El banco y la confianza quedan en ``df.attrs``.
+    """
+    with abrir_documento(path_or_pdf) as pdf:
+        banco, confianza = detect_bank(pdf)
+        if banco is None or confianza < min_confianza:
+            raise ValueError(f"No se pudo identificar el banco del estado de cuenta (confianza {confianza})")
+        tabla = obtener_scraper(banco)(pdf)
+    tabla.attrs["banco"] = banco
+    tabla.attrs["confianza"] = confianza
+    return tabla
@@ -0,0 +1,223 @@
+"""
+Apertura de documentos PDF compartida por todos los bancos.
+
+Las entradas (``Scrap_Estado`` y los extractores por clase) aceptan tanto una
+ruta como un ``pdfplumber.PDF`` ya abierto; así la detección de banco y el
+parser pueden trabajar sobre el mismo documento sin volver a abrirlo.
+
+Todo documento que abre la librería pasa por un ``GestorDocumentos``, pensado
+para procesos que corren días sin reiniciarse:
+
+- acota cuántos documentos hay abiertos a la vez (los demás esperan turno)
+- cierra cada documento al salir del contexto, aunque el parser falle
+- lleva la cuenta de las páginas con objetos y layout en caché y, si su
+  tamaño estimado rebasa el límite, cierra las usadas menos recientemente
+
+Por omisión no hay límites; se configuran con ``configurar_documentos`` o con
+las variables de entorno ``SCRAPING_BANCOS_MX_MAX_DOCUMENTOS`` y
+``SCRAPING_BANCOS_MX_MAX_BYTES_PAGINAS``.
+"""
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager, suppress
+from typing import Dict, Optional
+
+import pdfplumber
+
+VARIABLE_MAX_DOCUMENTOS = "SCRAPING_BANCOS_MX_MAX_DOCUMENTOS"
+VARIABLE_MAX_BYTES_PAGINAS = "SCRAPING_BANCOS_MX_MAX_BYTES_PAGINAS"
+
+# Memoria aproximada por objeto de página en caché: el dict de pdfplumber más
+# el LTChar/LTCurve de pdfminer del que sale (medido con tracemalloc)
+BYTES_POR_OBJETO = 2048
+
+
+def es_documento(ruta_o_pdf) -> bool:
+    return isinstance(ruta_o_pdf, pdfplumber.PDF)
+
+
+def bytes_pagina(pagina) -> int:
+    """Estimación de la memoria que ocupa la caché de una página (0 si no tiene)."""
+    objetos = pagina.__dict__.get("_objects")
+    if not objetos:
+        return 0
+    return sum(len(lista) for lista in objetos.values()) * BYTES_POR_OBJETO
+
+
+class GestorDocumentos:
+    """
+    Abre, cuenta y cierra los documentos de la librería.
+
+    Parameters
+    ----------
+    max_abiertos : int, optional
+        Máximo de documentos abiertos a la vez entre todos los hilos. Un hilo
+        que ya tiene un documento abierto puede abrir otro sin esperar, para
+        que una entrada que llama a otra no se bloquee a sí misma.
+    max_bytes_paginas : int, optional
+        Límite de la caché de páginas (estimada con ``bytes_pagina``); al
+        rebasarlo se cierran las páginas usadas menos recientemente.
+    espera : float, optional
+        Segundos máximos para obtener turno; después se lanza TimeoutError.
+    """
+
+    def __init__(self, max_abiertos: Optional[int] = None, max_bytes_paginas: Optional[int] = None,
+                 espera: Optional[float] = None):
+        self.max_abiertos = max_abiertos
+        self.max_bytes_paginas = max_bytes_paginas
+        self.espera = espera
+        self._turnos = threading.BoundedSemaphore(max_abiertos) if max_abiertos else None
+        self._hilo = threading.local()
+        self._lock = threading.Lock()
+        # id(pagina) -> (referencia débil, bytes estimados), de la menos a la más reciente
+        self._paginas: "OrderedDict[int, tuple]" = OrderedDict()
+        self._bytes = 0
+        self.abiertos = 0
+        self.aperturas = 0
+        self.cierres = 0
+        self.esperas = 0
+        self.desalojos = 0
+
+    # -- documentos -----------------------------------------------------------
+
+    def _tomar_turno(self) -> bool:
+        if self._turnos is None or getattr(self._hilo, "profundidad", 0):
+            return False
+        if not self._turnos.acquire(blocking=False):
+            with self._lock:
+                self.esperas += 1
+            if not self._turnos.acquire(timeout=self.espera):
+                raise TimeoutError(f"No se obtuvo turno para abrir el documento en {self.espera} s")
+        return True
+
+    @contextmanager
+    def abrir(self, ruta):
+        """Abre ``ruta`` respetando el límite de documentos y la cierra al salir."""
+        turno = self._tomar_turno()
+        self._hilo.profundidad = getattr(self._hilo, "profundidad", 0) + 1
+        pdf = None
+        try:
+            pdf = pdfplumber.open(ruta)
+            with self._lock:
+                self.abiertos += 1
+                self.aperturas += 1
+            yield pdf
+        finally:
+            try:
+                if pdf is not None:
+                    self.olvidar_documento(pdf)
+                    pdf.close()
+                    with self._lock:
+                        self.abiertos -= 1
+                        self.cierres += 1
+            finally:
+                self._hilo.profundidad -= 1
+                if turno:
+                    self._turnos.release()
+
+    # -- caché de páginas -----------------------------------------------------
+
+    def registrar_pagina(self, pagina):
+        """Marca ``pagina`` como la usada más recientemente y desaloja si hace falta."""
+        tamano = bytes_pagina(pagina)
+        with self._lock:
+            anterior = self._paginas.pop(id(pagina), None)
+            if anterior is not None:
+                self._bytes -= anterior[1]
+            self._paginas[id(pagina)] = (weakref.ref(pagina), tamano)
+            self._bytes += tamano
+            if self.max_bytes_paginas is not None and self._bytes > self.max_bytes_paginas:
+                self._desalojar()
+
+    def _desalojar(self):
+        # Nunca se desaloja la página más reciente: es la que se está leyendo
+        while self._bytes > self.max_bytes_paginas and len(self._paginas) > 1:
+            _, (referencia, tamano) = self._paginas.popitem(last=False)
+            self._bytes -= tamano
+            pagina = referencia()
+            if pagina is not None and bytes_pagina(pagina):
+                # La página puede ser de un documento de otro hilo; si ese hilo
+                # la vuelve a leer, pdfplumber la reconstruye
+                with suppress(AttributeError):
+                    pagina.close()
+                self.desalojos += 1
+
+    def liberar_pagina(self, pagina):
+        """Cierra la página (descarta su caché) y la quita del registro."""
+        with self._lock:
+            anterior = self._paginas.pop(id(pagina), None)
+            if anterior is not None:
+                self._bytes -= anterior[1]
+        pagina.close()
+
+    def olvidar_documento(self, pdf):
+        """Quita del registro las páginas de ``pdf`` (se liberan al cerrarlo)."""
+        with self._lock:
+            for llave, (referencia, tamano) in list(self._paginas.items()):
+                pagina = referencia()
+                if pagina is None or pagina.pdf is pdf:
+                    del self._paginas[llave]
+                    self._bytes -= tamano
+
+    def _depurar(self):
+        # Páginas que ya no existen o cuya caché se vació por fuera (p. ej. pdf.close())
+        for llave, (referencia, tamano) in list(self._paginas.items()):
+            pagina = referencia()
+            if pagina is None or not bytes_pagina(pagina):
+                del self._paginas[llave]
+                self._bytes -= tamano
+
+    def estadisticas(self) -> Dict[str, int]:
+        with self._lock:
+            self._depurar()
+            return {
+                "documentos_abiertos": self.abiertos,
+                "aperturas": self.aperturas,
+                "cierres": self.cierres,
+                "esperas": self.esperas,
+                "paginas_en_cache": len(self._paginas),
+                "bytes_cache": self._bytes,
+                "desalojos": self.desalojos,
+            }
+
+
+def _entero_entorno(variable: str) -> Optional[int]:
+    valor = os.environ.get(variable)
+    return int(valor) if valor else None
+
+
+_gestor = GestorDocumentos(
+    max_abiertos=_entero_entorno(VARIABLE_MAX_DOCUMENTOS),
+    max_bytes_paginas=_entero_entorno(VARIABLE_MAX_BYTES_PAGINAS),
+)
+
+
+def configurar_documentos(max_abiertos: Optional[int] = None, max_bytes_paginas: Optional[int] = None,
+                          espera: Optional[float] = None) -> GestorDocumentos:
+    """
+    Reemplaza el gestor de documentos de la librería. Los documentos que ya
+    estaban abiertos terminan con el gestor anterior.
+    """
+    global _gestor
+    _gestor = GestorDocumentos(max_abiertos, max_bytes_paginas, espera)
+    return _gestor
+
+
+def gestor_documentos() -> GestorDocumentos:
+    return _gestor
+
+
+@contextmanager
+def abrir_documento(ruta_o_pdf):
+    """
+    Abre la ruta con el gestor de documentos y la cierra al salir. Si recibe
+    un PDF ya abierto lo devuelve tal cual y no lo cierra: el dueño es quien
+    lo abrió.
+    """
+    if es_documento(ruta_o_pdf):
+        yield ruta_o_pdf
+        return
+    with _gestor.abrir(ruta_o_pdf) as pdf:
+        yield pdf
@@ -0,0 +1,111 @@
+"""
+Lectura en flujo de los movimientos de un estado de cuenta.
+
+``iter_movimientos`` procesa el documento página por página y entrega cada
+movimiento en cuanto se cierra (cuando aparece el inicio del siguiente), en
+lugar de construir la tabla completa. Cada página se cierra en cuanto el
+parser pasa a la siguiente, así que la memoria pico es la de una página más
+el movimiento abierto, sin importar el largo del estado.
+
+Los bancos con soporte de flujo exponen tres funciones en su módulo
+``Funciones_*``:
+
+- ``filas_paginas(paginas)``: genera los renglones crudos de cada página.
+- ``inicios_movimiento(filas)``: máscara de los renglones donde se puede
+  cortar (inicio de un movimiento).
+- ``procesar_filas(filas)``: convierte renglones de movimientos completos en
+  la tabla final, igual a la que devuelve ``Scrap_Estado``.
+
+Los demás bancos se procesan completos con ``Scrap_Estado`` y sus renglones se
+entregan al final.
+"""
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from .deteccion import detect_bank
+from .documentos import abrir_documento
+from .instrumentacion import en_banco
+from .paginas import instantaneas
+from .registro import importar_modulo, normalizar_banco
+
+FUNCIONES_FLUJO = ("filas_paginas", "inicios_movimiento", "procesar_filas")
+
+
+def concatenar_filas(paginas) -> pd.DataFrame:
+    """Une los renglones de varias páginas (DataFrame vacío si no hay ninguna)."""
+    paginas = list(paginas)
+    if not paginas:
+        return pd.DataFrame()
+    return pd.concat(paginas, ignore_index=True)
+
+
+def inicios_seguros(inicios, concepto) -> np.ndarray:
+    """
+    Restringe los inicios de movimiento a los que se puede cortar sin separar
+    renglones partidos. Las correcciones de altura de cada banco (un renglón
+    sin concepto que toma el del anterior o pasa sus importes al siguiente)
+    solo miran al vecino inmediato, así que basta con que el renglón del corte
+    y el anterior tengan concepto.
+    """
+    inicios = np.asarray(inicios, dtype=bool)
+    con_concepto = np.asarray(pd.Series(concepto).astype(str) != "", dtype=bool)
+    anterior = np.r_[False, con_concepto[:-1]]
+    return inicios & con_concepto & anterior
+
+
+def soporta_flujo(banco: str) -> bool:
+    modulo = importar_modulo(banco)
+    return all(hasattr(modulo, funcion) for funcion in FUNCIONES_FLUJO)
+
+
+def _registros(tabla: pd.DataFrame) -> Iterator[Dict]:
+    yield from tabla.to_dict("records")
+
+
+def _corte(filas: pd.DataFrame, modulo) -> int:
+    """Posición del último inicio de movimiento (0 si ningún movimiento está cerrado)."""
+    inicios = np.flatnonzero(modulo.inicios_movimiento(filas))
+    inicios = inicios[inicios > 0]
+    return int(inicios[-1]) if len(inicios) else 0
+
+
+def iter_movimientos(path_or_pdf, bank: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Genera los movimientos del estado como diccionarios (las mismas columnas
+    que ``Scrap_Estado`` del banco), uno por movimiento, en orden.
+
+    Parameters
+    ----------
+    path_or_pdf : str | Path | pdfplumber.PDF
+        Ruta del estado o documento ya abierto.
+    bank : str, optional
+        Banco del estado; si se omite se detecta con la primera página.
+    """
+    with abrir_documento(path_or_pdf) as pdf:
+        if bank is None:
+            bank, confianza = detect_bank(pdf)
+            if bank is None:
+                raise ValueError(f"No se pudo identificar el banco del estado de cuenta (confianza {confianza})")
+        banco = normalizar_banco(bank)
+        modulo = importar_modulo(banco)
+
+        if not soporta_flujo(banco):
+            yield from _registros(modulo.Scrap_Estado(pdf))
+            return
+
+        with en_banco(banco):
+            pendientes = None
+            for filas in modulo.filas_paginas(instantaneas(pdf, liberar=True)):
+                if pendientes is not None:
+                    filas = pd.concat([pendientes, filas], ignore_index=True)
+                else:
+                    filas = filas.reset_index(drop=True)
+                corte = _corte(filas, modulo)
+                if corte:
+                    yield from _registros(modulo.procesar_filas(filas.iloc[:corte].reset_index(drop=True)))
+                pendientes = filas.iloc[corte:].reset_index(drop=True)
+
+            if pendientes is not None and len(pendientes):
+                yield from _registros(modulo.procesar_filas(pendientes))
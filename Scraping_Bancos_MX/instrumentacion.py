@@ -0,0 +1,237 @@
+"""
+Medición por etapa del pipeline de extracción.
+
+Las funciones de cada banco se marcan con ``@etapa(nombre)``; cuando la
+instrumentación está activa, cada llamada genera un ``EventoEtapa`` con la
+etapa, el banco, la página en curso, la duración y los renglones de entrada
+y salida, y se lo pasa al callback. Las etapas que usan los parsers por
+coordenadas son:
+
+- ``layout``: pdfplumber interpreta la página y devuelve sus caracteres
+- ``columnas``: asignación de caracteres a columnas (``agrupar_columnas``)
+- ``renglones``: armado de renglones (``unificar_columnas``)
+- ``movimientos``: unión de renglones en movimientos (``unificar_tabla``)
+- ``clasificacion``: tipo, contraparte y concepto (``analisis_movimientos``)
+- ``total``: la entrada ``Scrap_Estado`` completa
+
+Opcionalmente se captura un ``cProfile.Profile`` o el pico de memoria de
+``tracemalloc`` de cada llamada, en todas las etapas o solo en las indicadas.
+Ambos son globales al intérprete, así que si dos etapas capturadas se anidan
+solo la externa lleva captura.
+
+La instrumentación se activa con ``activar_instrumentacion(callback)`` o,
+para un bloque, con ``instrumentar(callback)``. Mientras no esté activa, las
+funciones marcadas solo pagan una comparación con None.
+"""
+import contextvars
+import cProfile
+import functools
+import time
+import tracemalloc
+import warnings
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional
+
+import pandas as pd
+
+PREFIJO_MODULO = "Funciones_"
+
+# Banco y página en curso, para las etapas que no los conocen por sí mismas
+# (p. ej. ``layout`` en paginas.py es común a todos los bancos)
+_banco_actual = contextvars.ContextVar("_banco_actual", default=None)
+_pagina_actual = contextvars.ContextVar("_pagina_actual", default=None)
+_capturando = contextvars.ContextVar("_capturando", default=False)
+
+
+@dataclass
+class EventoEtapa:
+    etapa: str
+    banco: Optional[str]
+    pagina: Optional[int]
+    duracion: float
+    filas_entrada: Optional[int]
+    filas_salida: Optional[int]
+    perfil: Optional[cProfile.Profile] = None
+    memoria_pico: Optional[int] = None
+
+
+def banco_de_modulo(modulo: str) -> Optional[str]:
+    """'Scraping_Bancos_MX.Funciones_BBVA' -> 'BBVA' (None fuera de los módulos de banco)."""
+    nombre = modulo.rsplit(".", 1)[-1]
+    return nombre[len(PREFIJO_MODULO):] if nombre.startswith(PREFIJO_MODULO) else None
+
+
+def _filas(valor) -> Optional[int]:
+    if isinstance(valor, (str, bytes)):
+        return None
+    try:
+        return len(valor)
+    except TypeError:
+        return None
+
+
+class Instrumentacion:
+    """
+    Callback de eventos y las capturas opcionales de perfil y memoria.
+    ``etapas`` limita las capturas a esas etapas (None: todas).
+    """
+
+    def __init__(self, callback: Callable[[EventoEtapa], None], perfil: bool = False, memoria: bool = False,
+                 etapas: Optional[Iterable[str]] = None):
+        self.callback = callback
+        self.perfil = perfil
+        self.memoria = memoria
+        self.etapas = frozenset(etapas) if etapas is not None else None
+
+    def ejecutar(self, nombre: str, banco: Optional[str], funcion: Callable, args, kwargs):
+        token_banco = _banco_actual.set(banco) if banco else None
+        capturar = (
+            (self.perfil or self.memoria)
+            and (self.etapas is None or nombre in self.etapas)
+            and not _capturando.get()
+        )
+        token_captura = _capturando.set(True) if capturar else None
+        perfil = None
+        memoria_pico = None
+        iniciar_tracemalloc = False
+        try:
+            if capturar and self.memoria:
+                iniciar_tracemalloc = not tracemalloc.is_tracing()
+                if iniciar_tracemalloc:
+                    tracemalloc.start()
+                memoria_base = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+            if capturar and self.perfil:
+                perfil = cProfile.Profile()
+                try:
+                    perfil.enable()
+                except ValueError:
+                    # Ya hay otro perfilador activo en el intérprete
+                    perfil = None
+
+            inicio = time.perf_counter()
+            try:
+                resultado = funcion(*args, **kwargs)
+            finally:
+                duracion = time.perf_counter() - inicio
+                if perfil is not None:
+                    perfil.disable()
+                if capturar and self.memoria:
+                    memoria_pico = tracemalloc.get_traced_memory()[1] - memoria_base
+                    if iniciar_tracemalloc:
+                        tracemalloc.stop()
+
+            evento = EventoEtapa(
+                etapa=nombre,
+                banco=banco or _banco_actual.get(),
+                pagina=_pagina_actual.get(),
+                duracion=duracion,
+                filas_entrada=_filas(args[0]) if args else None,
+                filas_salida=_filas(resultado),
+                perfil=perfil,
+                memoria_pico=memoria_pico,
+            )
+        finally:
+            if token_captura is not None:
+                _capturando.reset(token_captura)
+            if token_banco is not None:
+                _banco_actual.reset(token_banco)
+
+        try:
+            self.callback(evento)
+        except Exception as e:
+            # La instrumentación nunca debe romper el parseo
+            warnings.warn(f"El callback de instrumentación falló en la etapa {nombre!r}: {e!r}")
+        return resultado
+
+
+_instrumentacion: Optional[Instrumentacion] = None
+
+
+def activar_instrumentacion(callback: Callable[[EventoEtapa], None], perfil: bool = False,
+                            memoria: bool = False, etapas: Optional[Iterable[str]] = None) -> Instrumentacion:
+    """Envía un ``EventoEtapa`` a ``callback`` por cada etapa ejecutada."""
+    global _instrumentacion
+    _instrumentacion = Instrumentacion(callback, perfil, memoria, etapas)
+    return _instrumentacion
+
+
+def desactivar_instrumentacion():
+    global _instrumentacion
+    _instrumentacion = None
+
+
+def instrumentacion_actual() -> Optional[Instrumentacion]:
+    return _instrumentacion
+
+
+@contextmanager
+def instrumentar(callback: Callable[[EventoEtapa], None], perfil: bool = False, memoria: bool = False,
+                 etapas: Optional[Iterable[str]] = None):
+    """Activa la instrumentación dentro del bloque y restaura la anterior al salir."""
+    global _instrumentacion
+    anterior = _instrumentacion
+    activar_instrumentacion(callback, perfil, memoria, etapas)
+    try:
+        yield _instrumentacion
+    finally:
+        _instrumentacion = anterior
+
+
+def etapa(nombre: str) -> Callable:
+    """
+    Marca una función como etapa ``nombre``. El banco se toma del módulo
+    ``Funciones_*`` donde está definida o, fuera de ellos, de la etapa que la
+    llamó. Los renglones de entrada son los del primer argumento.
+    """
+    def decorador(funcion):
+        banco = banco_de_modulo(funcion.__module__)
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            instrumentacion = _instrumentacion
+            if instrumentacion is None:
+                return funcion(*args, **kwargs)
+            return instrumentacion.ejecutar(nombre, banco, funcion, args, kwargs)
+
+        return envoltura
+    return decorador
+
+
+@contextmanager
+def en_banco(banco: str):
+    """Fija el banco de las etapas comunes (``layout``) ejecutadas dentro del bloque."""
+    token = _banco_actual.set(banco)
+    try:
+        yield
+    finally:
+        _banco_actual.reset(token)
+
+
+def fijar_pagina(numero: Optional[int]):
+    """Página en curso para los eventos siguientes (None al terminar el documento)."""
+    _pagina_actual.set(numero)
+
+
+class RegistroEtapas:
+    """Callback que acumula los eventos y los resume por banco y etapa."""
+
+    def __init__(self):
+        self.eventos: List[EventoEtapa] = []
+
+    def __call__(self, evento: EventoEtapa):
+        self.eventos.append(evento)
+
+    def resumen(self) -> pd.DataFrame:
+        """Llamadas, segundos totales y renglones de salida por banco y etapa."""
+        tabla = pd.DataFrame(
+            [(e.banco, e.etapa, e.duracion, e.filas_salida) for e in self.eventos],
+            columns=["banco", "etapa", "duracion", "filas_salida"],
+        )
+        return (
+            tabla.groupby(["banco", "etapa"], dropna=False)
+            .agg(llamadas=("duracion", "size"), segundos=("duracion", "sum"), filas=("filas_salida", "sum"))
+            .sort_values("segundos", ascending=False)
+            .reset_index()
+        )
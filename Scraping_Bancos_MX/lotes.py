@@ -0,0 +1,130 @@
+"""
+Procesamiento por lotes: reparte muchos estados de cuenta entre varios
+procesos con ``ProcessPoolExecutor``.
+
+- Cada proceso importa pdfplumber, pandas y los módulos de los bancos una sola
+  vez (en el inicializador), no por archivo.
+- Un error en un archivo no detiene el lote: se devuelve como un
+  ``ResultadoArchivo`` con ``error`` y ``traceback``.
+"""
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+from typing import Iterable, Iterator, List, Optional, Union
+
+import pandas as pd
+
+from .deteccion import scrape_auto
+from .registro import BANCOS, normalizar_banco, obtener_scraper
+
+COLUMNA_ARCHIVO = "source_file"
+
+
+@dataclass
+class ResultadoArchivo:
+    """Resultado de procesar un archivo del lote."""
+    source_file: str
+    banco: Optional[str] = None
+    tabla: Optional[pd.DataFrame] = None
+    error: Optional[str] = None
+    traceback: Optional[str] = None
+    duracion: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _inicializar_trabajador():
+    import pdfplumber  # noqa: F401
+    import pandas  # noqa: F401
+
+    for banco in BANCOS:
+        obtener_scraper(banco)
+
+
+def procesar_archivo(ruta, banco: Optional[str] = None) -> ResultadoArchivo:
+    """Procesa un archivo y captura cualquier excepción en el resultado."""
+    ruta = os.fspath(ruta)
+    inicio = time.perf_counter()
+    try:
+        if banco is None:
+            tabla = scrape_auto(ruta)
+            banco = tabla.attrs.get("banco")
+        else:
+            tabla = obtener_scraper(banco)(ruta)
+    except Exception as e:
+        return ResultadoArchivo(
+            source_file=ruta,
+            banco=banco,
+            error=f"{type(e).__name__}: {e}",
+            traceback=traceback.format_exc(),
+            duracion=time.perf_counter() - inicio,
+        )
+    return ResultadoArchivo(source_file=ruta, banco=banco, tabla=tabla, duracion=time.perf_counter() - inicio)
+
+
+def _iterar_resultados(rutas: List[str], banco, workers, chunksize) -> Iterator[ResultadoArchivo]:
+    if workers == 1:
+        for ruta in rutas:
+            yield procesar_archivo(ruta, banco)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_inicializar_trabajador) as executor:
+        yield from executor.map(procesar_archivo, rutas, repeat(banco), chunksize=chunksize)
+
+
+def concatenar_resultados(resultados: Iterable[ResultadoArchivo]) -> pd.DataFrame:
+    """
+    Une las tablas de los archivos exitosos en un solo DataFrame con la columna
+    ``source_file``. Los resultados con error quedan en ``df.attrs["errores"]``.
+    """
+    tablas, errores = [], []
+    for resultado in resultados:
+        if not resultado.ok:
+            errores.append(resultado)
+            continue
+        tabla = resultado.tabla.copy()
+        tabla.insert(0, COLUMNA_ARCHIVO, resultado.source_file)
+        tablas.append(tabla)
+
+    df = pd.concat(tablas, ignore_index=True) if tablas else pd.DataFrame(columns=[COLUMNA_ARCHIVO])
+    df.attrs["errores"] = errores
+    return df
+
+
+def scrape_many(paths: Iterable, bank: Optional[str] = None, workers: Optional[int] = None,
+                chunksize: int = 1, como: str = "dataframe") -> Union[pd.DataFrame, Iterator[ResultadoArchivo]]:
+    """
+    Procesa muchos estados de cuenta en paralelo.
+
+    Parameters
+    ----------
+    paths : iterable de rutas
+        Archivos PDF a procesar.
+    bank : str, opcional
+        Banco de todos los archivos (ver ``registro.BANCOS``). Si es None se
+        detecta por archivo con ``detect_bank`` a partir de la primera página.
+    workers : int, opcional
+        Número de procesos; None usa ``os.cpu_count()`` y 1 procesa en el
+        proceso actual, sin pool.
+    chunksize : int
+        Archivos que se envían juntos a cada proceso; conviene subirlo cuando
+        son miles de archivos pequeños.
+    como : {"dataframe", "iterador"}
+        "dataframe" devuelve un solo DataFrame con la columna ``source_file``;
+        "iterador" devuelve los ``ResultadoArchivo`` en el orden de ``paths``
+        conforme van terminando.
+    """
+    if como not in ("dataframe", "iterador"):
+        raise ValueError(f"como debe ser 'dataframe' o 'iterador', no {como!r}")
+    if bank is not None:
+        bank = normalizar_banco(bank)
+    rutas = [os.fspath(ruta) for ruta in paths]
+
+    resultados = _iterar_resultados(rutas, bank, workers, chunksize)
+    if como == "iterador":
+        return resultados
+    return concatenar_resultados(resultados)
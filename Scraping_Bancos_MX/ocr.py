@@ -0,0 +1,203 @@
+"""
+Aplanado del OCR de docTR, común a los extractores con OCR (BBVA, Santander
+y Scotiabank).
+
+docTR entrega una lista de páginas con el árbol items -> blocks -> lines ->
+words; cada palabra trae ``value`` y ``geometry`` = (xmin, ymin, xmax, ymax)
+normalizados a [0, 1]. ``aplanar_ocr`` recorre el árbol una sola vez y deja
+las palabras en arreglos de NumPy (texto, página y coordenadas).
+
+El OCR puede pasarse ya cargado o como ruta al JSON. Con una ruta, las
+páginas se decodifican de una en una mientras se lee el archivo, así que en
+memoria solo queda el árbol de la página en curso más los arreglos.
+
+Para PDFs digitales ``palabras_pdf`` produce la misma estructura a partir de
+las palabras de pdfplumber, con las coordenadas normalizadas por el tamaño de
+la página, y permite prescindir del OCR.
+"""
+import json
+import os
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+TAMANO_BLOQUE = 1 << 20
+COLUMNAS_OCR = ["word", "geometry", "page", "x0", "y0", "x1", "y1"]
+# Misma tolerancia vertical (y_tolerance) que usa pdfplumber para agrupar renglones
+TOLERANCIA_RENGLON = 3
+
+
+@dataclass(frozen=True)
+class PalabrasOCR:
+    """Palabras del OCR en formato columnar; ``page`` empieza en 1."""
+    word: np.ndarray
+    page: np.ndarray
+    x0: np.ndarray
+    y0: np.ndarray
+    x1: np.ndarray
+    y1: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.word)
+
+    def a_dataframe(self) -> pd.DataFrame:
+        """DataFrame con ``COLUMNAS_OCR``; ``geometry`` es la tupla (x0, y0, x1, y1) de cada palabra."""
+        return pd.DataFrame({
+            "word": self.word,
+            "geometry": list(zip(self.x0.tolist(), self.y0.tolist(), self.x1.tolist(), self.y1.tolist())),
+            "page": self.page,
+            "x0": self.x0,
+            "y0": self.y0,
+            "x1": self.x1,
+            "y1": self.y1,
+        }, columns=COLUMNAS_OCR)
+
+
+def paginas_json(ruta) -> Iterator[dict]:
+    """
+    Páginas de un JSON de docTR cuya raíz es la lista de páginas, decodificadas
+    de una en una. Si la raíz es otra cosa el documento se carga completo.
+    """
+    decodificador = json.JSONDecoder()
+    with open(ruta, encoding="utf-8") as archivo:
+        buffer = archivo.read(TAMANO_BLOQUE).lstrip()
+        if not buffer.startswith("["):
+            yield from _paginas(json.loads(buffer + archivo.read()))
+            return
+        buffer = buffer[1:]
+        while True:
+            buffer = buffer.lstrip()
+            if buffer.startswith(","):
+                buffer = buffer[1:].lstrip()
+            if buffer.startswith("]"):
+                return
+            try:
+                pagina, fin = decodificador.raw_decode(buffer)
+            except json.JSONDecodeError:
+                # Página incompleta: se lee al menos lo que ya hay en el buffer
+                # para que una página grande no se decodifique muchas veces
+                bloque = archivo.read(max(TAMANO_BLOQUE, len(buffer)))
+                if not bloque:
+                    raise
+                buffer += bloque
+                continue
+            yield pagina
+            buffer = buffer[fin:]
+
+
+def _paginas(ocr) -> Iterable[dict]:
+    if isinstance(ocr, dict):
+        return ocr.get("pages", [])
+    return ocr or []
+
+
+def _geometria(palabra):
+    """(xmin, ymin, xmax, ymax) de la palabra; acepta también ((xmin, ymin), (xmax, ymax)). None si no es válida."""
+    geometria = palabra.get("geometry")
+    if geometria is None:
+        return None
+    if len(geometria) == 2 and isinstance(geometria[0], (list, tuple)):
+        geometria = (*geometria[0], *geometria[1])
+    return geometria if len(geometria) == 4 else None
+
+
+def aplanar_ocr(ocr) -> PalabrasOCR:
+    """
+    Aplana el OCR de docTR en una sola pasada. ``ocr`` es la lista de páginas
+    (o un dict con "pages") o la ruta al JSON. Las palabras sin texto o sin
+    geometría válida se omiten.
+    """
+    if isinstance(ocr, PalabrasOCR):
+        return ocr
+    if isinstance(ocr, (str, os.PathLike)):
+        paginas = paginas_json(ocr)
+    else:
+        paginas = _paginas(ocr)
+
+    bloques = []
+    for numero, pagina in enumerate(paginas, 1):
+        palabras, geometrias = [], []
+        for item in pagina.get("items", []):
+            for bloque in item.get("blocks", []):
+                for linea in bloque.get("lines", []):
+                    for palabra in linea.get("words", []):
+                        valor = palabra.get("value")
+                        geometria = _geometria(palabra)
+                        if valor is not None and geometria is not None:
+                            palabras.append(valor)
+                            geometrias.append(geometria)
+        bloques.append((numero, palabras, np.asarray(geometrias, dtype=np.float64).reshape(-1, 4)))
+    return _unir_paginas(bloques)
+
+
+def palabras_pagina(pagina, palabras=None) -> Tuple[List[str], np.ndarray]:
+    """
+    Palabras de una página de pdfplumber y su geometría (x0, top, x1, bottom)
+    dividida entre el ancho y el alto de la página, como la entrega docTR.
+    ``palabras`` es el resultado de ``pagina.extract_words()`` si ya se tiene.
+    """
+    x_origen, y_origen = pagina.bbox[0], pagina.bbox[1]
+    if palabras is None:
+        palabras = pagina.extract_words()
+    geometrias = np.array(
+        [(p["x0"], p["top"], p["x1"], p["bottom"]) for p in palabras], dtype=np.float64
+    ).reshape(-1, 4)
+    geometrias[:, [0, 2]] = (geometrias[:, [0, 2]] - x_origen) / pagina.width
+    geometrias[:, [1, 3]] = (geometrias[:, [1, 3]] - y_origen) / pagina.height
+    return [p["text"] for p in palabras], geometrias
+
+
+def texto_palabras(palabras, tolerancia: float = TOLERANCIA_RENGLON) -> str:
+    """
+    Texto de las palabras de ``extract_words`` (ya en orden de lectura): un
+    renglón nuevo cuando el top cambia más de ``tolerancia``, como
+    ``extract_text``.
+    """
+    renglones, actual, top = [], [], None
+    for palabra in palabras:
+        if actual and abs(palabra["top"] - top) > tolerancia:
+            renglones.append(" ".join(actual))
+            actual = []
+        if not actual:
+            top = palabra["top"]
+        actual.append(palabra["text"])
+    if actual:
+        renglones.append(" ".join(actual))
+    return "\n".join(renglones)
+
+
+def palabras_pdf(paginas, textos: Optional[List[str]] = None) -> PalabrasOCR:
+    """
+    ``PalabrasOCR`` de las páginas de pdfplumber, sin OCR. Si se pasa la lista
+    ``textos`` se le agrega el texto de cada página armado con las mismas
+    palabras (``texto_palabras``), sin un segundo layout de pdfplumber.
+    """
+    def bloques():
+        for numero, pagina in enumerate(paginas, 1):
+            palabras = pagina.extract_words()
+            if textos is not None:
+                textos.append(texto_palabras(palabras))
+            yield (numero, *palabras_pagina(pagina, palabras))
+
+    return _unir_paginas(bloques())
+
+
+def _unir_paginas(bloques) -> PalabrasOCR:
+    """Une los (número de página, palabras, geometrías) de cada página en arreglos del tamaño final."""
+    bloques = list(bloques)
+    total = sum(len(palabras) for _, palabras, _ in bloques)
+    word = np.empty(total, dtype=object)
+    page = np.empty(total, dtype=np.int64)
+    coordenadas = np.empty((total, 4), dtype=np.float64)
+    inicio = 0
+    for numero, palabras, geometrias in bloques:
+        fin = inicio + len(palabras)
+        word[inicio:fin] = palabras
+        page[inicio:fin] = numero
+        coordenadas[inicio:fin] = geometrias
+        inicio = fin
+
+    x0, y0, x1, y1 = (np.ascontiguousarray(coordenadas[:, i]) for i in range(4))
+    return PalabrasOCR(word=word, page=page, x0=x0, y0=y0, x1=x1, y1=y1)
@@ -0,0 +1,205 @@
+"""
+Instantáneas de página: leen ``pagina.chars`` una sola vez y derivan de ahí
+tanto los arreglos por columna como el texto sin espacios que usan los
+parsers para identificar las páginas de movimientos, evitando la pasada de
+``extract_text()`` por página.
+
+Los caracteres se leen hasta que se piden, así que un parser puede descartar
+páginas con ``PageSnapshot.sondear``, que busca las sentinelas en las cadenas
+del flujo de contenido sin interpretar el layout.
+"""
+import re
+from contextlib import suppress
+from typing import Optional
+
+import numpy as np
+from pdfminer.pdftypes import dict_value, resolve1
+from pdfminer.psparser import PSLiteral, literal_name
+
+from .columnas import CaracteresPagina, arreglos_caracteres
+from .documentos import gestor_documentos
+from .instrumentacion import etapa, fijar_pagina
+
+RE_ESPACIOS = re.compile(r"\s+")
+
+# Misma tolerancia vertical que usa pdfplumber en extract_text()
+TOLERANCIA_LINEA = 3
+
+# Cadenas del flujo de contenido: literales "(...)" o hexadecimales "<...>"
+# (sin confundirlas con los diccionarios "<<...>>"), y las secuencias de escape
+RE_CADENA = re.compile(rb"\(((?:[^()\\]|\\.)*)\)|(?<!<)<([0-9A-Fa-f\s]*)>(?!>)", re.DOTALL)
+RE_ESCAPE = re.compile(rb"\\([0-7]{1,3}|.)", re.DOTALL)
+ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f"}
+RE_ESPACIOS_BYTES = re.compile(rb"\s+")
+# Fuentes cuyos bytes son el texto tal cual (códigos de un byte con una
+# codificación estándar); con cualquier otra el sondeo no es confiable
+FUENTES_SIMPLES = frozenset({"Type1", "TrueType", "MMType1"})
+CODIFICACIONES_LEGIBLES = frozenset({"WinAnsiEncoding", "MacRomanEncoding", "StandardEncoding"})
+
+
+def texto_compacto(caracteres, tolerancia: float = TOLERANCIA_LINEA) -> str:
+    """
+    Texto de la página sin espacios ni saltos de línea, en orden de lectura.
+    Las líneas se forman agrupando 'top' consecutivos separados por menos de
+    ``tolerancia`` y, dentro de cada línea, los caracteres se ordenan por x0.
+    """
+    arreglos = arreglos_caracteres(caracteres)
+    if not len(arreglos):
+        return ""
+    orden = np.argsort(arreglos.top, kind="stable")
+    tops = arreglos.top[orden]
+    lineas = np.r_[0, np.cumsum(np.diff(tops) > tolerancia)]
+    orden = orden[np.lexsort((arreglos.x0[orden], lineas))]
+    return RE_ESPACIOS.sub("", "".join(arreglos.text[orden]))
+
+
+def _escape(coincidencia) -> bytes:
+    secuencia = coincidencia.group(1)
+    if secuencia[:1].isdigit():
+        return bytes([int(secuencia, 8) & 0xFF])
+    return ESCAPES.get(secuencia, secuencia)
+
+
+def _bytes_cadena(coincidencia) -> bytes:
+    literal, hexadecimal = coincidencia.groups()
+    if literal is not None:
+        return RE_ESCAPE.sub(_escape, literal)
+    digitos = RE_ESPACIOS_BYTES.sub(b"", hexadecimal)
+    # Un número impar de dígitos lleva un 0 implícito al final
+    return bytes.fromhex((digitos + b"0" * (len(digitos) % 2)).decode("ascii"))
+
+
+def _codificacion_legible(fuente) -> bool:
+    if literal_name(fuente.get("Subtype")) not in FUENTES_SIMPLES:
+        return False
+    codificacion = resolve1(fuente.get("Encoding"))
+    if codificacion is None:
+        # Codificación interna: solo es estándar en fuentes no subconjunto ("ABCDEF+Nombre")
+        nombre = literal_name(fuente.get("BaseFont", ""))
+        return "+" not in nombre[:7]
+    if isinstance(codificacion, PSLiteral):
+        return literal_name(codificacion) in CODIFICACIONES_LEGIBLES
+    codificacion = dict_value(codificacion)
+    return (
+        "Differences" not in codificacion
+        and literal_name(codificacion.get("BaseEncoding", "StandardEncoding")) in CODIFICACIONES_LEGIBLES
+    )
+
+
+def texto_contenido(pagina) -> Optional[str]:
+    """
+    Texto sin espacios de las cadenas (literales y hexadecimales) del flujo de
+    contenido de la página, en el orden en que se dibujan, sin interpretar la
+    página. None si el texto no se puede leer así: fuentes compuestas o con
+    codificación propia, formularios (XObject /Form), un flujo que no se pudo
+    leer o que no trae ninguna cadena.
+    """
+    with suppress(Exception):
+        objeto = pagina.page_obj
+        recursos = dict_value(objeto.resources)
+        for xobjeto in dict_value(recursos.get("XObject", {})).values():
+            if literal_name(resolve1(xobjeto).get("Subtype")) == "Form":
+                return None
+        fuentes = dict_value(recursos.get("Font", {}))
+        if not all(_codificacion_legible(dict_value(fuente)) for fuente in fuentes.values()):
+            return None
+        contenido = b"".join(resolve1(flujo).get_data() for flujo in objeto.contents)
+        cadenas = RE_ESPACIOS_BYTES.sub(b"", b"".join(map(_bytes_cadena, RE_CADENA.finditer(contenido))))
+        # Sin texto no hay forma de distinguir una página vacía de una que no se supo leer
+        return cadenas.decode("cp1252", errors="replace") or None
+    return None
+
+
+@etapa("layout")
+def leer_caracteres(pagina):
+    """Caracteres de la página; la primera lectura es la que interpreta el layout."""
+    return pagina.chars
+
+
+_SIN_SONDEAR = object()
+
+
+class PageSnapshot:
+    """
+    Vista de una página de pdfplumber con los caracteres cargados una vez.
+
+    - ``chars``: lista original de pdfplumber (perezoso)
+    - ``arreglos``: los mismos caracteres en formato columnar (perezoso)
+    - ``texto``: texto sin espacios para buscar sentinelas (perezoso)
+    """
+
+    def __init__(self, pagina):
+        self.pagina = pagina
+        self._chars = None
+        self._arreglos = None
+        self._texto = None
+        self._texto_contenido = _SIN_SONDEAR
+
+    def __len__(self) -> int:
+        return len(self.chars)
+
+    @property
+    def chars(self) -> list:
+        if self._chars is None:
+            self._chars = leer_caracteres(self.pagina)
+            gestor_documentos().registrar_pagina(self.pagina)
+        return self._chars
+
+    @property
+    def page_number(self) -> int:
+        return self.pagina.page_number
+
+    @property
+    def arreglos(self) -> CaracteresPagina:
+        if self._arreglos is None:
+            self._arreglos = arreglos_caracteres(self.chars)
+        return self._arreglos
+
+    @property
+    def texto(self) -> str:
+        if self._texto is None:
+            self._texto = texto_compacto(self.arreglos)
+        return self._texto
+
+    def contiene(self, *sentinelas: str) -> bool:
+        """True si todas las sentinelas (sin espacios) aparecen en la página."""
+        return all(sentinela in self.texto for sentinela in sentinelas)
+
+    def sondear(self, *sentinelas: str) -> Optional[bool]:
+        """
+        Como ``contiene`` pero, si los caracteres aún no se leyeron, busca en
+        ``texto_contenido`` sin interpretar la página. None si no se puede
+        saber sin leerla. Un False permite descartar la página; un True solo
+        indica que vale la pena leerla.
+        """
+        if self._chars is not None:
+            return self.contiene(*sentinelas)
+        if self._texto_contenido is _SIN_SONDEAR:
+            self._texto_contenido = texto_contenido(self.pagina)
+        if self._texto_contenido is None:
+            return None
+        return all(sentinela in self._texto_contenido for sentinela in sentinelas)
+
+
+def instantanea(pagina) -> PageSnapshot:
+    """Devuelve ``pagina`` si ya es una instantánea; si no, la construye."""
+    if isinstance(pagina, PageSnapshot):
+        return pagina
+    return PageSnapshot(pagina)
+
+
+def instantaneas(documento, liberar: bool = False):
+    """
+    Itera las páginas de un documento pdfplumber como instantáneas. Con
+    ``liberar`` cada página se cierra (pdfplumber descarta sus objetos y su
+    layout) en cuanto se pide la siguiente o se abandona la iteración.
+    """
+    gestor = gestor_documentos()
+    for pagina in documento.pages:
+        fijar_pagina(pagina.page_number)
+        try:
+            yield PageSnapshot(pagina)
+        finally:
+            fijar_pagina(None)
+            if liberar:
+                gestor.liberar_pagina(pagina)
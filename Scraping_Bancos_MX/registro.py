@@ -0,0 +1,50 @@
+"""
+Registro de bancos soportados. Cada banco apunta a su módulo ``Funciones_*``;
+todos exponen ``Scrap_Estado(ruta_archivo)`` y el módulo se importa solo
+cuando se pide su banco.
+"""
+import importlib
+from typing import Callable, Dict, List
+
+BANCOS: Dict[str, str] = {
+    "Afirme": "Funciones_Afirme",
+    "BBVA": "Funciones_BBVA",
+    "Banorte": "Funciones_Banorte",
+    "BanRegio": "Funciones_BanRegio",
+    "BanBajio": "Funciones_BanBajio",
+    "Inbursa": "Funciones_Inbursa",
+    "Santander": "Funciones_Santander",
+    "Scotiabank": "Funciones_Scotiabank",
+    "HeyBanco": "Funciones_HeyBanco",
+    "Banamex": "Funciones_Banamex",
+    "Azteca": "Funciones_Azteca",
+    "HSBC": "Funciones_HSBC",
+    "MercadoPago": "Funciones_MercadoPago",
+    "Nu": "Funciones_Nu",
+    "Bancoppel": "Funciones_Bancoppel",
+    "Banjercito": "Funciones_Banjercito",
+}
+
+_NOMBRES = {banco.lower(): banco for banco in BANCOS}
+
+
+def bancos_soportados() -> List[str]:
+    return list(BANCOS)
+
+
+def normalizar_banco(banco: str) -> str:
+    """Nombre canónico del banco, sin distinguir mayúsculas ('bbva' -> 'BBVA')."""
+    try:
+        return _NOMBRES[banco.lower()]
+    except KeyError:
+        raise ValueError(f"Banco no soportado: {banco!r}. Opciones: {', '.join(BANCOS)}") from None
+
+
+def importar_modulo(banco: str):
+    """Importa (una sola vez) el módulo ``Funciones_*`` del banco."""
+    return importlib.import_module(f".{BANCOS[normalizar_banco(banco)]}", __package__)
+
+
+def obtener_scraper(banco: str) -> Callable:
+    """Devuelve la función ``Scrap_Estado`` del banco indicado."""
+    return importar_modulo(banco).Scrap_Estado
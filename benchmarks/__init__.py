@@ -0,0 +1 @@
+"""Benchmarks de los parsers sobre estados de cuenta sintéticos (``python -m benchmarks.ejecutar``)."""
@@ -0,0 +1,406 @@
+"""
+Diseños sintéticos de estados de cuenta por banco.
+
+Cada diseño reutiliza las bandas de columnas que usa su parser
+(``BORDES_COLUMNAS``, ``BORDES_CAMPOS`` de BBVA, ``COL_BOUNDS`` de Banjercito)
+y escribe los encabezados, periodos y conceptos que el parser busca, de modo
+que el PDF generado recorre el mismo camino que un estado real: detección de
+páginas, asignación a columnas, armado de renglones, unión de movimientos y
+clasificación (SPEI, comisión, IVA, compra).
+"""
+import random
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from Scraping_Bancos_MX import (
+    Funciones_Afirme,
+    Funciones_BanRegio,
+    Funciones_Banjercito,
+    Funciones_Banorte,
+    Funciones_BBVA,
+    Funciones_HeyBanco,
+    Funciones_Inbursa,
+    Funciones_Santander,
+    Funciones_Scotiabank,
+)
+
+from .generador_pdf import ALTO_PAGINA, EscritorPDF, Texto, ancho_texto
+
+TIPOS = ("spei", "comision", "iva", "compra")
+BANCOS_CONTRAPARTE = ("STP", "KUSPIT", "MIFEL", "ACTINVER")
+CONTRAPARTES = ("JUAN PEREZ LOPEZ", "COMERCIAL DEL NORTE SA", "MARIA GARCIA RUIZ", "SERVICIOS INTEGRALES SC")
+CONCEPTOS = ("RENTA ENERO", "PAGO FACTURA 1043", "NOMINA QUINCENA", "REEMBOLSO GASTOS")
+MESES = ("ENE", "FEB", "MAR", "ABR", "MAY", "JUN", "JUL", "AGO", "SEP", "OCT", "NOV", "DIC")
+
+# Márgenes verticales del área de movimientos
+TOP_CABECERA = 40
+ALTO_RENGLON = 10
+TOP_LIMITE = ALTO_PAGINA - 40
+ALTO_RENGLON_MINIMO = 7.5
+
+Renglon = Dict[int, str]
+
+
+@dataclass
+class Movimiento:
+    indice: int
+    dia: int
+    tipo: str
+    deposito: bool
+    monto: str
+    saldo: str
+    banco: str
+    contraparte: str
+    concepto: str
+    referencia: str
+
+
+def generar_movimientos(total: int, semilla: int = 0) -> Iterator[Movimiento]:
+    """Movimientos de enero de 2024 con saldo corrido, reproducibles por semilla."""
+    rng = random.Random(semilla)
+    saldo = 250_000.0
+    for i in range(total):
+        tipo = TIPOS[i % len(TIPOS)]
+        deposito = tipo == "spei" and i % 8 == 0
+        monto = round(rng.uniform(50, 25_000) if tipo in ("spei", "compra") else rng.uniform(5, 300), 2)
+        saldo += monto if deposito else -monto
+        yield Movimiento(
+            indice=i,
+            dia=1 + i * 28 // max(total, 1),
+            tipo=tipo,
+            deposito=deposito,
+            monto=f"{monto:,.2f}",
+            saldo=f"{saldo:,.2f}",
+            banco=rng.choice(BANCOS_CONTRAPARTE),
+            contraparte=rng.choice(CONTRAPARTES),
+            concepto=rng.choice(CONCEPTOS),
+            referencia=f"{rng.randrange(10**9):09d}",
+        )
+
+
+@dataclass
+class Diseno:
+    """
+    Cómo dibujar el estado de un banco.
+
+    - ``bordes``: bandas (inicio, fin) de cada columna; los textos se ajustan
+      para quedar completos dentro de su banda, sin importar si el parser usa
+      x0 o x1.
+    - ``encabezado``: texto del encabezado de la tabla por columna.
+    - ``renglones``: los renglones (columna -> texto) de un movimiento.
+    - ``cabecera`` / ``pie``: líneas libres ``(x, texto)`` antes y después de la
+      tabla, por número de página y total de páginas.
+    - ``montos``: columnas que se alinean a la derecha.
+    - ``espacios``: si es False cada palabra se escribe por separado, sin
+      caracteres de espacio (como los PDFs de Santander).
+    - ``portada``: líneas de una primera página sin tabla (si hay más de una).
+    """
+    banco: str
+    bordes: Sequence[Tuple[float, float]]
+    encabezado: Renglon
+    renglones: Callable[[Movimiento], List[Renglon]]
+    cabecera: Callable[[int, int], List[Tuple[float, str]]] = lambda pagina, total: []
+    pie: Callable[[int, int], List[Tuple[float, str]]] = lambda pagina, total: []
+    montos: Tuple[int, ...] = ()
+    espacios: bool = True
+    portada: Optional[Callable[[], List[Tuple[float, str]]]] = None
+    notas: str = field(default="", repr=False)
+
+
+def _monto(m: Movimiento, deposito: int, retiro: int) -> Renglon:
+    return {deposito: m.monto} if m.deposito else {retiro: m.monto}
+
+
+# ---------------------------------------------------------------------------
+# Diseños por banco
+# ---------------------------------------------------------------------------
+
+def _santander(m: Movimiento) -> List[Renglon]:
+    primero = {0: f"{m.dia:02d}-ENE-2024", 1: m.referencia[:7], 5: m.saldo, **_monto(m, 3, 4)}
+    if m.tipo == "spei":
+        sentido = f"RECIBIDO DE {m.banco}" if m.deposito else f"ENVIADO A {m.banco}"
+        return [
+            {**primero, 2: "ABONO TRANSFERENCIA SPEI" if m.deposito else "CARGO TRANSFERENCIA SPEI"},
+            {2: sentido},
+            {2: f"L CLIENTE {m.contraparte} (REF {m.referencia[:5]})"},
+        ]
+    if m.tipo == "comision":
+        return [{**primero, 2: "COMISION MANEJO DE CUENTA"}]
+    if m.tipo == "iva":
+        return [{**primero, 2: "IVA COMISION MANEJO DE CUENTA"}]
+    return [{**primero, 2: "PAGO SERVICIO RFC ABC010101XYZ"}, {2: f"CONCEPTO ADM {m.concepto}"}]
+
+
+def _hey_banregio(prefijo_spei: str, comision: str):
+    def renglones(m: Movimiento) -> List[Renglon]:
+        primero = {0: f"{m.dia:02d}", 4: m.saldo, **_monto(m, 3, 2)}
+        if m.tipo == "spei":
+            sentido = "RECIBIDO" if m.deposito else "ENVIADO"
+            return [{**primero, 1: f"{prefijo_spei} {sentido},{m.banco},CLABE 646180{m.referencia},{m.contraparte},{m.concepto}"}]
+        if m.tipo == "comision":
+            return [{**primero, 1: comision}]
+        if m.tipo == "iva":
+            return [{**primero, 1: f"IVA {comision}"}]
+        return [{**primero, 1: f"TRASPASO RFC,{m.contraparte},ABC010101XYZ"}, {1: f"COMPRA {m.concepto}"}]
+    return renglones
+
+
+def _afirme(m: Movimiento) -> List[Renglon]:
+    primero = {0: f"{m.dia:02d}", 2: m.referencia[:7], 5: m.saldo, **_monto(m, 3, 4)}
+    if m.tipo == "spei":
+        sentido = "RECIBIDO" if m.deposito else "ENVIADO"
+        return [
+            {**primero, 1: f"SPEI {sentido}-{m.banco}"},
+            {1: f"DESTINATARIO: {m.contraparte} (DATOS)"},
+            {1: f"CONCEPTO: {m.concepto}"},
+        ]
+    if m.tipo == "comision":
+        return [{**primero, 1: "COMISION MANEJO DE CUENTA"}]
+    if m.tipo == "iva":
+        return [{**primero, 1: "IVA COMISION MANEJO DE CUENTA"}]
+    return [{**primero, 1: "PAGO TARJETA OTRO BANCO"}, {1: m.concepto}]
+
+
+def _inbursa(m: Movimiento) -> List[Renglon]:
+    primero = {0: f"ENE {m.dia:02d}", 1: m.referencia, 5: m.saldo, **_monto(m, 4, 3)}
+    if m.tipo == "spei":
+        return [
+            {**primero, 2: "DEPOSITO SPEI" if m.deposito else "TRANSFERENCIA SPEI"},
+            {2: m.contraparte},
+            {2: f"{m.banco} 646"},
+            {2: m.concepto},
+        ]
+    if m.tipo == "comision":
+        return [{**primero, 2: "COMISION SPEI"}]
+    if m.tipo == "iva":
+        return [{**primero, 2: "IVA COMISION SPEI"}]
+    return [{**primero, 2: "COMPRA MX AMAZON"}]
+
+
+def _banorte(m: Movimiento) -> List[Renglon]:
+    primero = {0: f"{m.dia:02d}-ENE-24", 4: m.saldo, **_monto(m, 2, 3)}
+    if m.tipo == "spei" and m.deposito:
+        return [
+            {**primero, 1: f"SPEI RECIBIDO, BCO:0646 {m.banco} HR LIQ: 10:20:11"},
+            {1: f"DEL CLIENTE {m.contraparte} DE LA CLABE 646180{m.referencia}"},
+            {1: f"CONCEPTO: {m.concepto} REFERENCIA {m.referencia[:7]}"},
+        ]
+    if m.tipo == "spei":
+        return [{**primero, 1: f"PAGO SPEI A {m.banco} {m.referencia[:7]}"}, {1: m.contraparte}]
+    if m.tipo == "comision":
+        return [{**primero, 1: "COMISION MANEJO DE CUENTA"}]
+    if m.tipo == "iva":
+        return [{**primero, 1: "I.V.A. COMISION MANEJO DE CUENTA"}]
+    return [{**primero, 1: "OXXO SUCURSAL RFC ABC010101XYZ"}]
+
+
+def _scotiabank(m: Movimiento) -> List[Renglon]:
+    primero = {0: f"{m.dia:02d} ENE", 2: m.referencia, 5: m.saldo, **_monto(m, 3, 4)}
+    if m.tipo == "spei":
+        return [
+            {**primero, 1: "TRANSF INTERBANCARIA SPEI"},
+            {1: m.banco},
+            {1: m.concepto},
+            {1: m.contraparte},
+            {1: "CLAVE 646180"},
+        ]
+    if m.tipo == "comision":
+        return [{**primero, 1: "COMISION POR MANEJO"}]
+    if m.tipo == "iva":
+        return [{**primero, 1: "IVA COMISION POR MANEJO"}]
+    return [{**primero, 1: "PAGO TDC RFC ABC010101XYZ"}]
+
+
+def _bbva(m: Movimiento) -> List[Renglon]:
+    fecha = f"{m.dia:02d}/ENE"
+    primero = {0: fecha, 1: fecha, 5: m.saldo, 6: m.saldo, **_monto(m, 4, 3)}
+    if m.tipo == "spei":
+        sentido = "SPEI RECIBIDO" if m.deposito else "SPEI ENVIADO"
+        return [
+            {**primero, 2: f"{sentido} {m.banco}"},
+            {2: f"{m.referencia[:7]} {m.concepto}"},
+            {2: m.contraparte},
+        ]
+    if m.tipo == "comision":
+        return [{**primero, 2: "COMISION MANEJO DE CUENTA"}]
+    if m.tipo == "iva":
+        return [{**primero, 2: "IVA COMISION MANEJO"}]
+    return [{**primero, 2: "OXXO SUCURSAL 123"}, {2: "RFC ABC010101XYZ"}]
+
+
+def _banjercito(m: Movimiento) -> List[Renglon]:
+    fecha = f"{m.dia:02d} 1"
+    primero = {0: fecha, 1: fecha, 3: "USR01", 4: m.referencia[:7], 7: m.saldo, **_monto(m, 6, 5)}
+    if m.tipo == "spei":
+        return [{**primero, 2: "DEPOSITO SPEI" if m.deposito else "TRANSFERENCIA SPEI"}, {2: m.contraparte}, {2: m.concepto}]
+    if m.tipo == "comision":
+        return [{**primero, 2: "COMISION MANEJO DE CUENTA"}]
+    if m.tipo == "iva":
+        return [{**primero, 2: "IVA COMISION MANEJO DE CUENTA"}]
+    return [{**primero, 2: "COMPRA TARJETA DEBITO"}, {2: m.concepto}]
+
+
+def _pagina_de(x: float):
+    return lambda pagina, total: [(x, f"Page {pagina + 1} of {total}")]
+
+
+DISENOS: Dict[str, Diseno] = {
+    "Santander": Diseno(
+        banco="Santander",
+        bordes=Funciones_Santander.BORDES_COLUMNAS,
+        encabezado={0: "FECHA", 1: "FOLIO", 2: "DESCRIPCION", 3: "DEPOSITOS", 4: "RETIROS", 5: "SALDO"},
+        renglones=_santander,
+        cabecera=lambda pagina, total: [(100, "BANCO SANTANDER MEXICO S.A."), (100, "ESTADO DE CUENTA SANTANDER PYME")],
+        montos=(3, 4, 5),
+        espacios=False,
+    ),
+    "HeyBanco": Diseno(
+        banco="HeyBanco",
+        bordes=Funciones_HeyBanco.BORDES_COLUMNAS,
+        encabezado={0: "DIA", 1: "CONCEPTO", 2: "CARGOS", 3: "ABONOS", 4: "SALDO"},
+        renglones=_hey_banregio("INT SPEI", "Comision por manejo de cuenta"),
+        cabecera=lambda pagina, total: [(60, "Hey Banco"), (60, "Periodo del 01 al 31 de ENERO 2024")],
+        pie=_pagina_de(505),
+        montos=(2, 3, 4),
+    ),
+    "BanRegio": Diseno(
+        banco="BanRegio",
+        bordes=Funciones_BanRegio.BORDES_COLUMNAS,
+        encabezado={0: "DIA", 1: "CONCEPTO", 2: "CARGOS", 3: "ABONOS", 4: "SALDO"},
+        renglones=_hey_banregio("TRA SPEI", "COM. MANEJO DE CUENTA"),
+        cabecera=lambda pagina, total: [(60, "BanRegio"), (60, "Periodo del 01 al 31 de ENERO 2024")],
+        pie=_pagina_de(505),
+        montos=(2, 3, 4),
+    ),
+    "Afirme": Diseno(
+        banco="Afirme",
+        bordes=Funciones_Afirme.BORDES_COLUMNAS,
+        encabezado={0: "Día", 1: "Descripción", 2: "Referencia", 3: "Depósitos", 4: "Retiros", 5: "Saldo"},
+        renglones=_afirme,
+        cabecera=lambda pagina, total: [(70, "Banca Afirme"), (70, "Periodo: 01 ENE 2024 al 31 ENE 2024")],
+        montos=(3, 4, 5),
+    ),
+    "Inbursa": Diseno(
+        banco="Inbursa",
+        bordes=Funciones_Inbursa.BORDES_COLUMNAS,
+        encabezado={0: "FECHA", 1: "REFERENCIA", 2: "CONCEPTO", 3: "CARGOS", 4: "ABONOS", 5: "SALDO"},
+        renglones=_inbursa,
+        cabecera=lambda pagina, total: [(110, "BANCO INBURSA"), (110, "FECHA DE CORTE 31 Ene 2024")],
+        montos=(3, 4, 5),
+    ),
+    "Banorte": Diseno(
+        banco="Banorte",
+        bordes=Funciones_Banorte.BORDES_COLUMNAS,
+        encabezado={0: "FECHA", 1: "DESCRIPCIÓN / ESTABLECIMIENTO", 2: "MONTO DEL DEPOSITO", 3: "MONTO DEL RETIRO", 4: "SALDO"},
+        renglones=_banorte,
+        cabecera=lambda pagina, total: [(90, "BANORTE"), (90, "ESTADO DE CUENTA ENLACE NEGOCIOS")],
+        montos=(2, 3, 4),
+    ),
+    "Scotiabank": Diseno(
+        banco="Scotiabank",
+        bordes=Funciones_Scotiabank.BORDES_COLUMNAS,
+        encabezado={0: "Fecha", 1: "Concepto", 2: "Origen / Referencia", 3: "Depósito", 4: "Retiro", 5: "Saldo"},
+        renglones=_scotiabank,
+        cabecera=lambda pagina, total: [(100, "Scotiabank Inverlat")],
+        portada=lambda: [(60, "Scotiabank Inverlat"), (60, "Estado de cuenta"), (60, "Periodo 01-ENE-24/31-ENE-24 C.P 06600")],
+        montos=(3, 4, 5),
+    ),
+    "BBVA": Diseno(
+        banco="BBVA",
+        # Las dos bandas extra son los saldos de operación y liquidación, que el parser ignora
+        bordes=tuple(Funciones_BBVA.BORDES_CAMPOS) + ((466, 530), (530, 600)),
+        encabezado={0: "OPER", 1: "LIQ", 2: "DESCRIPCION", 3: "CARGOS", 4: "ABONOS", 5: "OPERACION", 6: "LIQUIDACION"},
+        renglones=_bbva,
+        cabecera=lambda pagina, total: [
+            (110, "BBVA MEXICO"),
+            (110, "Periodo DEL 01/01/2024 AL 31/01/2024"),
+        ] + ([(110, "Detalle de Movimientos Realizados")] if pagina == 0 else []),
+        pie=lambda pagina, total: (
+            [(5, "Total de Movimientos"), (5, "TOTAL MOVIMIENTOS CARGOS")] if pagina == total - 1 and total > 1 else []
+        ),
+        montos=(3, 4, 5, 6),
+    ),
+    "Banjercito": Diseno(
+        banco="Banjercito",
+        bordes=Funciones_Banjercito.BORDES_COLUMNAS,
+        encabezado={0: "DÍA", 1: "DÍA", 2: "CONCEPTO", 3: "USUARIO", 4: "REFERENCIA", 5: "CARGOS", 6: "ABONOS", 7: "SALDO"},
+        renglones=_banjercito,
+        cabecera=lambda pagina, total: [
+            (30, "BANJERCITO"),
+            (30, "Fecha de Corte: 31 ENERO 2024"),
+            (30, "DETALLE DE MOVIMIENTOS"),
+        ],
+        montos=(5, 6, 7),
+    ),
+}
+
+
+# ---------------------------------------------------------------------------
+# Dibujo
+# ---------------------------------------------------------------------------
+
+def _palabras(x: float, top: float, texto: str, escala: float, espacios: bool) -> List[Texto]:
+    if espacios:
+        return [(x, top, texto, escala)]
+    textos = []
+    espacio = ancho_texto(" ", escala)
+    for palabra in texto.split():
+        textos.append((x, top, palabra, escala))
+        x += ancho_texto(palabra, escala) + espacio
+    return textos
+
+
+def _celda(diseno: Diseno, columna: int, top: float, texto: str) -> List[Texto]:
+    """Coloca el texto completo dentro de la banda, comprimiéndolo a lo ancho si no cabe."""
+    inicio, fin = diseno.bordes[columna]
+    escala = min(1.0, (fin - inicio - 2) / max(ancho_texto(texto), 1e-9))
+    x = fin - 1 - ancho_texto(texto, escala) if columna in diseno.montos else inicio + 1
+    return _palabras(x, top, texto, escala, diseno.espacios)
+
+
+def _lineas_libres(diseno: Diseno, lineas, top: float) -> Tuple[List[Texto], float]:
+    textos = []
+    for x, texto in lineas:
+        textos.extend(_palabras(x, top, texto, 1.0, diseno.espacios))
+        top += ALTO_RENGLON
+    return textos, top
+
+
+def dibujar_pagina(diseno: Diseno, numero: int, total: int, movimientos: Sequence[Movimiento]) -> List[Texto]:
+    textos, top = _lineas_libres(diseno, diseno.cabecera(numero, total), TOP_CABECERA)
+    top += ALTO_RENGLON
+    for columna, texto in diseno.encabezado.items():
+        textos.extend(_celda(diseno, columna, top, texto))
+    top += ALTO_RENGLON
+
+    renglones = [renglon for m in movimientos for renglon in diseno.renglones(m)]
+    pie = diseno.pie(numero, total)
+    disponible = TOP_LIMITE - top - ALTO_RENGLON * len(pie)
+    alto = max(ALTO_RENGLON_MINIMO, min(ALTO_RENGLON, disponible / max(len(renglones), 1)))
+    for renglon in renglones:
+        for columna, texto in renglon.items():
+            textos.extend(_celda(diseno, columna, top, texto))
+        top += alto
+
+    textos_pie, _ = _lineas_libres(diseno, pie, top + ALTO_RENGLON)
+    return textos + textos_pie
+
+
+def generar_estado(banco: str, ruta, paginas: int, movimientos_por_pagina: int = 20, semilla: int = 0) -> int:
+    """
+    Escribe un estado sintético de ``paginas`` páginas y devuelve el número de
+    movimientos escritos.
+    """
+    diseno = DISENOS[banco]
+    con_portada = diseno.portada is not None and paginas > 1
+    paginas_tabla = paginas - con_portada
+    movimientos = generar_movimientos(paginas_tabla * movimientos_por_pagina, semilla)
+
+    with EscritorPDF(ruta) as pdf:
+        if con_portada:
+            textos, _ = _lineas_libres(diseno, diseno.portada(), TOP_CABECERA)
+            pdf.agregar_pagina(textos)
+        for numero in range(paginas_tabla):
+            lote = [next(movimientos) for _ in range(movimientos_por_pagina)]
+            pdf.agregar_pagina(dibujar_pagina(diseno, numero + con_portada, paginas, lote))
+    return paginas_tabla * movimientos_por_pagina
@@ -0,0 +1,128 @@
+"""
+Benchmark por banco sobre estados sintéticos.
+
+Genera un PDF por banco y número de páginas con ``benchmarks.disenos`` y mide
+cada uno en un proceso nuevo, para que el pico de memoria (RSS) sea el de ese
+parseo y no el acumulado de los anteriores. No usa red ni PDFs reales::
+
+    python -m benchmarks.ejecutar
+    python -m benchmarks.ejecutar --bancos BBVA Santander --paginas 1 10 100
+    python -m benchmarks.ejecutar --json > resultados.json
+
+Reporta páginas/s, renglones/s y el pico de RSS por banco y tamaño.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .disenos import DISENOS, generar_estado
+
+PAGINAS = (1, 10, 100, 500)
+MOVIMIENTOS_POR_PAGINA = 20
+RAIZ = Path(__file__).resolve().parents[1]
+
+
+def _rss_pico_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KiB, macOS bytes
+    return pico / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def medir(banco: str, ruta: str) -> dict:
+    """Parsea ``ruta`` una vez en este proceso y devuelve tiempo, renglones y RSS."""
+    from Scraping_Bancos_MX.registro import importar_modulo
+
+    scraper = importar_modulo(banco).Scrap_Estado
+    rss_base = _rss_pico_mb()
+    inicio = time.perf_counter()
+    tabla = scraper(ruta)
+    segundos = time.perf_counter() - inicio
+    return {"segundos": segundos, "renglones": len(tabla), "rss_base_mb": rss_base, "rss_pico_mb": _rss_pico_mb()}
+
+
+def medir_en_subproceso(banco: str, ruta: Path) -> dict:
+    entorno = dict(os.environ)
+    # El benchmark mide el parseo, no el caché de resultados
+    entorno.pop("SCRAPING_BANCOS_MX_CACHE", None)
+    entorno["PYTHONPATH"] = os.pathsep.join(filter(None, [str(RAIZ), entorno.get("PYTHONPATH")]))
+    salida = subprocess.run(
+        [sys.executable, "-m", "benchmarks.ejecutar", "--medir", banco, str(ruta)],
+        cwd=RAIZ, env=entorno, capture_output=True, text=True, check=True,
+    )
+    # El parser puede imprimir avisos; el resultado es la última línea
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def ejecutar(bancos, paginas, movimientos_por_pagina, directorio: Path):
+    directorio.mkdir(parents=True, exist_ok=True)
+    for banco in bancos:
+        for n_paginas in paginas:
+            ruta = directorio / f"{banco}_{n_paginas}p_{movimientos_por_pagina}m.pdf"
+            movimientos = generar_estado(banco, ruta, n_paginas, movimientos_por_pagina)
+            try:
+                medicion = medir_en_subproceso(banco, ruta)
+            except subprocess.CalledProcessError as e:
+                error = (e.stderr or "").strip().splitlines()
+                yield {"banco": banco, "paginas": n_paginas, "movimientos": movimientos,
+                       "error": error[-1] if error else f"código {e.returncode}"}
+                continue
+            segundos = medicion["segundos"] or 1e-9
+            yield {
+                "banco": banco,
+                "paginas": n_paginas,
+                "movimientos": movimientos,
+                **medicion,
+                "paginas_por_segundo": n_paginas / segundos,
+                "renglones_por_segundo": medicion["renglones"] / segundos,
+            }
+
+
+def _imprimir_renglon(r: dict):
+    if "error" in r:
+        print(f"{r['banco']:<11} {r['paginas']:>6}  ERROR: {r['error']}")
+        return
+    rss = "-" if r["rss_pico_mb"] is None else f"{r['rss_pico_mb']:.1f}"
+    print(
+        f"{r['banco']:<11} {r['paginas']:>6} {r['renglones']:>9} {r['segundos']:>9.3f} "
+        f"{r['paginas_por_segundo']:>9.1f} {r['renglones_por_segundo']:>10.1f} {rss:>9}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de parsers sobre estados de cuenta sintéticos.")
+    parser.add_argument("--bancos", nargs="+", choices=list(DISENOS), default=list(DISENOS))
+    parser.add_argument("--paginas", nargs="+", type=int, default=list(PAGINAS))
+    parser.add_argument("--movimientos-por-pagina", type=int, default=MOVIMIENTOS_POR_PAGINA)
+    parser.add_argument("--directorio", type=Path, default=None,
+                        help="Dónde dejar los PDFs generados (por omisión, un directorio temporal)")
+    parser.add_argument("--json", action="store_true", help="Imprime un objeto JSON por medición")
+    parser.add_argument("--medir", nargs=2, metavar=("BANCO", "RUTA"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.medir:
+        print(json.dumps(medir(*args.medir)))
+        return
+
+    with tempfile.TemporaryDirectory(prefix="bancos_bench_") as temporal:
+        directorio = args.directorio or Path(temporal)
+        if not args.json:
+            print(f"{'banco':<11} {'paginas':>6} {'renglones':>9} {'segundos':>9} {'pag/s':>9} {'reng/s':>10} {'RSS MB':>9}")
+        for resultado in ejecutar(args.bancos, args.paginas, args.movimientos_por_pagina, directorio):
+            if args.json:
+                print(json.dumps(resultado), flush=True)
+            else:
+                _imprimir_renglon(resultado)
+                sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Escritor mínimo de PDFs de texto, sin dependencias externas.
+
+Solo usa la fuente estándar Helvetica (no se incrusta) con WinAnsiEncoding y
+coloca cada texto en coordenadas absolutas, que es todo lo que necesitan los
+parsers basados en ``pagina.chars``. Las páginas se escriben al archivo una
+por una, así que generar 500 páginas no acumula el documento en memoria.
+"""
+from typing import Iterable, List, Tuple
+
+from pdfminer.fontmetrics import FONT_METRICS
+
+ANCHO_PAGINA = 612
+ALTO_PAGINA = 792
+TAMANO_FUENTE = 7.0
+
+_ANCHOS = FONT_METRICS["Helvetica"][1]
+_DESCENSO = FONT_METRICS["Helvetica"][0]["Descent"] / 1000
+
+# (x, top, texto, escala): top medido desde el borde superior, como en
+# pdfplumber; escala < 1 comprime el texto solo a lo ancho, así todos los
+# textos de un renglón conservan el mismo top aunque alguno se haya ajustado
+Texto = Tuple[float, float, str, float]
+
+
+def ancho_texto(texto: str, escala: float = 1.0) -> float:
+    """Ancho en puntos de ``texto`` en Helvetica, con las métricas que usa pdfminer."""
+    return sum(_ANCHOS.get(c, 556) for c in texto) * TAMANO_FUENTE * escala / 1000
+
+
+def _escapar(texto: str) -> bytes:
+    crudo = texto.encode("cp1252", errors="replace")
+    return crudo.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def _contenido(textos: Iterable[Texto]) -> bytes:
+    partes = [b"BT", b"/F1 %.2f Tf" % TAMANO_FUENTE]
+    for x, top, texto, escala in textos:
+        # Tm absoluto; la línea base queda donde pdfplumber reporta ``top``
+        linea_base = ALTO_PAGINA - top - TAMANO_FUENTE * (1 + _DESCENSO)
+        partes.append(b"%.4f 0 0 1 %.2f %.2f Tm (%s) Tj" % (escala, x, linea_base, _escapar(texto)))
+    partes.append(b"ET")
+    return b"\n".join(partes)
+
+
+class EscritorPDF:
+    """
+    Escribe un PDF página por página::
+
+        with EscritorPDF(ruta) as pdf:
+            pdf.agregar_pagina([(50, 60, "Hola", 1.0)])
+    """
+
+    # Objetos fijos: 1 catálogo, 2 árbol de páginas, 3 fuente
+    _PRIMER_OBJETO_LIBRE = 4
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._archivo = None
+        self._offsets: List[int] = []
+        self._paginas: List[int] = []
+
+    def __enter__(self):
+        self._archivo = open(self.ruta, "wb")
+        self._archivo.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._offsets = [0, 0, 0]
+        self._escribir_objeto(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+        return self
+
+    def _escribir_objeto(self, numero: int, cuerpo: bytes):
+        self._offsets[numero - 1] = self._archivo.tell()
+        self._archivo.write(b"%d 0 obj\n" % numero + cuerpo + b"\nendobj\n")
+
+    def _nuevo_objeto(self, cuerpo: bytes) -> int:
+        self._offsets.append(0)
+        numero = len(self._offsets)
+        self._escribir_objeto(numero, cuerpo)
+        return numero
+
+    def agregar_pagina(self, textos: Iterable[Texto]):
+        contenido = _contenido(textos)
+        flujo = self._nuevo_objeto(b"<< /Length %d >>\nstream\n" % len(contenido) + contenido + b"\nendstream")
+        pagina = self._nuevo_objeto(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 3 0 R >> >> >>" % (ANCHO_PAGINA, ALTO_PAGINA, flujo)
+        )
+        self._paginas.append(pagina)
+
+    def __exit__(self, tipo, valor, tb):
+        try:
+            if tipo is None:
+                self._cerrar()
+        finally:
+            self._archivo.close()
+
+    def _cerrar(self):
+        hijos = b" ".join(b"%d 0 R" % p for p in self._paginas)
+        self._escribir_objeto(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (hijos, len(self._paginas)))
+        self._escribir_objeto(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        inicio_xref = self._archivo.tell()
+        self._archivo.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(self._offsets) + 1))
+        for offset in self._offsets:
+            self._archivo.write(b"%010d 00000 n \n" % offset)
+        self._archivo.write(
+            b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(self._offsets) + 1, inicio_xref)
+        )
@@ -21,6 +21,10 @@ INSTALL_REQUIRES = [
     'numpy>=1.21.0'
 ]
 
+EXTRAS_REQUIRE = {
+    'cache': ['pyarrow>=10.0.0'],
+}
+
 CLASSIFIERS = [
     'Development Status :: 3 - Alpha',
     'Intended Audience :: Developers',
@@ -49,6 +53,7 @@ setup(
     packages=find_packages(exclude=['tests', 'notebooks', 'benchmarks']),
     python_requires='>=3.9',
     install_requires=INSTALL_REQUIRES,
+    extras_require=EXTRAS_REQUIRE,
     classifiers=CLASSIFIERS,
     keywords=KEYWORDS,
     include_package_data=True,
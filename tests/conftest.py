@@ -0,0 +1,9 @@
+import random
+
+import pytest
+
+
+@pytest.fixture
+def azar():
+    """Generador de números aleatorios con semilla fija, para renglones reproducibles."""
+    return random.Random(2024)
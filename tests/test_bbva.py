@@ -0,0 +1,147 @@
+"""
+Pruebas de BBVA. Las funciones vectorizadas se comparan con una copia de la
+lógica renglón por renglón que reemplazaron (``*_anterior``) sobre renglones
+generados al azar.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.generador_pdf import EscritorPDF
+from Scraping_Bancos_MX import Funciones_BBVA as BBVA
+from Scraping_Bancos_MX.columnas import CaracteresPagina
+from Scraping_Bancos_MX.Funciones_BBVA import BBVAExtractor
+
+ITERACIONES = 300
+
+
+def test_parse_pdf_ignora_el_resumen_de_la_primera_pagina(tmp_path):
+    # El total de depósitos del resumen (izquierda, antes en orden de lectura)
+    # es igual al único abono de la tabla (columna ABONOS, a la derecha)
+    ruta = tmp_path / "bbva.pdf"
+    with EscritorPDF(ruta) as pdf:
+        pdf.agregar_pagina([
+            (50, 60, "BBVA MEXICO", 1.0),
+            (50, 80, "Saldo Anterior", 1.0), (250, 80, "10,000.00", 1.0),
+            (50, 90, "Depositos / Abonos", 1.0), (250, 90, "500.00", 1.0),
+            (50, 100, "Retiros / Cargos", 1.0), (250, 100, "120.00", 1.0),
+            (50, 110, "Saldo Final", 1.0), (250, 110, "10,380.00", 1.0),
+            (50, 140, "Detalle de Movimientos Realizados", 1.0),
+            (20, 150, "OPER", 1.0), (60, 150, "LIQ", 1.0), (110, 150, "DESCRIPCION", 1.0),
+            (380, 150, "CARGOS", 1.0), (430, 150, "ABONOS", 1.0),
+            (20, 160, "02/ENE", 1.0), (60, 160, "02/ENE", 1.0), (110, 160, "SPEI RECIBIDO STP", 1.0),
+            (430, 160, "500.00", 1.0), (480, 160, "10,500.00", 1.0), (540, 160, "10,500.00", 1.0),
+            (20, 170, "03/ENE", 1.0), (60, 170, "03/ENE", 1.0), (110, 170, "COMISION", 1.0),
+            (380, 170, "120.00", 1.0), (480, 170, "10,380.00", 1.0), (540, 170, "10,380.00", 1.0),
+        ])
+
+    movimientos = BBVAExtractor.parse_pdf(ruta)
+    assert movimientos["deposito"].tolist() == [500.0, 0.0]
+    assert movimientos["retiro"].tolist() == [0.0, 120.0]
+
+
+# --- Numeración de líneas (identificar_numero_de_linea + scrap_filas) ---------
+
+CAMPOS_BBVA = ((0, 55, "Oper"), (55, 100, "Fecha"), (100, 314, "Descripcion"), (314, 420, "Cargos"), (420, 466, "Abono"))
+
+
+def identificar_campo_anterior(coordenada):
+    for inicio, fin, campo in CAMPOS_BBVA:
+        if inicio <= coordenada <= fin:
+            return campo
+    return "-"
+
+
+def operar_caracteres_anterior(caracteres):
+    df = pd.DataFrame([
+        {"Texto": c["text"], "top": c["top"], "left": c["x0"], "right": c["x1"], "height": c["height"]}
+        for c in caracteres
+    ]).sort_values(by=["top"], kind="stable")
+    df["tipo"] = df["right"].apply(identificar_campo_anterior)
+    df["linea"] = (df["top"] > (df["top"].shift(1) + df["height"] * 0.7)).cumsum()
+
+    filas = []
+    for _, grupo in df.groupby("linea"):
+        textos = grupo.sort_values(by=["left"], kind="stable").groupby("tipo")["Texto"].apply("".join)
+        filas.append({
+            "Operacion": textos.get("Oper", ""),
+            "Fecha": textos.get("Fecha", ""),
+            "Descripcion": textos.get("Descripcion", ""),
+            "Cargo": textos.get("Cargos", ""),
+            "Abono": textos.get("Abono", ""),
+        })
+    return pd.DataFrame(filas)
+
+
+def test_bbva_numeracion_de_lineas(azar):
+    for _ in range(ITERACIONES):
+        caracteres = []
+        top = 0.0
+        for _ in range(azar.randint(1, 8)):
+            top += azar.choice([0.5, 3.0, 12.0])
+            altura = azar.choice([6.0, 9.0])
+            # x1 fuera de los bordes enteros: la asignación en los límites no cambió
+            for x0 in azar.sample(range(0, 480, 3), azar.randint(1, 10)):
+                caracteres.append({"text": azar.choice("AB1/ "), "top": top, "x0": x0 + 0.25,
+                                   "x1": x0 + 2.5, "bottom": top + altura, "height": altura})
+        azar.shuffle(caracteres)
+
+        arreglos = CaracteresPagina.desde_chars(caracteres)
+        arreglos = arreglos.tomar(np.argsort(arreglos.top, kind="stable"))
+        pd.testing.assert_frame_equal(
+            BBVA.scrap_filas(BBVA.identificar_numero_de_linea(arreglos)).reset_index(drop=True),
+            operar_caracteres_anterior(caracteres),
+        )
+
+
+# --- Unión de movimientos (inicializar_movimientos + unificar_tabla) ----------
+
+def unificar_tabla_anterior(df):
+    df = df.copy()
+    numero_movimiento = 0
+    movimientos = []
+    for operacion in df["Operacion"]:
+        if re.search(r"\d{1,2}\/\w{3}", operacion):
+            numero_movimiento += 1
+        movimientos.append(numero_movimiento)
+    df["Movimiento"] = movimientos
+
+    lista_movimientos = []
+    for i in df["Movimiento"].unique():
+        tabla = df[df["Movimiento"] == i]
+        try:
+            referencia = tabla["Cargo"].iloc[1]
+        except IndexError:
+            referencia = " - "
+        primera = tabla.iloc[0]
+        lista_movimientos.append({
+            "Operacion": primera["Operacion"],
+            "Fecha": primera["Fecha"],
+            "FechaOperacion": primera["FechaOperacion"],
+            "FechaLiquidacion": primera["FechaLiquidacion"],
+            "Descripcion": "".join("|" + d for d in tabla["Descripcion"]),
+            "Referencia": referencia,
+            "Cargo": primera["Cargo"],
+            "Abono": primera["Abono"],
+            "Movimiento": primera["Movimiento"],
+        })
+    return pd.DataFrame(lista_movimientos)
+
+
+def test_bbva_union_de_movimientos(azar):
+    operaciones = ["", "01/ENE", "x", "05/DIC", "SALDO"]
+    inicio = pd.Timestamp("2024-01-01")
+    for _ in range(ITERACIONES):
+        n = azar.randint(1, 15)
+        df = pd.DataFrame({
+            "Operacion": [azar.choice(operaciones) for _ in range(n)],
+            "Fecha": [azar.choice(["", "02/ENE"]) for _ in range(n)],
+            "Descripcion": [f"d{i}" for i in range(n)],
+            "Cargo": [azar.choice(["", "1.00", "REF9"]) for _ in range(n)],
+            "Abono": [azar.choice(["", "2.00"]) for _ in range(n)],
+        })
+        df = BBVA.incluir_anios(df, inicio)
+        pd.testing.assert_frame_equal(
+            BBVA.unificar_tabla(BBVA.inicializar_movimientos(df)), unificar_tabla_anterior(df), check_dtype=False
+        )
@@ -0,0 +1,18 @@
+"""Pruebas de la caché de resultados."""
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from Scraping_Bancos_MX.cache import CacheResultados
+
+
+def test_sobrescribir_una_llave_no_duplica_los_bytes(tmp_path):
+    cache = CacheResultados(tmp_path)
+    llave = cache.llave("huella", "BBVA")
+    for _ in range(3):
+        assert cache.guardar(llave, pd.DataFrame({"saldo": [1.0, 2.0]}))
+    assert cache.estadisticas()["bytes"] == os.path.getsize(cache._ruta(llave))
+    assert cache.estadisticas()["desalojos"] == 0
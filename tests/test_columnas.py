@@ -0,0 +1,54 @@
+"""
+Renglones armados con ``columnas.unir_renglones`` frente al ciclo por Top que
+reemplazó en cada banco (``unificar_columnas_anterior``), sobre caracteres
+generados al azar.
+"""
+import pandas as pd
+import pytest
+
+from Scraping_Bancos_MX import Funciones_Afirme, Funciones_HeyBanco, Funciones_Inbursa
+
+ITERACIONES = 200
+SALIDA = ("Fecha", "Concepto", "Origen", "Deposito", "Retiro", "Saldo", "Top")
+
+# Campo de cada columna en el ciclo anterior de cada banco
+CAMPOS_ANTERIORES = {
+    Funciones_Afirme: ("Fecha", "Concepto", "Origen", "Deposito", "Retiro", "Saldo"),
+    Funciones_HeyBanco: ("Fecha", "Concepto", "Deposito", "Retiro", "Saldo"),
+    Funciones_Inbursa: ("Fecha", "Origen", "Concepto", "Deposito", "Retiro", "Saldo"),
+}
+
+
+def unificar_columnas_anterior(columnas, campos):
+    filas = []
+    for top in columnas["Top"].unique():
+        renglon = columnas[columnas["Top"] == top].sort_values(by=["X"], kind="stable")
+        fila = dict.fromkeys(SALIDA[:-1], "")
+        for _, caracter in renglon.iterrows():
+            fila[campos[caracter["Columna"]]] += caracter["Caracter"]
+        fila["Top"] = renglon["Top"].max()
+        filas.append(fila)
+    return pd.DataFrame(filas, columns=list(SALIDA)).sort_values(by=["Top"], kind="stable").reset_index(drop=True)
+
+
+@pytest.mark.parametrize("banco", list(CAMPOS_ANTERIORES), ids=lambda banco: banco.__name__.split("_")[-1])
+def test_renglones_por_banco(banco, azar):
+    inicio, fin = banco.BORDES_COLUMNAS[0][0], banco.BORDES_COLUMNAS[-1][1]
+    for _ in range(ITERACIONES):
+        caracteres = []
+        for top in azar.sample(range(100, 700, 7), azar.randint(1, 10)):
+            for x1 in azar.sample(range(inicio + 1, fin), azar.randint(1, 12)):
+                # Variaciones de top menores al redondeo de algunos bancos
+                top_caracter = top + azar.choice([0.0, 0.00001, 0.001])
+                caracteres.append({"text": azar.choice("AZ09-. "), "top": top_caracter, "x0": x1 - 4.0,
+                                   "x1": x1 + 0.5, "bottom": top_caracter + 8.0, "height": 8.0})
+        azar.shuffle(caracteres)
+
+        columnas = banco.agrupar_columnas(caracteres)
+        if columnas.empty:
+            continue
+        pd.testing.assert_frame_equal(
+            banco.unificar_columnas(columnas),
+            unificar_columnas_anterior(columnas, CAMPOS_ANTERIORES[banco]),
+            check_dtype=False,
+        )
@@ -0,0 +1,76 @@
+"""
+Pruebas de Santander. Las funciones vectorizadas se comparan con una copia de
+la lógica renglón por renglón que reemplazaron (``*_anterior``) sobre
+renglones generados al azar.
+"""
+import pandas as pd
+
+from Scraping_Bancos_MX import Funciones_Santander as Santander
+
+ITERACIONES = 300
+
+
+# --- Renglones de la tabla (unificar_columnas) -------------------------------
+
+def unificar_columnas_anterior(columnas):
+    nombres = {0: "Fecha", 1: "Origen", 2: "Concepto", 3: "Deposito", 4: "Retiro", 5: "Saldo"}
+    filas = []
+    for top in columnas["Top"].unique():
+        renglon = columnas[columnas["Top"] == top].sort_values(by=["X"], kind="stable")
+        fila = dict.fromkeys(nombres.values(), "")
+        for _, caracter in renglon.iterrows():
+            fila[nombres[caracter["Columna"]]] += caracter["Caracter"]
+        filas.append({"Fecha": fila["Fecha"], "Concepto": fila["Concepto"], "Origen": fila["Origen"],
+                      "Deposito": fila["Deposito"], "Retiro": fila["Retiro"], "Saldo": fila["Saldo"],
+                      "Top": renglon["Top"].max()})
+    return pd.DataFrame(filas).sort_values(by=["Top"], kind="stable").reset_index(drop=True)
+
+
+def test_santander_renglones(azar):
+    for _ in range(ITERACIONES):
+        caracteres = []
+        tops = azar.sample(range(100, 700, 7), azar.randint(1, 10))
+        for top in tops:
+            for x1 in azar.sample(range(17, 577), azar.randint(1, 12)):
+                caracteres.append({"text": azar.choice("AZ09-. "), "top": float(top), "x0": x1 - 4.0,
+                                   "x1": x1 + 0.5, "bottom": top + 8.0, "height": 8.0})
+        azar.shuffle(caracteres)
+
+        columnas = Santander.agrupar_columnas(caracteres)
+        if columnas.empty:
+            continue
+        pd.testing.assert_frame_equal(
+            Santander.unificar_columnas(columnas).reset_index(drop=True),
+            unificar_columnas_anterior(columnas),
+            check_dtype=False,
+        )
+
+
+# --- Signo del monto según el cambio de saldo ----------------------------------
+
+def signar_montos_anterior(montos, saldos):
+    df = pd.DataFrame({"monto": montos, "saldo": saldos})
+    df["delta_saldo"] = df["saldo"] - df["saldo"].shift(1)
+    df["monto_signado"] = df["monto"] * df["delta_saldo"].apply(lambda x: -1 if x < 0 else 1)
+    df["deposito"] = df["monto_signado"].clip(lower=0)
+    df["retiro"] = (-df["monto_signado"]).clip(lower=0)
+    return df[["deposito", "retiro", "saldo"]]
+
+
+def test_santander_signo_por_saldo(azar):
+    for _ in range(ITERACIONES):
+        montos, saldos, lineas = [], [], ["ENCABEZADO"]
+        saldo = azar.randint(0, 10 ** 6) / 100
+        for i in range(azar.randint(1, 20)):
+            monto = azar.randint(1, 10 ** 6) / 100
+            saldo = max(0.0, saldo + azar.choice([-monto, monto, 0.0]))
+            montos.append(monto)
+            saldos.append(saldo)
+            lineas.append(f"{azar.randint(1, 28):02d}-ENE-2024 {azar.randint(10 ** 6, 10 ** 7 - 1)} PAGO {i} "
+                          f"{monto:,.2f} {saldo:,.2f}")
+            lineas.extend(azar.choice(["REF ABC", "", "(más)"]) for _ in range(azar.randint(0, 2)))
+
+        resultado = Santander.ParserTransacciones("\n".join(lineas)).to_dataframe()
+        pd.testing.assert_frame_equal(
+            resultado[["deposito", "retiro", "saldo"]], signar_montos_anterior(montos, saldos)
+        )
@@ -0,0 +1,185 @@
+"""
+Pruebas de Scotiabank. Las funciones vectorizadas se comparan con una copia de
+la lógica renglón por renglón que reemplazaron (``*_anterior``) sobre
+renglones generados al azar.
+"""
+import re
+
+import pandas as pd
+import pytest
+
+from benchmarks import disenos
+from benchmarks.generador_pdf import EscritorPDF
+from Scraping_Bancos_MX import Funciones_Scotiabank as Scotiabank
+
+ITERACIONES = 300
+
+
+# --- Arrastre de importes (incluir_movimientos) -----------------------------
+
+def incluir_movimientos_anterior(filas):
+    if filas is None or filas.empty:
+        return filas
+    filas = filas.reset_index(drop=True).copy()
+    for col in ["Deposito", "Retiro", "Saldo"]:
+        if col not in filas.columns:
+            filas[col] = ""
+
+    def _str(x):
+        return "" if pd.isna(x) else str(x)
+
+    def has_amount(row):
+        return any(_str(row[c]).strip() != "" for c in ["Deposito", "Retiro", "Saldo"])
+
+    movimiento_id = 0
+    mov_ids = []
+    for _, row in filas.iterrows():
+        if Scotiabank.RE_INICIO_MOVIMIENTO.match(_str(row.get("Fecha", "")).strip()):
+            movimiento_id += 1
+        mov_ids.append(movimiento_id)
+    filas["Movimiento"] = mov_ids
+    if movimiento_id == 0:
+        return filas
+
+    for mov in sorted(filas["Movimiento"].unique()):
+        if mov == 0:
+            continue
+        grupo_idx = filas.index[filas["Movimiento"] == mov]
+        first_date_idx = None
+        for idx in grupo_idx:
+            if Scotiabank.RE_INICIO_MOVIMIENTO.match(_str(filas.at[idx, "Fecha"]).strip()):
+                first_date_idx = idx
+                break
+        if first_date_idx is None or has_amount(filas.loc[first_date_idx]):
+            continue
+        for idx in grupo_idx:
+            if idx == first_date_idx:
+                continue
+            if has_amount(filas.loc[idx]):
+                for col in ["Deposito", "Retiro", "Saldo"]:
+                    if _str(filas.at[first_date_idx, col]).strip() == "" and _str(filas.at[idx, col]).strip() != "":
+                        filas.at[first_date_idx, col] = filas.at[idx, col]
+                break
+    return filas
+
+
+def test_scotiabank_arrastre_de_importes(azar):
+    fechas = ["01 ENE", "15ABR", "", " ", None, "x", "Fecha"]
+    importes = ["", " ", "1,000.00", None, "$5.00"]
+    for _ in range(ITERACIONES):
+        n = azar.randint(1, 15)
+        filas = pd.DataFrame({
+            "Fecha": [azar.choice(fechas) for _ in range(n)],
+            "Concepto": "c",
+            "Origen": "o",
+            "Deposito": [azar.choice(importes) for _ in range(n)],
+            "Retiro": [azar.choice(importes) for _ in range(n)],
+            "Saldo": [azar.choice(importes) for _ in range(n)],
+            "Top": range(n),
+        })
+        if azar.random() < 0.2:
+            filas = filas.drop(columns=["Retiro"])
+        pd.testing.assert_frame_equal(
+            Scotiabank.incluir_movimientos(filas.copy()), incluir_movimientos_anterior(filas.copy())
+        )
+
+
+# --- Clasificación (analisis_*) ------------------------------------------------
+
+def clasificar_movimientos_anterior(df):
+    df = df.copy()
+    tipos, contrapartes, instituciones, conceptos = [], [], [], []
+    for concepto_texto in df["Concepto"]:
+        renglones = concepto_texto.split("|")
+        spei = re.search("SPEI", concepto_texto)
+
+        if spei:
+            tipo = "SPEI"
+        elif re.search("COMISION", concepto_texto) and not re.search("IVA", concepto_texto):
+            tipo = "COMISION"
+        elif re.search("IVA", concepto_texto):
+            tipo = "IVACOMISION"
+        elif re.search("RFC", concepto_texto):
+            tipo = "COMPRA"
+        else:
+            tipo = "OTRO"
+
+        contraparte = "-"
+        if spei:
+            contraparte = renglones[-2]
+        if re.search("RFC", concepto_texto):
+            contraparte = renglones[1]
+
+        banco = "Sin contraparte"
+        concepto = "-"
+        if spei:
+            try:
+                banco = renglones[2]
+            except IndexError:
+                banco = "Sin contraparte"
+            try:
+                concepto = renglones[3]
+            except IndexError:
+                concepto = "-"
+        concepto = concepto.replace("/", "")
+
+        tipos.append(tipo)
+        contrapartes.append(contraparte)
+        instituciones.append(banco)
+        conceptos.append(concepto)
+    df["TipoMovimiento"] = tipos
+    df["Contraparte"] = contrapartes
+    df["InstitucionContraparte"] = instituciones
+    df["ConceptoMovimiento"] = conceptos
+    return df
+
+
+def test_scotiabank_clasificacion(azar):
+    piezas = ["SPEI ENVIADO", "STP", "PAGO/RENTA", "JUAN", "COMISION", "IVA", "RFC ABC", "x/y", "", "COMISION IVA"]
+    for _ in range(ITERACIONES):
+        n = azar.randint(1, 12)
+        df = pd.DataFrame({
+            "Concepto": ["|" + "|".join(azar.choice(piezas) for _ in range(azar.randint(1, 6))) for _ in range(n)],
+            "Movimiento": range(n),
+        })
+        pd.testing.assert_frame_equal(
+            Scotiabank.clasificar_movimientos(df), clasificar_movimientos_anterior(df), check_dtype=False
+        )
+
+
+def test_scotiabank_clasificacion_sin_movimientos():
+    df = pd.DataFrame({"Concepto": pd.Series([], dtype=object), "Movimiento": pd.Series([], dtype="int64")})
+    pd.testing.assert_frame_equal(
+        Scotiabank.clasificar_movimientos(df), clasificar_movimientos_anterior(df), check_dtype=False
+    )
+
+
+# --- Año de las fechas ------------------------------------------------------------
+
+def escribir_estado(ruta, con_periodo):
+    """Dos páginas de movimientos de enero; el periodo solo aparece en una página entre ellas."""
+    diseno = disenos.DISENOS["Scotiabank"]
+    movimientos = disenos.generar_movimientos(20)
+    with EscritorPDF(ruta) as pdf:
+        pdf.agregar_pagina(disenos.dibujar_pagina(diseno, 0, 3, [next(movimientos) for _ in range(10)]))
+        portada = diseno.portada() if con_periodo else [(60, "Estado de cuenta")]
+        pdf.agregar_pagina(disenos._lineas_libres(diseno, portada, disenos.TOP_CABECERA)[0])
+        pdf.agregar_pagina(disenos.dibujar_pagina(diseno, 2, 3, [next(movimientos) for _ in range(10)]))
+
+
+def test_periodo_despues_de_la_primera_pagina(tmp_path):
+    ruta = tmp_path / "scotiabank.pdf"
+    escribir_estado(ruta, con_periodo=True)
+    fechas = Scotiabank.Scrap_Estado(ruta)["fecha"]
+    assert len(fechas) == 20
+    assert pd.api.types.is_datetime64_any_dtype(fechas)
+    assert fechas.dt.year.eq(2024).all()
+
+
+def test_sin_periodo_conserva_dd_mmm(tmp_path):
+    ruta = tmp_path / "scotiabank.pdf"
+    escribir_estado(ruta, con_periodo=False)
+    with pytest.warns(UserWarning, match="periodo"):
+        fechas = Scotiabank.Scrap_Estado(ruta)["fecha"]
+    assert len(fechas) == 20
+    assert fechas.str.match(Scotiabank.RE_INICIO_MOVIMIENTO).all()